@@ -22,6 +22,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -62,19 +63,67 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
+
+# True で AI を呼び出す API（command/ add-event/ get-events/）を非同期ビューで提供する（ASGI サーバーで起動すること）
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False') == 'True'
 
 # Database
+# DB_POOL=True（既定）: psycopg3 の接続プールを使う。リクエストは接続をプールから借りて返すだけで、
+#   AI 呼び出しの前にも返却する（schedule/services/db_pool.py）。プールはワーカープロセスごと。
+# DB_POOL=False: ワーカースレッドごとの持続接続（DB_CONN_MAX_AGE 秒まで再利用）
+DB_POOL = os.getenv('DB_POOL', 'True') == 'True'
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        # django.db.backends.postgresql + 接続プールの借用待ち・貸出時間の計測
+        'ENGINE': 'schedule.db_backend',
         'NAME': os.getenv('DB_NAME'),
         'USER': os.getenv('DB_USER'),
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        # 再利用する接続を使う前に死活確認する（プールでは貸し出し時、持続接続ではリクエスト開始時）
+        'CONN_HEALTH_CHECKS': True,
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'OPTIONS': {
+            'pool': {
+                'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+                'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+                'timeout' : float(os.getenv('DB_POOL_TIMEOUT', '10')),
+            },
+        } if DB_POOL else {},
     }
 }
 
+# 認証（LoginView などはメールアドレスで 1 回だけ検索する EmailBackend、管理画面は username の ModelBackend）
+AUTHENTICATION_BACKENDS = [
+    'users.backends.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# パスワードハッシュの方式（'pbkdf2': PBKDF2-SHA256 を PASSWORD_PBKDF2_ITERATIONS 回 / 'scrypt' / 'argon2'（argon2-cffi が必要））
+# ログイン 1 回の CPU 時間はほぼハッシュ計算で決まる（python manage.py benchmark_login で計測）。
+# 方式・回数を変えても既存のハッシュはそのまま検証でき、次回ログイン時に新しい方式で保存し直される。
+# PASSWORD_PBKDF2_ITERATIONS は未設定なら None（Django の既定の回数。Django の更新に合わせて増える）。
+# Django の既定より少ない回数を設定すると、既存のハッシュも次回ログイン時にその回数へ下げて保存し直される
+PASSWORD_HASHER_PROFILE    = os.getenv('PASSWORD_HASHER_PROFILE', 'pbkdf2')
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ['PASSWORD_PBKDF2_ITERATIONS']) if os.getenv('PASSWORD_PBKDF2_ITERATIONS') else None
+PASSWORD_HASHER_PROFILES   = {
+    'pbkdf2': 'users.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+}
+PASSWORD_HASHERS = [PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]] + [
+    hasher for hasher in (
+        'users.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'django.contrib.auth.hashers.ScryptPasswordHasher',
+        'django.contrib.auth.hashers.Argon2PasswordHasher',
+        'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    )
+    if hasher != PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]
+]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -116,9 +165,112 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Cache（REDIS_URL があれば共有の Redis、なければプロセス内 LocMemCache）
+REDIS_URL = os.getenv('REDIS_URL')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    } if REDIS_URL else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# CACHES['default'] が全ワーカーで共有されているか（書き込みで進む変更カウンタ event_version の置き場所）。
+# False のとき、変更カウンタで失効させるプロセス内のキャッシュ（区間インデックス・イベント一覧・繰り返し予定）は使わず DB を読む。
+# 単一プロセスで運用する場合（runserver、ワーカー 1 つ）は REDIS_URL なしで True にしてよい
+SHARED_CACHE = os.getenv('SHARED_CACHE', 'True' if REDIS_URL else 'False') == 'True'
+
 # Anthropic API
 ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
 
+# AI 呼び出しのモデル階層（timeout はレイテンシの上限。超えると APIConnectionError 系の例外になる）
+AI_MODEL_TIERS = {
+    'fast' : {'model': os.getenv('AI_FAST_MODEL', 'claude-haiku-4-5-20251001'), 'timeout': float(os.getenv('AI_FAST_TIMEOUT', '10'))},
+    'smart': {'model': os.getenv('AI_SMART_MODEL', 'claude-sonnet-4-20250514'), 'timeout': float(os.getenv('AI_SMART_TIMEOUT', '30'))},
+}
+
+# タスクごとのモデル階層と max_tokens（階層は AI_TIER_<タスク名の大文字> で上書き可）
+# generate_conflict_messages の max_tokens は警告文 1 件あたり、parse_bulk_events は入力 1 行あたり
+AI_TASK_ROUTES = {
+    task: {'tier': os.getenv(f'AI_TIER_{task.upper()}', tier), 'max_tokens': max_tokens}
+    for task, tier, max_tokens in [
+        ('parse_natural_language',     'smart', 1000),
+        ('parse_period',               'fast',  500),
+        ('generate_conflict_message',  'fast',  200),
+        ('generate_conflict_messages', 'fast',  150),
+        ('parse_modify_command',       'smart', 600),
+        ('parse_unified_command',      'smart', 1200),
+        ('parse_bulk_events',          'smart', 150),
+    ]
+}
+
+# 応答を JSON として解析できなかった場合に再試行する階層
+AI_ESCALATION_TIER = 'smart'
+
+# AI 呼び出しごとのトークン数（入力 / キャッシュ読み込み / キャッシュ書き込み / 出力）を INFO で出力する
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'schedule.services.ai_service': {
+            'handlers': ['console'],
+            'level'   : os.getenv('AI_USAGE_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
+# AI 解析結果キャッシュ（'lru': プロセス内 LRU / 'django': CACHES[AI_CACHE_ALIAS] を共有）
+AI_CACHE_BACKEND     = os.getenv('AI_CACHE_BACKEND', 'lru')
+AI_CACHE_ALIAS       = 'default'
+AI_CACHE_MAX_ENTRIES = int(os.getenv('AI_CACHE_MAX_ENTRIES', '2048'))
+
+# 統合コマンドのローカル解析を採用する確信度の下限（これ未満は Claude で解析。1 より大きくすると常に Claude）
+LOCAL_PARSER_MIN_CONFIDENCE = float(os.getenv('LOCAL_PARSER_MIN_CONFIDENCE', '0.8'))
+
+# 複数行の一括追加（1 リクエストの最大行数 / AI 1 回の呼び出しで解析する行数）
+BULK_ADD_MAX_LINES   = int(os.getenv('BULK_ADD_MAX_LINES', '200'))
+BULK_ADD_CHUNK_LINES = int(os.getenv('BULK_ADD_CHUNK_LINES', '25'))
+
+# ICS インポート（bulk_create 1 回あたりの件数 / 重なりレポートに載せる組の上限）
+ICS_IMPORT_BATCH_SIZE   = int(os.getenv('ICS_IMPORT_BATCH_SIZE', '1000'))
+ICS_IMPORT_REPORT_LIMIT = int(os.getenv('ICS_IMPORT_REPORT_LIMIT', '100'))
+
+# イベント一覧の 1 ページの件数（既定 / リクエストの limit で指定できる上限）
+EVENT_PAGE_SIZE     = int(os.getenv('EVENT_PAGE_SIZE', '200'))
+EVENT_PAGE_MAX_SIZE = int(os.getenv('EVENT_PAGE_MAX_SIZE', '1000'))
+
+# イベント一覧（期間指定の取得結果）のキャッシュ（秒。0 で無効）
+# 書き込みで進む変更カウンタと同じ CACHES に置くため、SHARED_CACHE が False のときは使わない
+EVENT_LIST_CACHE_TIMEOUT = int(os.getenv('EVENT_LIST_CACHE_TIMEOUT', '300'))
+EVENT_LIST_CACHE_ALIAS   = 'default'
+
+# ユーザー設定の読み込みキャッシュ（'lru': プロセス内 / 'django': CACHES[USER_SETTINGS_CACHE_ALIAS] を共有）
+# 'lru' では設定の変更が他のワーカーに最長 USER_SETTINGS_CACHE_TIMEOUT 秒反映されない（0 でキャッシュしない）。
+# 既定は SHARED_CACHE なら 'django'、そうでなければキャッシュしない（毎回 DB を読む）
+USER_SETTINGS_CACHE_BACKEND     = os.getenv('USER_SETTINGS_CACHE_BACKEND', 'django' if SHARED_CACHE else 'lru')
+USER_SETTINGS_CACHE_TIMEOUT     = int(os.getenv('USER_SETTINGS_CACHE_TIMEOUT', '60' if SHARED_CACHE else '0'))
+USER_SETTINGS_CACHE_ALIAS       = 'default'
+USER_SETTINGS_CACHE_MAX_ENTRIES = int(os.getenv('USER_SETTINGS_CACHE_MAX_ENTRIES', '10000'))
+
+# 衝突チェック用の区間インデックスを保持するユーザー数（ワーカープロセスごと）
+INTERVAL_INDEX_MAX_USERS = int(os.getenv('INTERVAL_INDEX_MAX_USERS', '1000'))
+
+# 衝突チェックの方式（'interval_index': プロセス内の区間インデックス / 'sql': PostgreSQL の period && と CASE 分類）
+# 区間インデックスは他のワーカーでの書き込みを共有の変更カウンタで検知するため、既定では SHARED_CACHE のときだけ使う
+CONFLICT_DETECTION = os.getenv('CONFLICT_DETECTION', 'interval_index' if SHARED_CACHE else 'sql')
+
+# 繰り返し予定（EventSeries）
+# 展開結果のキャッシュ（(シリーズ, 期間) の組の数。ワーカープロセスごと）/ シリーズを保持するユーザー数
+RECURRENCE_CACHE_MAX_ENTRIES = int(os.getenv('RECURRENCE_CACHE_MAX_ENTRIES', '4096'))
+RECURRENCE_MAX_USERS         = int(os.getenv('RECURRENCE_MAX_USERS', '1000'))
+# COUNT の上限 / 追加時に既存の予定との衝突を確認する期間（初回から何日分の回を確認するか）
+RECURRENCE_MAX_COUNT         = int(os.getenv('RECURRENCE_MAX_COUNT', '1000'))
+RECURRENCE_CHECK_DAYS        = int(os.getenv('RECURRENCE_CHECK_DAYS', '90'))
+
 # Google OAuth
 GOOGLE_CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID', '')
 
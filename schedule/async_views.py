@@ -0,0 +1,164 @@
+import json
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from .serializers import EventCreateSerializer, EventListSerializer
+from .services.async_schedule_service import AsyncScheduleService
+from .streaming import ai_error_payload, sse_response
+
+# ASGI（settings.ASYNC_VIEWS=True）で使う非同期版ビュー。
+# DRF の APIView は非同期ハンドラに対応していないため Django の View で実装し、
+# リクエスト・レスポンスの形式とステータスコードは views.py の同名ビューに合わせる。
+
+async_schedule_service = AsyncScheduleService()
+
+
+def _json_body(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _ai_error_response(e):
+    payload, code = ai_error_payload(e)
+    return JsonResponse(payload, status=code)
+
+
+def _invalid_json_response():
+    return JsonResponse(
+        {'status': 'error', 'message': 'JSON 形式のリクエストボディを指定してください'},
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncAddEventView(View):
+    """イベント追加 API（非同期版）"""
+
+    http_method_names = ['post']
+
+    async def post(self, request):
+        data = _json_body(request)
+        if data is None:
+            return _invalid_json_response()
+
+        serializer = EventCreateSerializer(data=data)
+        if not serializer.is_valid():
+            return JsonResponse(
+                {'status': 'error', 'errors': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            result = await async_schedule_service.create_event(
+                user_id       = serializer.validated_data.get('user_id', 'default_user'),
+                natural_input = serializer.validated_data['input'],
+                force         = bool(data.get('force', False)),
+            )
+            return JsonResponse(result, status=status.HTTP_200_OK)
+        except Exception as e:
+            return _ai_error_response(e)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncGetEventsView(View):
+    """イベント取得 API（非同期版）"""
+
+    http_method_names = ['post']
+
+    async def post(self, request):
+        data = _json_body(request)
+        if data is None:
+            return _invalid_json_response()
+
+        serializer = EventListSerializer(data=data)
+        if not serializer.is_valid():
+            return JsonResponse(
+                {'status': 'error', 'errors': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            page = await async_schedule_service.get_events(
+                user_id     = serializer.validated_data.get('user_id', 'default_user'),
+                period_text = serializer.validated_data.get('period', '今日'),
+                cursor      = serializer.validated_data.get('cursor'),
+                limit       = serializer.validated_data.get('limit'),
+            )
+            return JsonResponse({'status': 'success', **page}, status=status.HTTP_200_OK)
+        except Exception as e:
+            return _ai_error_response(e)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncCommandView(View):
+    """統合コマンド API（非同期版）"""
+
+    http_method_names = ['post']
+
+    async def post(self, request):
+        data = _json_body(request)
+        if data is None:
+            return _invalid_json_response()
+
+        user_id = data.get('user_id', 'default_user')
+
+        # 強制追加（warning 確認後）
+        force_event = data.get('force_event')
+        if force_event is not None:
+            try:
+                result = await sync_to_async(async_schedule_service.force_add_event)(user_id, force_event)
+                return JsonResponse(result, status=status.HTTP_200_OK)
+            except Exception as e:
+                return JsonResponse(
+                    {'status': 'error', 'message': f'追加に失敗しました: {str(e)}'},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+
+        # 複数マッチ確定（update/delete 選択後）
+        confirm_event_id = data.get('confirm_event_id')
+        if confirm_event_id is not None:
+            try:
+                result = await sync_to_async(async_schedule_service.apply_modify_to_event)(
+                    event_id=confirm_event_id,
+                    user_id=user_id,
+                    intent=data.get('intent', 'update'),
+                    changes=data.get('changes', {}),
+                )
+                return JsonResponse(result, status=status.HTTP_200_OK)
+            except ValueError as e:
+                return JsonResponse(
+                    {'status': 'error', 'message': str(e)},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            except Exception as e:
+                return JsonResponse(
+                    {'status': 'error', 'message': f'操作に失敗しました: {str(e)}'},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+
+        # 通常フロー
+        natural_input = (data.get('input') or '').strip()
+        if not natural_input:
+            return JsonResponse(
+                {'status': 'error', 'message': '入力内容を指定してください'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # ストリーミングモード: 各段階の結果を Server-Sent Events で逐次返す
+        if data.get('stream'):
+            return sse_response(async_schedule_service.stream_command(user_id, natural_input))
+
+        try:
+            result = await async_schedule_service.execute_command(
+                user_id       = user_id,
+                natural_input = natural_input,
+            )
+            return JsonResponse(result, status=status.HTTP_200_OK)
+        except Exception as e:
+            return _ai_error_response(e)
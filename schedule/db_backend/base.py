@@ -0,0 +1,28 @@
+"""
+PostgreSQL バックエンド（django.db.backends.postgresql）に接続プールの計測を加えたもの。
+
+psycopg_pool は with pool.connection() を使った場合しか貸出時間を集計しないため、
+Django が getconn / putconn する箇所で借用待ち時間と貸出時間を計る（db_pool.pool_latency）。
+"""
+import time
+from django.db.backends.postgresql import base
+from schedule.services.db_pool import pool_latency
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    _checked_out_at = None
+
+    def get_new_connection(self, conn_params):
+        started    = time.perf_counter()
+        connection = super().get_new_connection(conn_params)
+        if self.pool:
+            self._checked_out_at = time.perf_counter()
+            pool_latency.observe('wait', self._checked_out_at - started)
+        return connection
+
+    def _close(self):
+        if self.pool and self.connection is not None and self._checked_out_at is not None:
+            pool_latency.observe('checkout', time.perf_counter() - self._checked_out_at)
+            self._checked_out_at = None
+        super()._close()
@@ -0,0 +1,94 @@
+import random
+import time
+from datetime import datetime, timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from schedule.models import Event
+from schedule.renderers import FastJSONRenderer
+from schedule.services.bulk_serializer import serialize_events
+from schedule.services.schedule_service import ScheduleService
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'イベント一覧の直列化（_event_to_dict + JSONRenderer）と高速版（serialize_events + FastJSONRenderer）の'
+        '処理時間を件数ごとに比較する（ダミーデータは実行後にロールバック）'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes',  type=int, nargs='+', default=[10_000, 100_000], help='比較する件数')
+        parser.add_argument('--repeat', type=int, default=3, help='各計測の繰り返し回数（最短時間を採用）')
+
+    def handle(self, *args, **options):
+        sizes   = sorted(options['sizes'])
+        results = []
+        try:
+            with transaction.atomic():
+                self._seed(sizes[-1])
+                for size in sizes:
+                    results.append(self._measure(size, options['repeat']))
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        self.stdout.write(f'{"件数":>8} {"":>10} {"取得+辞書化":>12} {"JSON":>10} {"合計":>10}')
+        for size, slow, fast in results:
+            for name, (rows_s, json_s) in (('従来', slow), ('高速版', fast)):
+                self.stdout.write(f'{size:>10} {name:>10} {rows_s * 1000:>13.1f}ms {json_s * 1000:>10.1f}ms {(rows_s + json_s) * 1000:>10.1f}ms')
+            speedup = sum(slow) / sum(fast)
+            self.stdout.write(self.style.SUCCESS(f'{size:>10} {"速度比":>10} {slow[0] / fast[0]:>14.1f}x {slow[1] / fast[1]:>11.1f}x {speedup:>11.1f}x'))
+
+    def _seed(self, rows):
+        self.stdout.write(f'{rows} 件のダミーイベントを投入中...')
+        tz   = timezone.get_current_timezone()
+        base = datetime(2024, 1, 1, tzinfo=tz)
+        rng  = random.Random(0)
+        buf  = []
+        for i in range(rows):
+            start = base + timedelta(minutes=30 * i)
+            buf.append(Event(
+                user_id        = 'benchmark_user',
+                title          = f'ダミー予定{i}',
+                start_datetime = start,
+                end_datetime   = start + timedelta(hours=1) if i % 5 else None,
+                priority       = rng.randint(1, 5),
+                category       = ['仕事'] if i % 3 == 0 else [],
+            ))
+            if len(buf) >= 10_000:
+                Event.objects.bulk_create(buf)
+                buf = []
+        if buf:
+            Event.objects.bulk_create(buf)
+
+    def _measure(self, size, repeat):
+        service = ScheduleService()
+        ids     = Event.objects.filter(user_id='benchmark_user').order_by('start_datetime', 'id').values_list('id', flat=True)
+        last    = ids[size - 1]
+        events  = Event.objects.filter(user_id='benchmark_user', id__lte=last).order_by('start_datetime')
+
+        slow_rows, slow_json, slow_data = self._time(
+            repeat, lambda: [service._event_to_dict(e) for e in events.all()], JSONRenderer())
+        fast_rows, fast_json, fast_data = self._time(
+            repeat, lambda: serialize_events(events.all()), FastJSONRenderer())
+
+        if slow_data != fast_data:
+            raise CommandError('serialize_events の結果が _event_to_dict と一致しません')
+        return size, (slow_rows, slow_json), (fast_rows, fast_json)
+
+    def _time(self, repeat, build, renderer):
+        rows_best = json_best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            data    = build()
+            middle  = time.perf_counter()
+            renderer.render({'status': 'success', 'events': data})
+            ended   = time.perf_counter()
+            rows_best = min(rows_best, middle - started)
+            json_best = min(json_best, ended - middle)
+        return rows_best, json_best, data
@@ -0,0 +1,134 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from schedule.services.ai_service import AIService
+from schedule.services.command_parser import LocalCommandParser
+from schedule.services.period_resolver import PeriodResolver
+
+
+DEFAULT_CORPUS = Path(__file__).resolve().parents[2] / 'corpus' / 'unified_commands.jsonl'
+
+# 意図ごとに一致を確認する項目（AIService.parse_unified_command の出力のうち処理に使うもの）
+FIELDS = {
+    'add'   : ['event_data.title', 'event_data.start_datetime', 'event_data.end_datetime',
+               'event_data.event_type', 'event_data.is_all_day'],
+    'search': ['period'],
+    'update': ['search.date', 'search.title_keyword',
+               'changes.title', 'changes.start_datetime', 'changes.end_datetime'],
+    'delete': ['search.date', 'search.title_keyword'],
+}
+
+
+class Command(BaseCommand):
+    help = (
+        '統合コマンドのローカル解析（LocalCommandParser）の精度をコーパスで評価する。'
+        '既定ではコーパスの expected（Claude の解析結果を想定した正解）と比較し、--llm で Claude に実際に問い合わせて比較する'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corpus',       default=str(DEFAULT_CORPUS), help='JSONL（input, now, expected[, duration]）')
+        parser.add_argument('--llm',          action='store_true', help='expected の代わりに Claude の解析結果と比較する（現在時刻で実行）')
+        parser.add_argument('--threshold',    type=float, default=None, help='採用する確信度の下限（既定: settings.LOCAL_PARSER_MIN_CONFIDENCE）')
+        parser.add_argument('--min-accuracy', type=float, default=None, help='採用分の正解率がこれ未満ならエラー終了する')
+        parser.add_argument('--verbose',      action='store_true', help='全件の結果を表示する')
+
+    def handle(self, *args, **options):
+        threshold = options['threshold']
+        if threshold is None:
+            threshold = settings.LOCAL_PARSER_MIN_CONFIDENCE
+
+        self.period_resolver = PeriodResolver()
+        parser     = LocalCommandParser(self.period_resolver)
+        ai_service = AIService() if options['llm'] else None
+
+        rows = self._load(options['corpus'])
+        accepted, rejected = [], []
+        field_hits = {}
+
+        for row in rows:
+            duration = row.get('duration', 1)
+            if ai_service:
+                now       = timezone.localtime()
+                reference = ai_service._request_unified_command(row['input'], duration)
+            else:
+                now       = timezone.make_aware(datetime.strptime(row['now'], '%Y-%m-%d %H:%M'))
+                reference = row['expected']
+
+            parsed  = parser.parse(row['input'], duration, now)
+            diffs   = self._diff(parsed.command, reference, now)
+            correct = not diffs
+            (accepted if parsed.confidence >= threshold else rejected).append((row, parsed, diffs))
+
+            if parsed.confidence >= threshold:
+                for field in ['intent'] + FIELDS.get(reference.get('intent'), []):
+                    hits = field_hits.setdefault(field, [0, 0])
+                    hits[0] += field not in diffs
+                    hits[1] += 1
+
+            if options['verbose'] or (parsed.confidence >= threshold and not correct):
+                mark = 'OK ' if correct else 'NG '
+                self.stdout.write(f'{mark} {parsed.confidence:.2f}  {row["input"]}')
+                for field, (local_value, reference_value) in diffs.items():
+                    self.stdout.write(f'       {field}: local={local_value!r} reference={reference_value!r}')
+
+        self._report(rows, accepted, rejected, field_hits, threshold, options['min_accuracy'])
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers
+    # ------------------------------------------------------------------ #
+
+    def _load(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError) as e:
+            raise CommandError(f'コーパスを読み込めません: {e}') from e
+
+    def _diff(self, local, reference, now):
+        """不一致の項目を {項目: (ローカル, 参照)} で返す。"""
+        diffs = {}
+        intent = reference.get('intent', 'unknown')
+        if local.get('intent') != intent:
+            return {'intent': (local.get('intent'), intent)}
+
+        for field in FIELDS.get(intent, []):
+            local_value     = self._get(local, field)
+            reference_value = self._get(reference, field)
+            if field == 'period':
+                # 期間は表記ではなく解決後の日付範囲で比較する
+                same = (self.period_resolver.resolve(local_value, now.date())
+                        == self.period_resolver.resolve(reference_value, now.date())
+                        or local_value == reference_value)
+            elif field.endswith('title') or field.endswith('title_keyword'):
+                same = (local_value or '').replace(' ', '') == (reference_value or '').replace(' ', '')
+            else:
+                same = local_value == reference_value
+            if not same:
+                diffs[field] = (local_value, reference_value)
+        return diffs
+
+    def _get(self, data, field):
+        for key in field.split('.'):
+            data = (data or {}).get(key)
+        return data
+
+    def _report(self, rows, accepted, rejected, field_hits, threshold, min_accuracy):
+        total          = len(rows)
+        accepted_ok    = sum(1 for _, _, diffs in accepted if not diffs)
+        rejected_ok    = sum(1 for _, _, diffs in rejected if not diffs)
+        coverage       = len(accepted) / total if total else 0.0
+        accuracy       = accepted_ok / len(accepted) if accepted else 1.0
+
+        self.stdout.write('')
+        self.stdout.write(f'確信度の閾値        : {threshold}')
+        self.stdout.write(f'ローカルで解析      : {len(accepted)} / {total} 件（{coverage:.0%}、この分の AI 呼び出しが不要）')
+        self.stdout.write(f'採用分の正解率      : {accepted_ok} / {len(accepted)} 件（{accuracy:.0%}）')
+        self.stdout.write(f'不採用分の正解数    : {rejected_ok} / {len(rejected)} 件（Claude に回した入力）')
+        for field, (hits, count) in field_hits.items():
+            self.stdout.write(f'  {field:<26} {hits} / {count}')
+
+        if min_accuracy is not None and accuracy < min_accuracy:
+            raise CommandError(f'採用分の正解率 {accuracy:.0%} が基準 {min_accuracy:.0%} を下回りました')
@@ -0,0 +1,41 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from schedule.services.ics_import import IcsFormatError, IcsImporter
+from schedule.services.schedule_service import ScheduleService
+
+
+class Command(BaseCommand):
+    help = 'iCalendar（.ics）ファイルの予定を取り込み、件数と重なりのレポートを表示する（AI 呼び出しなし）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='.ics ファイルのパス')
+        parser.add_argument('--user',       default='default_user', help='取り込み先の user_id')
+        parser.add_argument('--batch-size', type=int, default=None, help='bulk_create 1 回あたりの件数（既定: settings.ICS_IMPORT_BATCH_SIZE）')
+        parser.add_argument('--verbose',    action='store_true', help='重なりの組を表示する')
+
+    def handle(self, *args, **options):
+        importer = IcsImporter(ScheduleService(), batch_size=options['batch_size'])
+        started  = time.perf_counter()
+        try:
+            with open(options['path'], encoding='utf-8-sig', errors='replace', newline='') as f:
+                result = importer.run(options['user'], f)
+        except OSError as e:
+            raise CommandError(f'ファイルを読み込めません: {e}') from e
+        except IcsFormatError as e:
+            raise CommandError(str(e)) from e
+        elapsed = time.perf_counter() - started
+
+        counts   = result['counts']
+        overlaps = result['overlaps']
+        self.stdout.write(f'VEVENT              : {counts["vevents"]} 件（{elapsed:.2f} 秒）')
+        self.stdout.write(f'取り込み            : {counts["created"]} 件（繰り返し予定は初回のみ: {counts["recurring"]} 件）')
+        self.stdout.write(f'UID 重複でスキップ  : {counts["duplicate"]} 件')
+        self.stdout.write(f'取り込み対象外      : キャンセル {counts["cancelled"]} / 個別変更 {counts["overrides"]} / 解析不可 {counts["invalid"]}')
+        self.stdout.write(f'重なり              : conflict {overlaps["conflict"]} / warning {overlaps["warning"]}')
+        if options['verbose']:
+            for item in overlaps['items']:
+                event, other = item['event'], item['other']
+                self.stdout.write(f'  {item["status"]:<8} {event["start"]} {event["title"]}  ×  {other["start"]} {other["title"]}')
+            if overlaps['truncated']:
+                self.stdout.write('  …（settings.ICS_IMPORT_REPORT_LIMIT 件まで表示）')
+
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections
+from django.test import AsyncRequestFactory, RequestFactory
+from schedule import async_views, views
+from schedule.services.db_pool import pool_stats
+
+
+# 疑似 LLM の応答（統合コマンド: 検索。期間「今日」はローカルで解決されるため追加の AI 呼び出しはない）
+FAKE_REPLY = json.dumps({'intent': 'search', 'period': '今日'}, ensure_ascii=False)
+
+
+def _fake_message():
+    return SimpleNamespace(
+        content=[SimpleNamespace(text=FAKE_REPLY)],
+        usage=SimpleNamespace(input_tokens=0, output_tokens=0),
+    )
+
+
+class _SyncMessages:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def create(self, **kwargs):
+        time.sleep(self.latency)
+        return _fake_message()
+
+
+class _AsyncMessages:
+    def __init__(self, latency):
+        self.latency = latency
+
+    async def create(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        return _fake_message()
+
+
+class _BackendSampler(threading.Thread):
+    """実行中の PostgreSQL のクライアント接続数（自身の接続を除く）を一定間隔で数え、最大値を記録する。"""
+
+    SQL = (
+        "SELECT count(*) FROM pg_stat_activity "
+        "WHERE datname = current_database() AND backend_type = 'client backend' AND pid <> pg_backend_pid()"
+    )
+
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak     = 0
+        self._done    = threading.Event()
+
+    def run(self):
+        try:
+            with connection.cursor() as cursor:
+                while not self._done.is_set():
+                    cursor.execute(self.SQL)
+                    self.peak = max(self.peak, cursor.fetchone()[0])
+                    self._done.wait(self.interval)
+        finally:
+            connection.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self.join()
+
+
+class Command(BaseCommand):
+    help = (
+        '統合コマンド API の同期（WSGI）版と非同期（ASGI）版に同時リクエストを送り、スループットを比較する。'
+        'Claude の呼び出しは --latency 秒待つ疑似クライアントに置き換える（DB アクセスは実際に行う）'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests',    type=int,   default=500, help='各方式で送るリクエスト数')
+        parser.add_argument('--concurrency', type=int,   default=500, help='非同期版の同時実行数')
+        parser.add_argument('--threads',     type=int,   default=8,   help='同期版のワーカースレッド数（WSGI サーバーのスレッド数に相当）')
+        parser.add_argument('--latency',     type=float, default=1.0, help='疑似 LLM の応答時間（秒）')
+        parser.add_argument('--user-id',     default='loadtest_user', help='検索対象のユーザー ID')
+
+    def handle(self, *args, **options):
+        n = options['requests']
+        # 入力ごとに文言を変え、AI 解析結果キャッシュに当たらないようにする
+        bodies = [
+            {'user_id': options['user_id'], 'input': f'今日の予定を教えて（負荷試験 {i}）'}
+            for i in range(n)
+        ]
+
+        sync_service  = views.schedule_service
+        async_service = async_views.async_schedule_service
+        sync_client, async_client = sync_service.ai_service.client, async_service.ai_service.client
+        sync_service.ai_service.client  = SimpleNamespace(messages=_SyncMessages(options['latency']))
+        async_service.ai_service.client = SimpleNamespace(messages=_AsyncMessages(options['latency']))
+        try:
+            sync_result  = self._run_sync(bodies, options['threads'])
+            async_result = asyncio.run(self._run_async(bodies, options['concurrency']))
+        finally:
+            sync_service.ai_service.client  = sync_client
+            async_service.ai_service.client = async_client
+            connections.close_all()
+
+        self._report('WSGI (sync)',  sync_result)
+        self._report('ASGI (async)', async_result)
+        self.stdout.write(f'接続プール: {pool_stats() or "不使用（DB_POOL=False）"}')
+        speedup = async_result['throughput'] / sync_result['throughput']
+        self.stdout.write(self.style.SUCCESS(f'スループット比 (ASGI / WSGI): {speedup:.1f} 倍'))
+
+    def _run_sync(self, bodies, threads):
+        factory = RequestFactory()
+        view    = views.CommandView.as_view()
+
+        def call(body):
+            # WSGI ハンドラと同じく、リクエストの前後で接続を整理する（プール使用時はここで返却される）
+            close_old_connections()
+            request  = factory.post('/api/schedule/command/', body, content_type='application/json')
+            response = view(request)
+            response.render()
+            close_old_connections()
+            return response.status_code, time.perf_counter() - started
+
+        with _BackendSampler() as sampler:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                results = list(pool.map(call, bodies))
+            elapsed = time.perf_counter() - started
+        return self._summarize(results, elapsed, sampler.peak)
+
+    async def _run_async(self, bodies, concurrency):
+        factory   = AsyncRequestFactory()
+        view      = async_views.AsyncCommandView.as_view()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def call(body):
+            async with semaphore:
+                request  = factory.post('/api/schedule/command/', body, content_type='application/json')
+                response = await view(request)
+                return response.status_code, time.perf_counter() - started
+
+        with _BackendSampler() as sampler:
+            started = time.perf_counter()
+            results = await asyncio.gather(*(call(body) for body in bodies))
+            elapsed = time.perf_counter() - started
+        return self._summarize(results, elapsed, sampler.peak)
+
+    def _summarize(self, results, elapsed, backends):
+        # レイテンシは全リクエストを同時に投入した時点からの応答時間（ワーカー待ちを含む）
+        failed = [code for code, _ in results if code != 200]
+        if failed:
+            raise CommandError(f'{len(failed)} 件のリクエストが失敗しました（ステータス: {sorted(set(failed))}）')
+
+        latencies = sorted(latency for _, latency in results)
+        return {
+            'requests'  : len(results),
+            'elapsed'   : elapsed,
+            'throughput': len(results) / elapsed,
+            'p50'       : statistics.median(latencies),
+            'p95'       : latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            'backends'  : backends,
+        }
+
+    def _report(self, label, result):
+        self.stdout.write(
+            f'{label:<13} {result["requests"]} 件 / {result["elapsed"]:.2f} 秒  '
+            f'{result["throughput"]:.1f} req/s  p50 {result["p50"] * 1000:.0f} ms  p95 {result["p95"] * 1000:.0f} ms  '
+            f'DB 接続 最大 {result["backends"]}'
+        )
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0003_usersettings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersettings',
+            name='ai_warning_message',
+            field=models.BooleanField(default=False),
+        ),
+    ]
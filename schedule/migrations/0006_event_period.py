@@ -0,0 +1,35 @@
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+import schedule.models
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0005_event_user_datetime_indexes'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddField(
+            model_name='event',
+            name='period',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Case(
+                    models.When(
+                        end_datetime__gt=models.F('start_datetime'),
+                        then=schedule.models.TstzRange('start_datetime', 'end_datetime', models.Value('[)')),
+                    ),
+                    default=schedule.models.TstzRange('start_datetime', 'start_datetime', models.Value('[]')),
+                ),
+                output_field=django.contrib.postgres.fields.ranges.DateTimeRangeField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=django.contrib.postgres.indexes.GistIndex(fields=['user_id', 'period'], name='events_user_period_gist'),
+        ),
+    ]
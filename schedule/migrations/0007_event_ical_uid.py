@@ -0,0 +1,20 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0006_event_period'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='ical_uid',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='iCalendar UID'),
+        ),
+        migrations.AddConstraint(
+            model_name='event',
+            constraint=models.UniqueConstraint(condition=models.Q(('ical_uid', ''), _negated=True), fields=('user_id', 'ical_uid'), name='events_user_ical_uid_uniq'),
+        ),
+    ]
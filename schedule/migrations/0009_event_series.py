@@ -0,0 +1,42 @@
+import django.contrib.postgres.fields
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.indexes
+import schedule.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedule', '0008_event_user_start_idx_include_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.CharField(default='default_user', max_length=100)),
+                ('title', models.CharField(max_length=200, verbose_name='タイトル')),
+                ('dtstart', models.DateTimeField(verbose_name='初回の開始日時')),
+                ('duration', models.DurationField(blank=True, null=True, verbose_name='所要時間')),
+                ('rrule', models.CharField(max_length=200, verbose_name='繰り返しルール')),
+                ('series_end', models.DateTimeField(blank=True, null=True, verbose_name='最終回の終了日時')),
+                ('exdates', django.contrib.postgres.fields.ArrayField(base_field=models.DateTimeField(), blank=True, default=list, size=None, verbose_name='除外日時')),
+                ('event_type', models.CharField(choices=[('activity', 'アクティビティ'), ('block', 'ブロック期間'), ('deadline', '締切')], default='activity', max_length=20, verbose_name='種別')),
+                ('priority', models.IntegerField(choices=[(1, '最重要'), (2, '重要'), (3, '普通'), (4, '低'), (5, '最低')], default=3, verbose_name='優先度')),
+                ('is_all_day', models.BooleanField(default=False, verbose_name='終日イベント')),
+                ('category', models.JSONField(blank=True, default=list, verbose_name='カテゴリ')),
+                ('period', models.GeneratedField(db_persist=True, expression=schedule.models.TstzRange('dtstart', 'series_end', models.Value('[]')), output_field=django.contrib.postgres.fields.ranges.DateTimeRangeField())),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='作成日時')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新日時')),
+            ],
+            options={
+                'verbose_name': '繰り返し予定',
+                'verbose_name_plural': '繰り返し予定',
+                'db_table': 'event_series',
+                'ordering': ['dtstart'],
+                'indexes': [django.contrib.postgres.indexes.GistIndex(fields=['user_id', 'period'], name='event_series_user_period_gist')],
+            },
+        ),
+    ]
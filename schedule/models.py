@@ -1,5 +1,13 @@
+from django.contrib.postgres.fields import ArrayField, DateTimeRangeField
+from django.contrib.postgres.indexes import GistIndex
 from django.db import models
 
+
+class TstzRange(models.Func):
+    function     = 'TSTZRANGE'
+    output_field = DateTimeRangeField()
+
+
 class Event(models.Model):
     
     EVENT_TYPE_CHOICES = [
@@ -36,6 +44,22 @@ class Event(models.Model):
     # 複数カテゴリに変更
     category = models.JSONField(default=list, blank=True, verbose_name='カテゴリ')
     
+    # 衝突検知用の期間（DB 側で生成）。終了なし・長さ 0 の予定は開始時刻の 1 点として扱う
+    period = models.GeneratedField(
+        expression=models.Case(
+            models.When(
+                end_datetime__gt=models.F('start_datetime'),
+                then=TstzRange('start_datetime', 'end_datetime', models.Value('[)')),
+            ),
+            default=TstzRange('start_datetime', 'start_datetime', models.Value('[]')),
+        ),
+        output_field=DateTimeRangeField(),
+        db_persist=True,
+    )
+
+    # ICS インポート元の UID（同じ予定の重複インポート防止。AI 入力の予定は空文字）
+    ical_uid = models.CharField(max_length=255, blank=True, default='', verbose_name='iCalendar UID')
+
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='作成日時')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新日時')
     
@@ -44,11 +68,80 @@ class Event(models.Model):
         ordering = ['start_datetime']
         verbose_name = 'イベント'
         verbose_name_plural = 'イベント'
+        indexes = [
+            # 期間検索・衝突チェック（user_id + 開始/終了日時の範囲条件）用
+            # updated_at を含め、一覧の ETag（件数 + 最終更新日時）をインデックスのみで求められるようにする
+            models.Index(fields=['user_id', 'start_datetime'], include=['updated_at'], name='events_user_start_idx'),
+            models.Index(fields=['user_id', 'end_datetime'],   name='events_user_end_idx'),
+            # user_id + period && 範囲 の重なり検索用（btree_gist 拡張が必要）
+            GistIndex(fields=['user_id', 'period'], name='events_user_period_gist'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user_id', 'ical_uid'],
+                condition=~models.Q(ical_uid=''),
+                name='events_user_ical_uid_uniq',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.title} ({self.start_datetime})"
 
 
+class EventSeries(models.Model):
+    """
+    繰り返し予定（毎週の授業・部活など）。シリーズごとに 1 行だけ保存し、
+    各回は参照された期間の分だけ展開する（schedule/services/recurrence.py）。
+    """
+
+    user_id = models.CharField(max_length=100, default='default_user')
+    title = models.CharField(max_length=200, verbose_name='タイトル')
+    dtstart = models.DateTimeField(verbose_name='初回の開始日時')
+    # 各回の長さ（終了なしの予定は null）
+    duration = models.DurationField(null=True, blank=True, verbose_name='所要時間')
+    # RFC 5545 の RRULE のサブセット（例: FREQ=WEEKLY;BYDAY=MO,WE;COUNT=20）
+    rrule = models.CharField(max_length=200, verbose_name='繰り返しルール')
+    # 最終回の終了日時（COUNT / UNTIL から保存時に求める。無期限は null）
+    series_end = models.DateTimeField(null=True, blank=True, verbose_name='最終回の終了日時')
+    # 取り消した回の（元の）開始日時。個別に変更した回は Event に切り出したうえでここに加える
+    exdates = ArrayField(models.DateTimeField(), default=list, blank=True, verbose_name='除外日時')
+    event_type = models.CharField(
+        max_length=20,
+        choices=Event.EVENT_TYPE_CHOICES,
+        default='activity',
+        verbose_name='種別'
+    )
+    priority = models.IntegerField(
+        choices=Event.PRIORITY_CHOICES,
+        default=3,
+        verbose_name='優先度'
+    )
+    is_all_day = models.BooleanField(default=False, verbose_name='終日イベント')
+    category = models.JSONField(default=list, blank=True, verbose_name='カテゴリ')
+
+    # 初回の開始から最終回の終了まで（無期限は上限なし）。期間と重なるシリーズの絞り込み用
+    period = models.GeneratedField(
+        expression=TstzRange('dtstart', 'series_end', models.Value('[]')),
+        output_field=DateTimeRangeField(),
+        db_persist=True,
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='作成日時')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新日時')
+
+    class Meta:
+        db_table = 'event_series'
+        ordering = ['dtstart']
+        verbose_name = '繰り返し予定'
+        verbose_name_plural = '繰り返し予定'
+        indexes = [
+            GistIndex(fields=['user_id', 'period'], name='event_series_user_period_gist'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.rrule})"
+
+
 class UserSettings(models.Model):
 
     WARN_CHOICES = [
@@ -60,6 +153,7 @@ class UserSettings(models.Model):
     user_id                     = models.CharField(max_length=100, unique=True, default='default_user')
     default_duration_hours      = models.IntegerField(default=1)
     warning_level               = models.CharField(max_length=20, choices=WARN_CHOICES, default='standard')
+    ai_warning_message          = models.BooleanField(default=False)
     remind_minutes_before       = models.IntegerField(null=True, blank=True)
     remind_day_before           = models.BooleanField(default=False)
     remind_days_before_deadline = models.IntegerField(null=True, blank=True)
@@ -75,6 +169,7 @@ class UserSettings(models.Model):
             'user_id'                    : self.user_id,
             'default_duration_hours'     : self.default_duration_hours,
             'warning_level'              : self.warning_level,
+            'ai_warning_message'         : self.ai_warning_message,
             'remind_minutes_before'      : self.remind_minutes_before,
             'remind_day_before'          : self.remind_day_before,
             'remind_days_before_deadline': self.remind_days_before_deadline,
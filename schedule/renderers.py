@@ -0,0 +1,20 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson がなければ DRF 標準の JSONRenderer と同じ出力にする
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    orjson でエンコードする JSONRenderer（イベント一覧など件数の多い応答用）。
+    orjson が使えない場合と、Accept ヘッダで indent を指定された場合は標準の JSONRenderer に任せる。
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=self.encoder_class().default, option=orjson.OPT_NON_STR_KEYS)
@@ -1,5 +1,9 @@
+from datetime import timedelta
+from django.conf import settings
 from rest_framework import serializers
 from .models import Event
+from .services.pagination import decode_cursor
+from .services.recurrence import parse_rrule
 
 class EventSerializer(serializers.ModelSerializer):
     """イベントシリアライザー"""
@@ -49,7 +53,67 @@ class EventCreateSerializer(serializers.Serializer):
     )
 
 
-class EventListSerializer(serializers.Serializer):
+class BulkAddSerializer(serializers.Serializer):
+    """複数行一括追加用シリアライザー"""
+
+    input = serializers.CharField(
+        max_length=20000,
+        help_text="1 行に 1 件の予定を書いた複数行の入力"
+    )
+    force = serializers.BooleanField(
+        default=False,
+        required=False,
+        help_text="true の場合、warning の行も追加する（conflict の行は追加しない）"
+    )
+    user_id = serializers.CharField(
+        max_length=100,
+        default='default_user',
+        required=False
+    )
+
+    def validate_input(self, value):
+        lines = [line for line in value.splitlines() if line.strip()]
+        if len(lines) > settings.BULK_ADD_MAX_LINES:
+            raise serializers.ValidationError(f'一度に追加できるのは {settings.BULK_ADD_MAX_LINES} 行までです')
+        return value
+
+
+class IcsImportSerializer(serializers.Serializer):
+    """ICS インポート用シリアライザー"""
+
+    file = serializers.FileField(
+        help_text="iCalendar ファイル（.ics、Google カレンダー等のエクスポート）"
+    )
+    user_id = serializers.CharField(
+        max_length=100,
+        default='default_user',
+        required=False
+    )
+
+
+class EventPageSerializer(serializers.Serializer):
+    """イベント一覧のページ指定（前のページの next_cursor と 1 ページの件数）"""
+
+    cursor = serializers.CharField(
+        max_length=200,
+        required=False,
+        help_text="前のページの next_cursor（省略時は先頭から）"
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=settings.EVENT_PAGE_MAX_SIZE,
+        required=False,
+        help_text="1 ページの件数（既定: settings.EVENT_PAGE_SIZE）"
+    )
+
+    def validate_cursor(self, value):
+        try:
+            return decode_cursor(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+
+
+class EventListSerializer(EventPageSerializer):
     """イベント取得用シリアライザー"""
     
     period = serializers.CharField(
@@ -61,4 +125,119 @@ class EventListSerializer(serializers.Serializer):
         max_length=100,
         default='default_user',
         required=False
-    )
\ No newline at end of file
+    )
+
+
+class EventRangeSerializer(EventPageSerializer):
+    """期間（ISO 形式）指定のイベント取得用シリアライザー"""
+
+    DATETIME_FORMATS = ['iso-8601', '%Y-%m-%d', '%Y-%m-%d %H:%M']
+
+    start = serializers.DateTimeField(
+        input_formats=DATETIME_FORMATS,
+        help_text="開始日時（例: 2026-03-01, 2026-03-01T09:00）"
+    )
+    end = serializers.DateTimeField(
+        input_formats=DATETIME_FORMATS,
+        help_text="終了日時（日付のみの場合はその日の終わりまでを含む）"
+    )
+    type = serializers.ChoiceField(
+        choices=Event.EVENT_TYPE_CHOICES,
+        required=False
+    )
+    priority = serializers.ChoiceField(
+        choices=Event.PRIORITY_CHOICES,
+        required=False
+    )
+    category = serializers.CharField(
+        max_length=50,
+        required=False
+    )
+    user_id = serializers.CharField(
+        max_length=100,
+        default='default_user',
+        required=False
+    )
+
+    def validate(self, attrs):
+        # 日付のみの終了指定は翌日 0 時（半開区間の上端）に変換する
+        raw_end = str(self.initial_data.get('end', ''))
+        if len(raw_end) == 10:
+            attrs['end'] = attrs['end'] + timedelta(days=1)
+
+        if attrs['start'] >= attrs['end']:
+            raise serializers.ValidationError('end は start より後の日時を指定してください')
+        return attrs
+
+
+class MonthSummarySerializer(serializers.Serializer):
+    """月間ビューの日別サマリー取得用シリアライザー"""
+
+    month = serializers.RegexField(
+        r'^\d{4}-(0[1-9]|1[0-2])$',
+        help_text="対象の月（例: 2026-03）"
+    )
+    user_id = serializers.CharField(
+        max_length=100,
+        default='default_user',
+        required=False
+    )
+
+    def validate_month(self, value):
+        year, month = value.split('-')
+        return int(year), int(month)
+
+
+class SeriesCreateSerializer(serializers.Serializer):
+    """繰り返し予定の作成用シリアライザー（AI 解析なし）"""
+
+    DATETIME_RE = r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}$'
+
+    title = serializers.CharField(max_length=200)
+    start_datetime = serializers.RegexField(
+        DATETIME_RE,
+        help_text="初回の開始日時（例: 2026-04-06 10:00）"
+    )
+    end_datetime = serializers.RegexField(
+        DATETIME_RE,
+        required=False,
+        allow_null=True,
+        help_text="初回の終了日時（各回の長さになる。省略時は終了なし）"
+    )
+    rrule = serializers.CharField(
+        max_length=200,
+        help_text="RRULE（例: FREQ=WEEKLY;BYDAY=MO,WE;COUNT=20）"
+    )
+    event_type = serializers.ChoiceField(
+        choices=Event.EVENT_TYPE_CHOICES,
+        default='activity',
+        required=False
+    )
+    priority = serializers.ChoiceField(
+        choices=Event.PRIORITY_CHOICES,
+        default=3,
+        required=False
+    )
+    is_all_day = serializers.BooleanField(default=False, required=False)
+    category = serializers.ListField(
+        child=serializers.CharField(max_length=50),
+        default=list,
+        required=False
+    )
+    force = serializers.BooleanField(
+        default=False,
+        required=False,
+        help_text="true の場合、衝突チェックを行わずに作成する"
+    )
+    user_id = serializers.CharField(
+        max_length=100,
+        default='default_user',
+        required=False
+    )
+
+    def validate_rrule(self, value):
+        try:
+            parse_rrule(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return value
@@ -0,0 +1,142 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, time as dtime, timedelta
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from schedule.services.metrics import HitCounter
+
+
+class LRUCacheBackend:
+    """プロセス内 LRU キャッシュ（ワーカーごとに独立）"""
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._lock       = threading.Lock()
+        self._data       = OrderedDict()   # key -> (expires_at, value)
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, copy.deepcopy(value))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class DjangoCacheBackend:
+    """
+    Django のキャッシュフレームワークを使う共有バックエンド。
+    本番では Redis 等（settings.CACHES）を指定し、ローカルでは LocMemCache が代わりを務める。
+    """
+
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value, timeout):
+        self.cache.set(key, value, timeout)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    def clear(self):
+        self.cache.clear()
+
+
+def get_default_backend():
+    """settings.AI_CACHE_BACKEND に応じたバックエンドを返す。"""
+    if getattr(settings, 'AI_CACHE_BACKEND', 'lru') == 'django':
+        return DjangoCacheBackend(getattr(settings, 'AI_CACHE_ALIAS', 'default'))
+    return LRUCacheBackend(getattr(settings, 'AI_CACHE_MAX_ENTRIES', 2048))
+
+
+class AIResponseCache:
+    """
+    AI 解析結果のキャッシュ。
+
+    キーは (タスク名, プロンプトバージョン, 正規化した入力, 日付/時間バケット, 追加パラメータ)。
+    バケットが切り替わる時点（日単位なら Asia/Tokyo の 0 時）でエントリが失効する。
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or get_default_backend()
+        self.stats   = HitCounter()
+
+    def fetch(self, task, version, text, compute, granularity='day', extra=()):
+        """
+        キャッシュにあればその値を、なければ compute() の結果を保存して返す。
+        granularity:
+            'day'    – 日付が変わるまで有効（期間指定など）
+            'hour'   – 時刻が変わるまで有効（「8時」の午前/午後判定など現在時刻に依存する解析）
+            'minute' – 分が変わるまで有効（「30分後」「今から」など現在時刻からの相対指定を含む解析）
+        """
+        key, timeout, value = self._lookup(task, version, text, granularity, extra)
+        if value is None:
+            value = compute()
+            self.backend.set(key, value, timeout)
+        return value
+
+    async def afetch(self, task, version, text, compute, granularity='day', extra=()):
+        """fetch の非同期版（compute はコルーチン関数）。"""
+        key, timeout, value = self._lookup(task, version, text, granularity, extra)
+        if value is None:
+            value = await compute()
+            self.backend.set(key, value, timeout)
+        return value
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers
+    # ------------------------------------------------------------------ #
+
+    def _lookup(self, task, version, text, granularity, extra):
+        """キャッシュキー・有効期限（秒）・キャッシュ済みの値（なければ None）を返す。"""
+        now = timezone.localtime()
+        bucket, expires_at = self._bucket(now, granularity)
+        key     = self._make_key(task, version, text, bucket, extra)
+        timeout = max(1, int((expires_at - now).total_seconds()))
+
+        value = self.backend.get(key)
+        self.stats.incr(f'{task}.hit' if value is not None else f'{task}.miss')
+        return key, timeout, value
+
+    def _bucket(self, now, granularity):
+        midnight = datetime.combine(now.date() + timedelta(days=1), dtime.min, tzinfo=now.tzinfo)
+        if granularity == 'minute':
+            next_minute = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+            return now.strftime('%Y-%m-%d %H:%M'), min(next_minute, midnight)
+        if granularity == 'hour':
+            next_hour = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+            return now.strftime('%Y-%m-%d %H'), min(next_hour, midnight)
+        return now.strftime('%Y-%m-%d'), midnight
+
+    def _make_key(self, task, version, text, bucket, extra):
+        normalized = ' '.join(unicodedata.normalize('NFKC', text or '').split())
+        raw = json.dumps([task, version, normalized, bucket, list(extra)], ensure_ascii=False)
+        return 'ai:' + hashlib.sha256(raw.encode('utf-8')).hexdigest()
@@ -1,140 +1,161 @@
 import anthropic
 import json
+import logging
+import re
+import time
 from django.conf import settings
 from django.utils import timezone
+from schedule.services import prompts
+from schedule.services.ai_cache import AIResponseCache
+from schedule.services.command_parser import DATE_RE, LocalCommandParser
+from schedule.services.db_pool import release_connection
+from schedule.services.metrics import HitCounter, LatencyStats, TokenUsage
+from schedule.services.model_router import ModelRouter
+from schedule.services.period_resolver import PeriodResolver
+
+logger = logging.getLogger(__name__)
+
+# プロンプトを変更したら番号を上げる（古いキャッシュを参照しないため）
+PROMPT_VERSIONS = {
+    'parse_period'         : 3,
+    'parse_unified_command': 4,
+}
+
+# 現在時刻からの相対指定（「30分後」「2時間後」「今から」など）。結果の日時が分単位で変わる
+RELATIVE_TIME_RE = re.compile(r'[0-9０-９一二三四五六七八九十半]+\s*(?:分|時間)(?:後|ご|経ったら|たったら)|今から|いまから|今すぐ|いますぐ|これから')
+
+class MessageArrayScanner:
+    """
+    {"messages": ["...", ...]} 形式のストリーム応答から、閉じ終わった警告文を順に取り出す。
+    feed() に受信したテキスト断片を渡すと、新たに完成した文字列のリストを返す。
+    """
+
+    _ARRAY_START = re.compile(r'"messages"\s*:\s*\[')
+    _SEPARATOR   = re.compile(r'[\s,]*')
+    _decoder     = json.JSONDecoder()
+
+    def __init__(self):
+        self.buffer = ''
+        self.pos    = None   # 配列内で次に読む位置（配列の開始前は None）
+        self.count  = 0
+
+    def feed(self, text):
+        self.buffer += text
+        if self.pos is None:
+            match = self._ARRAY_START.search(self.buffer)
+            if match is None:
+                return []
+            self.pos = match.end()
+
+        found = []
+        while True:
+            pos = self._SEPARATOR.match(self.buffer, self.pos).end()
+            if pos >= len(self.buffer) or self.buffer[pos] != '"':
+                break
+            try:
+                value, self.pos = self._decoder.raw_decode(self.buffer, pos)
+            except json.JSONDecodeError:
+                break   # 文字列がまだ閉じていない
+            found.append(value)
+            self.count += 1
+        return found
+
 
 class AIService:
     """AI解析サービス"""
     
-    def __init__(self):
-        self.client = anthropic.Anthropic(
+    def __init__(self, cache=None):
+        self.client          = self._make_client()
+        self.router          = ModelRouter()
+        self.period_resolver = PeriodResolver()
+        self.period_stats    = HitCounter('local', 'llm')
+        self.command_parser  = LocalCommandParser(self.period_resolver)
+        self.command_stats   = HitCounter('local', 'llm')
+        self.token_usage     = TokenUsage()
+        self.latency         = LatencyStats()
+        self.escalations     = HitCounter()
+        self.cache           = cache or AIResponseCache()
+        self.uncached_models = set()   # プロンプトキャッシュが効かなかったモデル（警告は 1 回だけ）
+
+    def _make_client(self):
+        return anthropic.Anthropic(
             api_key=settings.ANTHROPIC_API_KEY
         )
-    
-    def parse_natural_language(self, natural_input, default_duration_hours=1):
-        current_time = timezone.now().strftime('%Y-%m-%d %H:%M')
 
-        message = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=1000,
-            messages=[{
-                "role": "user",
-                "content": f"""以下の自然言語入力を解析して、JSON形式で予定情報を抽出してください。
-
-入力: {natural_input}
-現在時刻: {current_time}
+    def parse_natural_language(self, natural_input, default_duration_hours=1):
+        return self._create_json('parse_natural_language', self._natural_language_request(natural_input, default_duration_hours))
 
-以下の形式で返してください:
-{{
-    "title": "予定のタイトル",
-    "start_datetime": "YYYY-MM-DD HH:MM",
-    "end_datetime": "YYYY-MM-DD HH:MM",
-    "event_type": "activity",
-    "priority": 3,
-    "is_all_day": false,
-    "category": ["カテゴリ1", "カテゴリ2"]
-}}
-
-注意事項:
-- start_datetimeは必須
-- end_datetimeが不明な場合はstart_datetimeの{default_duration_hours}時間後にしてください
-- event_typeは以下のいずれか:
-  * "activity": 時間指定の予定(会議、デートなど)
-  * "block": 期間予定(合宿、テスト期間など)
-  * "deadline": 締切
-- priorityは1(最重要)〜5(最低)の整数
-- is_all_dayは終日イベントの場合true、時間指定の場合false
-- categoryは予定に関連するカテゴリを複数の配列で返してください
-  例: "テスト勉強" → ["テスト", "勉強"]
-  例: "会議" → ["会議"]
-  例: "合宿" → ["合宿", "宿泊"]
-
-
-判断基準:
-- 「終日」「一日中」などのキーワードがあればis_all_day=true
-- 「〜期間」「合宿」「〜から〜まで」などの複数日にまたがる予定はevent_type="block"かつis_all_day=true
-- event_type="block"の場合、start_datetimeは開始日の00:00、end_datetimeは終了日の23:59にしてください
-- 明確な開始・終了時刻があればevent_type="activity"
-
-時刻の解釈ルール（重要）:
-- 「8時」「9時」など1〜12の時刻で午前/午後が明示されていない場合:
-  * その時刻（午前）が現在時刻よりも過去になる場合は、午後（+12時間）として解釈する
-  * 例: 現在15:00で「今日8時に会議」→ 午前8時は既に過去 → 20:00（午後8時）として解釈
-  * 例: 現在7:00で「今日8時に会議」→ 午前8時はまだ未来 → 08:00（午前8時）として解釈
-- 「朝」「午前」「am」が含まれる場合は午前として解釈する
-- 「夜」「晩」「夕方」「午後」「pm」が含まれる場合は午後として解釈する
-- 明日以降の日付が指定された場合は、上記の「現在時刻より過去」ルールは適用せず、文脈で判断する
-
-JSONのみを返してください。説明文は不要です。"""
-            }]
-        )
-        
-        response_text = message.content[0].text
-        return self._extract_json(response_text)
-    
     def parse_period(self, period_text):
-        current_time = timezone.now().strftime('%Y-%m-%d %H:%M')
-        
-        message = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=500,
-            messages=[{
-                "role": "user",
-                "content": f"""「{period_text}」という期間指定を日時範囲に変換してください。
-現在: {current_time}
-
-以下の形式で返してください:
-{{
-    "start": "YYYY-MM-DD 00:00",
-    "end": "YYYY-MM-DD 23:59"
-}}
-
-例:
-- "今日" → 今日の0時から23時59分
-- "明日" → 明日の0時から23時59分
-- "今週" → 今週月曜0時から日曜23時59分
-
-JSONのみを返してください。"""
-            }]
+        # 定型表現はローカルで即時に解決し、解釈できない場合のみ AI に問い合わせる
+        range_data = self.period_resolver.resolve(period_text)
+        if range_data is not None:
+            self.period_stats.incr('local')
+            return range_data
+
+        return self.cache.fetch(
+            'parse_period',
+            PROMPT_VERSIONS['parse_period'],
+            period_text,
+            lambda: self._request_period(period_text),
         )
-        
-        response_text = message.content[0].text
-        return self._extract_json(response_text)
-    
+
+    def _request_period(self, period_text):
+        self.period_stats.incr('llm')
+        return self._create_json('parse_period', self._period_request(period_text))
+
     def generate_conflict_message(self, new_event, existing_event):
-        message = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=200,
-            messages=[{
-                "role": "user",
-                "content": f"""以下の2つの予定が重複しています。適切な警告メッセージを生成してください。
+        return self._create('generate_conflict_message', self._conflict_message_request(new_event, existing_event)).strip()
 
-新しい予定:
-- タイトル: {new_event['title']}
-- 時間: {new_event['start']} 〜 {new_event.get('end', '未定')}
-- 種別: {new_event['type']}
-- 終日: {new_event.get('is_all_day', False)}
-- カテゴリ: {new_event.get('category', 'なし')}
+    def generate_conflict_messages(self, new_event, existing_events):
+        """
+        複数の重複予定に対する警告メッセージを 1 回の AI 呼び出しでまとめて生成する。
+        Returns:
+            existing_events と同じ順序の警告文リスト
+        バッチ応答が不正な場合のみ、1 件ずつ generate_conflict_message で生成し直す。
+        """
+        if not existing_events:
+            return []
+        if len(existing_events) == 1:
+            return [self.generate_conflict_message(new_event, existing_events[0])]
+
+        response_text = self._create('generate_conflict_messages', self._conflict_messages_request(new_event, existing_events))
+        messages      = self._parse_conflict_messages(response_text, len(existing_events))
+        if messages is None:
+            return [self.generate_conflict_message(new_event, e) for e in existing_events]
+        return messages
+
+    def stream_conflict_messages(self, new_event, existing_events):
+        """
+        generate_conflict_messages のストリーミング版。
+        バッチ応答を逐次受信し、警告文が 1 件完成するごとに (index, message) を返す。
+        応答が途中で崩れた・件数が足りない場合は、残りを 1 件ずつ生成する。
+        """
+        if len(existing_events) == 1:
+            yield 0, self.generate_conflict_message(new_event, existing_events[0])
+            return
+
+        count   = len(existing_events)
+        scanner = MessageArrayScanner()
+        if count:
+            params  = self.router.params('generate_conflict_messages', self._conflict_messages_request(new_event, existing_events))
+            release_connection()
+            started = time.perf_counter()
+            with self.client.messages.stream(**params) as stream:
+                for text in stream.text_stream:
+                    for message in scanner.feed(text):
+                        index = scanner.count - 1
+                        if index < count:
+                            yield index, self._streamed_message(new_event, existing_events[index], message)
+                self._record_call('generate_conflict_messages', params['model'], stream.get_final_message().usage, started)
+
+        for index in range(min(scanner.count, count), count):
+            yield index, self.generate_conflict_message(new_event, existing_events[index])
+
+    def _streamed_message(self, new_event, existing_event, message):
+        if isinstance(message, str) and message.strip():
+            return message.strip()
+        return self.generate_conflict_message(new_event, existing_event)
 
-既存の予定:
-- タイトル: {existing_event['title']}
-- 時間: {existing_event['start']} 〜 {existing_event.get('end', '未定')}
-- 種別: {existing_event['type']}
-- 終日: {existing_event.get('is_all_day', False)}
-- カテゴリ: {existing_event.get('category', 'なし')}
-
-以下のルールに従って警告メッセージを生成してください:
-1. 時間指定 vs 時間指定 → 「完全に重複しています」
-2. 終日イベント + 時間指定 → 「この日はXXがありますが、時間は問題ありませんか?」
-3. 期間予定 + 日付イベント → 「XX期間中ですが問題ありませんか?」
-4. 同カテゴリの場合 → 警告を緩和
-
-簡潔で分かりやすい日本語の警告文を1文で返してください。警告文のみを返し、説明は不要です。"""
-            }]
-        )
-        
-        return message.content[0].text.strip()
-    
     def parse_modify_command(self, natural_input):
         """
         自然言語から変更・削除の意図を解析する。
@@ -152,51 +173,7 @@ JSONのみを返してください。"""
                 }
             }
         """
-        current_time = timezone.now().strftime('%Y-%m-%d %H:%M')
-
-        message = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=600,
-            messages=[{
-                "role": "user",
-                "content": f"""以下の入力から予定の変更または削除の意図を解析してください。
-
-入力: {natural_input}
-現在時刻: {current_time}
-
-以下の形式でJSONを返してください:
-{{
-    "intent": "update" または "delete" または "unknown",
-    "search": {{
-        "date": "YYYY-MM-DD" または null（日付が不明な場合）,
-        "title_keyword": "予定を特定するキーワード（例: 会議、英語、合宿）"
-    }},
-    "changes": {{
-        "title": null または "新しいタイトル",
-        "start_datetime": null または "YYYY-MM-DD HH:MM",
-        "end_datetime":   null または "YYYY-MM-DD HH:MM"
-    }}
-}}
-
-注意事項:
-- intentが"delete"の場合、changesは全てnullでよい
-- intentが"update"の場合、変更する項目のみchangesに入れる（変えない項目はnull）
-- 変更・削除の意図が読み取れない場合はintent="unknown"
-- 「3/4」「明日」「来週火曜」などはYYYY-MM-DD形式に変換する
-- title_keywordは予定を特定できる最小限のキーワード
-- 例: "変更"/"修正"/"直して"/"ずらして" → intent="update"
-- 例: "削除"/"消して"/"キャンセル"/"なくして" → intent="delete"
-- 締切・期間予定の変更・削除も同様に扱う
-
-時刻の解釈ルール:
-- 1〜12時で午前/午後が不明かつ現在時刻より過去になる場合は午後（+12時間）として解釈
-- 「朝」「午前」→ 午前、「夜」「夕方」「午後」→ 午後
-
-JSONのみを返してください。説明文は不要です。"""
-            }]
-        )
-
-        return self._extract_json(message.content[0].text)
+        return self._create_json('parse_modify_command', self._modify_command_request(natural_input))
 
     def parse_unified_command(self, natural_input, default_duration_hours=1):
         """
@@ -212,68 +189,250 @@ JSONのみを返してください。説明文は不要です。"""
                 "search": { date, title_keyword },
                 "changes": { title, start_datetime, end_datetime }
             }
+        定型の入力はローカルで解析し、確信度が閾値未満の場合のみ AI に問い合わせる。
+        午前/午後の判定が現在時刻に依存するため、AI の結果は 1 時間単位でキャッシュする
+        （「30分後」「今から」のような相対指定を含む入力は 1 分単位）。
+        """
+        command = self._local_command(natural_input, default_duration_hours)
+        if command is not None:
+            return command
+
+        return self.cache.fetch(
+            'parse_unified_command',
+            PROMPT_VERSIONS['parse_unified_command'],
+            natural_input,
+            lambda: self._request_unified_command(natural_input, default_duration_hours),
+            granularity=self._command_granularity(natural_input),
+            extra=(default_duration_hours,),
+        )
+
+    def parse_bulk_events(self, lines, default_duration_hours=1):
+        """
+        1 行 1 件の複数行入力から予定を抽出する。
+        Returns:
+            lines と同じ長さのリスト（各要素は parse_natural_language と同じ形式の dict、読み取れない行は None）
+        定型の行はローカルで解析し、残りの行だけを BULK_ADD_CHUNK_LINES 行ずつ 1 回の AI 呼び出しで解析する。
         """
+        results = [self._local_event(line, default_duration_hours) for line in lines]
+        pending = [i for i, result in enumerate(results) if result is None]
+        size    = settings.BULK_ADD_CHUNK_LINES
+
+        for chunk in (pending[i:i + size] for i in range(0, len(pending), size)):
+            request = self._bulk_events_request(
+                [lines[i] for i in chunk], default_duration_hours, self._previous_date(results, chunk[0])
+            )
+            self._merge_bulk_events(results, chunk, self._create_json('parse_bulk_events', request))
+        return results
+
+    def _local_event(self, line, default_duration_hours):
+        # 日付を省略した行は直前の行の日付を引き継ぐため、ローカルでは解析しない
+        if not DATE_RE.search(line):
+            return None
+        parsed = self.command_parser.parse(line, default_duration_hours)
+        if parsed.confidence < settings.LOCAL_PARSER_MIN_CONFIDENCE or parsed.command.get('intent') != 'add':
+            return None
+        return parsed.command['event_data']
+
+    def _previous_date(self, results, index):
+        """index より前で最後に解析できた行の日付（チャンクをまたいで日付を引き継ぐため）。"""
+        for event_data in reversed(results[:index]):
+            if event_data and event_data.get('start_datetime'):
+                return event_data['start_datetime'][:10]
+        return None
+
+    def _merge_bulk_events(self, results, chunk, data):
+        events = data.get('events') if isinstance(data, dict) else None
+        if not isinstance(events, list):
+            raise ValueError(f"AIのレスポンスに events がありません: {data}")
+        for item in events:
+            line = item.get('line') if isinstance(item, dict) else None
+            if isinstance(line, int) and 1 <= line <= len(chunk) and results[chunk[line - 1]] is None:
+                results[chunk[line - 1]] = {key: value for key, value in item.items() if key != 'line'}
+
+    def _command_granularity(self, natural_input):
+        """統合コマンドの解析結果をキャッシュする時間の単位（AIResponseCache.fetch の granularity）。"""
+        return 'minute' if RELATIVE_TIME_RE.search(natural_input or '') else 'hour'
+
+    def _local_command(self, natural_input, default_duration_hours):
+        parsed = self.command_parser.parse(natural_input, default_duration_hours)
+        if parsed.confidence < settings.LOCAL_PARSER_MIN_CONFIDENCE:
+            return None
+        self.command_stats.incr('local')
+        return parsed.command
+
+    def _request_unified_command(self, natural_input, default_duration_hours):
+        self.command_stats.incr('llm')
+        return self._create_json('parse_unified_command', self._unified_command_request(natural_input, default_duration_hours))
+
+    # ------------------------------------------------------------------ #
+    # Prompts（messages.create に渡す system / messages を組み立てる。モデルと max_tokens は ModelRouter が決める）
+    # 静的な指示は prompts.py の system ブロック（キャッシュ対象）に置き、
+    # user ターンには入力・現在時刻などの可変部分だけを入れる。
+    # ------------------------------------------------------------------ #
+
+    def _natural_language_request(self, natural_input, default_duration_hours):
         current_time = timezone.now().strftime('%Y-%m-%d %H:%M')
 
-        message = self.client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=1200,
-            messages=[{
+        return {
+            "system": prompts.system_blocks('parse_natural_language'),
+            "messages": [{
                 "role": "user",
-                "content": f"""以下の入力の意図を解析して、JSON形式で返してください。
-
-入力: {natural_input}
+                "content": f"""入力: {natural_input}
 現在時刻: {current_time}
+デフォルト所要時間: {default_duration_hours}時間"""
+            }],
+        }
 
-意図の判定基準:
-- 「追加」「登録」「入れて」「予定がある」「〜がある」「〜する」→ intent="add"
-- 「見せて」「教えて」「確認」「今日は?」「今週の予定」→ intent="search"
-- 「変更」「修正」「直して」「ずらして」「〜からにして」→ intent="update"
-- 「削除」「消して」「キャンセル」「なくして」→ intent="delete"
-
-以下の形式でJSONを返してください:
-{{
-    "intent": "add" または "search" または "update" または "delete" または "unknown",
-    "event_data": {{
-        "title": "予定のタイトル",
-        "start_datetime": "YYYY-MM-DD HH:MM",
-        "end_datetime": "YYYY-MM-DD HH:MM",
-        "event_type": "activity",
-        "priority": 3,
-        "is_all_day": false,
-        "category": ["カテゴリ1"]
-    }},
-    "period": "今日",
-    "search": {{
-        "date": "YYYY-MM-DD" または null,
-        "title_keyword": "キーワード"
-    }},
-    "changes": {{
-        "title": null または "新タイトル",
-        "start_datetime": null または "YYYY-MM-DD HH:MM",
-        "end_datetime": null または "YYYY-MM-DD HH:MM"
-    }}
-}}
-
-注意:
-- intentに関係するフィールドのみ埋めれば良い（不要フィールドはnullや空で）
-- intent="add": event_dataを埋める。end_datetimeが不明なら{default_duration_hours}時間後
-- intent="search": periodを埋める（「今日」「今週」「来月」など日本語で）
-- intent="update"/"delete": searchとchangesを埋める
-- event_typeは activity/block/deadline のいずれか
-- 「block」: 複数日にまたがる期間（合宿・テスト期間など）、is_all_day=true、start=開始日00:00、end=終了日23:59
-- 「deadline」: 締切
-
-時刻の解釈ルール:
-- 1〜12時で午前/午後が不明かつ現在時刻より過去になる場合は午後（+12時間）として解釈
-- 「朝」「午前」「am」→ 午前、「夜」「夕方」「午後」「pm」→ 午後
-- 明日以降の日付が指定された場合は文脈で判断
-
-JSONのみを返してください。説明文は不要です。"""
-            }]
+    def _period_request(self, period_text):
+        current_time = timezone.now().strftime('%Y-%m-%d %H:%M')
+
+        return {
+            "system": prompts.system_blocks('parse_period'),
+            "messages": [{
+                "role": "user",
+                "content": f"""期間指定: {period_text}
+現在時刻: {current_time}"""
+            }],
+        }
+
+    def _conflict_message_request(self, new_event, existing_event):
+        return {
+            "system": prompts.system_blocks('generate_conflict_message'),
+            "messages": [{
+                "role": "user",
+                "content": f"""新しい予定:
+{prompts.event_lines(new_event)}
+
+既存の予定:
+{prompts.event_lines(existing_event)}"""
+            }],
+        }
+
+    def _conflict_messages_request(self, new_event, existing_events):
+        existing_text = '\n\n'.join(
+            f"既存の予定{i}:\n{prompts.event_lines(e)}"
+            for i, e in enumerate(existing_events, start=1)
         )
 
-        return self._extract_json(message.content[0].text)
+        return {
+            # ルートの max_tokens は警告文 1 件あたり
+            "max_tokens": self.router.route('generate_conflict_messages').max_tokens * len(existing_events) + 100,
+            "system": prompts.system_blocks('generate_conflict_messages'),
+            "messages": [{
+                "role": "user",
+                "content": f"""新しい予定:
+{prompts.event_lines(new_event)}
+
+{existing_text}
+
+警告文の件数: {len(existing_events)}件"""
+            }],
+        }
+
+    def _modify_command_request(self, natural_input):
+        current_time = timezone.now().strftime('%Y-%m-%d %H:%M')
+
+        return {
+            "system": prompts.system_blocks('parse_modify_command'),
+            "messages": [{
+                "role": "user",
+                "content": f"""入力: {natural_input}
+現在時刻: {current_time}"""
+            }],
+        }
+
+    def _unified_command_request(self, natural_input, default_duration_hours):
+        current_time = timezone.now().strftime('%Y-%m-%d %H:%M')
+
+        return {
+            "system": prompts.system_blocks('parse_unified_command'),
+            "messages": [{
+                "role": "user",
+                "content": f"""入力: {natural_input}
+現在時刻: {current_time}
+デフォルト所要時間: {default_duration_hours}時間"""
+            }],
+        }
+
+    def _bulk_events_request(self, lines, default_duration_hours, previous_date=None):
+        current_time = timezone.now().strftime('%Y-%m-%d %H:%M')
+        numbered     = '\n'.join(f'{i}: {line}' for i, line in enumerate(lines, start=1))
+        context      = f'\n直前の行の日付: {previous_date}' if previous_date else ''
+
+        return {
+            # ルートの max_tokens は 1 行あたり
+            "max_tokens": self.router.route('parse_bulk_events').max_tokens * len(lines) + 100,
+            "system": prompts.system_blocks('parse_bulk_events'),
+            "messages": [{
+                "role": "user",
+                "content": f"""入力:
+{numbered}
+
+現在時刻: {current_time}
+デフォルト所要時間: {default_duration_hours}時間{context}"""
+            }],
+        }
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers
+    # ------------------------------------------------------------------ #
+
+    def _create(self, task, request, escalated=False):
+        """
+        タスクのルート（モデル・max_tokens・タイムアウト）で Claude を呼び出し、応答テキストを返す。
+        応答を待つ間は DB 接続をプールへ返しておく。
+        """
+        params  = self.router.params(task, request, escalated)
+        release_connection()
+        started = time.perf_counter()
+        message = self.client.messages.create(**params)
+        self._record_call(task, params['model'], message.usage, started)
+        return message.content[0].text
+
+    def _create_json(self, task, request):
+        """JSON を返すタスク用。応答を JSON として解析できなければ上位のモデルで 1 回だけ再試行する。"""
+        text = self._create(task, request)
+        try:
+            return self._extract_json(text)
+        except ValueError:
+            if not self.router.can_escalate(task):
+                raise
+        self.escalations.incr(task)
+        return self._extract_json(self._create(task, request, escalated=True))
+
+    def _record_call(self, task, model, usage, started):
+        elapsed = time.perf_counter() - started
+        self.latency.observe(task, elapsed)
+        counts = self.token_usage.record(task, usage)
+        logger.info(
+            'AI call task=%s model=%s latency_ms=%d input=%d cache_read=%d cache_write=%d output=%d',
+            task,
+            model,
+            elapsed * 1000,
+            counts['input_tokens'],
+            counts['cache_read_input_tokens'],
+            counts['cache_creation_input_tokens'],
+            counts['output_tokens'],
+        )
+        # system のプレフィックスがモデルの最小キャッシュ長に届かないと、読み込みも書き込みも 0 になる
+        if not (counts['cache_read_input_tokens'] or counts['cache_creation_input_tokens']) and model not in self.uncached_models:
+            self.uncached_models.add(model)
+            logger.warning(
+                'Prompt cache not used: task=%s model=%s input=%d (system prefix may be below the minimum cacheable length)',
+                task, model, counts['input_tokens'],
+            )
+
+    def _parse_conflict_messages(self, text, count):
+        """バッチ応答から警告文リストを取り出す。形式・件数が不正なら None。"""
+        try:
+            messages = self._extract_json(text).get('messages')
+        except (ValueError, AttributeError):
+            return None
+
+        if (not isinstance(messages, list) or len(messages) != count
+                or not all(isinstance(m, str) and m.strip() for m in messages)):
+            return None
+        return [m.strip() for m in messages]
 
     def _extract_json(self, text):
         if '```json' in text:
@@ -0,0 +1,126 @@
+import asyncio
+import time
+import anthropic
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from schedule.services.ai_service import AIService, MessageArrayScanner, PROMPT_VERSIONS
+from schedule.services.db_pool import release_connection
+
+
+class AsyncAIService(AIService):
+    """
+    AI解析サービス（非同期版）。
+
+    AsyncAnthropic で Claude を呼び出し、応答待ちの間もイベントループを解放する。
+    プロンプト・キャッシュ・ローカル期間解決は AIService と共通。
+    """
+
+    def _make_client(self):
+        return anthropic.AsyncAnthropic(
+            api_key=settings.ANTHROPIC_API_KEY
+        )
+
+    async def parse_natural_language(self, natural_input, default_duration_hours=1):
+        return await self._create_json('parse_natural_language', self._natural_language_request(natural_input, default_duration_hours))
+
+    async def parse_period(self, period_text):
+        range_data = self.period_resolver.resolve(period_text)
+        if range_data is not None:
+            self.period_stats.incr('local')
+            return range_data
+
+        return await self.cache.afetch(
+            'parse_period',
+            PROMPT_VERSIONS['parse_period'],
+            period_text,
+            lambda: self._request_period(period_text),
+        )
+
+    async def _request_period(self, period_text):
+        self.period_stats.incr('llm')
+        return await self._create_json('parse_period', self._period_request(period_text))
+
+    async def generate_conflict_message(self, new_event, existing_event):
+        return (await self._create('generate_conflict_message', self._conflict_message_request(new_event, existing_event))).strip()
+
+    async def generate_conflict_messages(self, new_event, existing_events):
+        if not existing_events:
+            return []
+        if len(existing_events) == 1:
+            return [await self.generate_conflict_message(new_event, existing_events[0])]
+
+        response_text = await self._create('generate_conflict_messages', self._conflict_messages_request(new_event, existing_events))
+        messages      = self._parse_conflict_messages(response_text, len(existing_events))
+        if messages is None:
+            # フォールバック時も 1 件ずつ並行に生成する
+            return list(await asyncio.gather(
+                *(self.generate_conflict_message(new_event, e) for e in existing_events)
+            ))
+        return messages
+
+    async def stream_conflict_messages(self, new_event, existing_events):
+        if len(existing_events) == 1:
+            yield 0, await self.generate_conflict_message(new_event, existing_events[0])
+            return
+
+        count   = len(existing_events)
+        scanner = MessageArrayScanner()
+        if count:
+            params  = self.router.params('generate_conflict_messages', self._conflict_messages_request(new_event, existing_events))
+            await sync_to_async(release_connection)()
+            started = time.perf_counter()
+            async with self.client.messages.stream(**params) as stream:
+                async for text in stream.text_stream:
+                    for message in scanner.feed(text):
+                        index = scanner.count - 1
+                        if index < count:
+                            yield index, await self._streamed_message(new_event, existing_events[index], message)
+                self._record_call('generate_conflict_messages', params['model'], (await stream.get_final_message()).usage, started)
+
+        for index in range(min(scanner.count, count), count):
+            yield index, await self.generate_conflict_message(new_event, existing_events[index])
+
+    async def _streamed_message(self, new_event, existing_event, message):
+        if isinstance(message, str) and message.strip():
+            return message.strip()
+        return await self.generate_conflict_message(new_event, existing_event)
+
+    async def parse_modify_command(self, natural_input):
+        return await self._create_json('parse_modify_command', self._modify_command_request(natural_input))
+
+    async def parse_unified_command(self, natural_input, default_duration_hours=1):
+        command = self._local_command(natural_input, default_duration_hours)
+        if command is not None:
+            return command
+
+        return await self.cache.afetch(
+            'parse_unified_command',
+            PROMPT_VERSIONS['parse_unified_command'],
+            natural_input,
+            lambda: self._request_unified_command(natural_input, default_duration_hours),
+            granularity=self._command_granularity(natural_input),
+            extra=(default_duration_hours,),
+        )
+
+    async def _request_unified_command(self, natural_input, default_duration_hours):
+        self.command_stats.incr('llm')
+        return await self._create_json('parse_unified_command', self._unified_command_request(natural_input, default_duration_hours))
+
+    async def _create(self, task, request, escalated=False):
+        params  = self.router.params(task, request, escalated)
+        # DB 接続は sync_to_async のスレッドが持っているため、そのスレッドで返却する
+        await sync_to_async(release_connection)()
+        started = time.perf_counter()
+        message = await self.client.messages.create(**params)
+        self._record_call(task, params['model'], message.usage, started)
+        return message.content[0].text
+
+    async def _create_json(self, task, request):
+        text = await self._create(task, request)
+        try:
+            return self._extract_json(text)
+        except ValueError:
+            if not self.router.can_escalate(task):
+                raise
+        self.escalations.incr(task)
+        return self._extract_json(await self._create(task, request, escalated=True))
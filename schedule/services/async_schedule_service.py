@@ -0,0 +1,122 @@
+from asgiref.sync import sync_to_async
+from schedule.services.async_ai_service import AsyncAIService
+from schedule.services.schedule_service import ScheduleService
+
+
+class AsyncScheduleService(ScheduleService):
+    """
+    スケジュール管理サービス（非同期版）。
+
+    AI 呼び出しは AsyncAIService で await し、DB アクセスは sync_to_async で
+    スレッドに逃がす。判定ロジックは ScheduleService のヘルパーをそのまま使う。
+    """
+
+    def __init__(self, ai_service=None):
+        super().__init__(ai_service or AsyncAIService())
+
+    async def create_event(self, user_id, natural_input, force=False):
+        duration, warn_level, ai_warning = await sync_to_async(self._user_preferences)(user_id)
+
+        event_data = await self.ai_service.parse_natural_language(natural_input, duration)
+
+        start_dt, end_dt = self._event_range(event_data)
+
+        if not force:
+            check    = await sync_to_async(self._check_conflicts)(user_id, start_dt, end_dt, event_data, warn_level)
+            hard     = check['conflicts']
+            soft     = check['warnings']
+            new_dict = self._proposed_dict(event_data)
+
+            if hard:
+                conflict_list = await self._with_warning_messages(new_dict, hard, 'conflict', ai_warning)
+                return {
+                    'status'        : 'conflict',
+                    'conflicts'     : conflict_list,
+                    'proposed_event': event_data,
+                }
+
+            if soft:
+                warning_list = await self._with_warning_messages(new_dict, soft, 'warning', ai_warning)
+                return {
+                    'status'        : 'warning',
+                    'warnings'      : warning_list,
+                    'proposed_event': event_data,
+                }
+
+        return await sync_to_async(self._create_event_from_data)(user_id, event_data, start_dt, end_dt)
+
+    async def execute_command(self, user_id, natural_input):
+        async for event, data in self.stream_command(user_id, natural_input):
+            if event == 'result':
+                return data
+
+    async def stream_command(self, user_id, natural_input):
+        duration, warn_level, ai_warning = await sync_to_async(self._user_preferences)(user_id)
+
+        cmd    = await self.ai_service.parse_unified_command(natural_input, duration)
+        intent = cmd.get('intent', 'unknown')
+        yield 'intent', {'intent': intent}
+
+        if intent == 'add':
+            event_data = cmd.get('event_data') or {}
+            if not event_data.get('start_datetime'):
+                yield 'result', {'status': 'error', 'message': '予定の日時を読み取れませんでした。日時を含めて入力してください。'}
+                return
+            yield 'draft', {'proposed_event': event_data}
+
+            start_dt, end_dt = self._event_range(event_data)
+
+            check    = await sync_to_async(self._check_conflicts)(user_id, start_dt, end_dt, event_data, warn_level)
+            new_dict = self._proposed_dict(event_data)
+
+            for kind, key in (('conflict', 'conflicts'), ('warning', 'warnings')):
+                if check[key]:
+                    dicts = [self._event_to_dict(e) for e in check[key]]
+                    yield 'conflicts', {'status': kind, key: dicts}
+                    async for index, msg in self._iter_warning_messages(new_dict, dicts, kind, ai_warning):
+                        dicts[index]['warning_message'] = msg
+                        yield 'warning_message', {'status': kind, 'index': index, 'message': msg}
+                    yield 'result', {'status': kind, 'action': 'add', key: dicts, 'proposed_event': event_data}
+                    return
+
+            yield 'result', await sync_to_async(self._create_event_from_data)(user_id, event_data, start_dt, end_dt)
+
+        elif intent == 'search':
+            period     = cmd.get('period') or '今日'
+            range_data = await self.ai_service.parse_period(period)
+            yield 'period', {'period': period, **range_data}
+            page       = await sync_to_async(self._events_in_period)(user_id, range_data)
+            yield 'result', {'status': 'success', 'action': 'search', 'period': period, **page}
+
+        elif intent in ('update', 'delete'):
+            yield 'result', await sync_to_async(self._modify_from_command)(
+                user_id, intent, cmd.get('search') or {}, cmd.get('changes') or {},
+            )
+
+        else:
+            yield 'result', {
+                'status' : 'error',
+                'message': '入力の意図を読み取れませんでした。予定の追加・検索・変更・削除のいずれかを入力してください。',
+            }
+
+    async def get_events(self, user_id, period_text, cursor=None, limit=None):
+        range_data = await self.ai_service.parse_period(period_text)
+        return await sync_to_async(self._events_in_period)(user_id, range_data, cursor, limit)
+
+    async def _iter_warning_messages(self, new_dict, dicts, kind, use_ai=False):
+        if use_ai:
+            async for index, msg in self.ai_service.stream_conflict_messages(new_dict, dicts):
+                yield index, msg
+        else:
+            for index, d in enumerate(dicts):
+                yield index, self.message_renderer.render(kind, new_dict, d)
+
+    async def _with_warning_messages(self, new_dict, events, kind, use_ai=False):
+        dicts = [self._event_to_dict(e) for e in events]
+        if use_ai:
+            messages = await self.ai_service.generate_conflict_messages(new_dict, dicts)
+        else:
+            messages = [self.message_renderer.render(kind, new_dict, d) for d in dicts]
+        for d, msg in zip(dicts, messages):
+            d['warning_message'] = msg
+        return dicts
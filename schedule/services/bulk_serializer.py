@@ -0,0 +1,100 @@
+"""
+件数の多いイベント一覧用のシリアライザ。
+
+ScheduleService._event_to_dict と同じ形の辞書を返すが、モデルインスタンスを作らず
+values_list で必要な列だけを取得し、ローカル時刻への変換は UTC オフセットをキャッシュして
+足し算だけで行う（行ごとの timezone.localtime / strftime を避ける）。
+JSON の列は orjson があれば orjson で復元する。
+"""
+import json
+from django.db.models import TextField
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+
+# category（JSONField）はテキストのまま受け取り、まとめて json_loads で復元する
+COLUMNS = (
+    'id', 'user_id', 'title', 'start_datetime', 'end_datetime',
+    'event_type', 'priority', 'is_all_day', 'category_json', 'created_at',
+)
+
+
+class LocalTimeFormatter:
+    """
+    UTC の datetime をローカル時刻の文字列に変換する。
+
+    UTC オフセットは UTC の 15 分区間ごとにキャッシュする（夏時間などの切り替えは
+    15 分単位の時刻に起きるため、同じ区間内ではオフセットが変わらない）。
+    """
+
+    def __init__(self, tz=None):
+        self.tz       = tz or timezone.get_current_timezone()
+        self._offsets = {}
+
+    def _local(self, dt):
+        key    = (dt.year, dt.month, dt.day, dt.hour, dt.minute // 15)
+        offset = self._offsets.get(key)
+        if offset is None:
+            offset = self._offsets[key] = dt.astimezone(self.tz).utcoffset()
+        return dt + offset
+
+    def minutes(self, dt):
+        """'YYYY-MM-DD HH:MM'（dt が None なら None）"""
+        if dt is None:
+            return None
+        d = self._local(dt)
+        return f'{d.year:04d}-{d.month:02d}-{d.day:02d} {d.hour:02d}:{d.minute:02d}'
+
+    def seconds(self, dt):
+        """'YYYY-MM-DD HH:MM:SS'"""
+        d = self._local(dt)
+        return f'{d.year:04d}-{d.month:02d}-{d.day:02d} {d.hour:02d}:{d.minute:02d}:{d.second:02d}'
+
+
+def serialize_events(queryset, formatter=None):
+    """Event の QuerySet を _event_to_dict 形式の辞書のリストにする（並び順は queryset のまま）。"""
+    fmt = formatter or LocalTimeFormatter()
+    return [_to_dict(fmt, row) for row in _rows(queryset)]
+
+
+def serialize_page(queryset, limit, formatter=None):
+    """
+    queryset の先頭 limit 件を直列化する（limit + 1 件だけ取得して続きの有無を判定）。
+    Returns: (辞書のリスト, 続きがあれば最後の行の (start_datetime, id)、なければ None)
+    """
+    fmt  = formatter or LocalTimeFormatter()
+    rows = list(_rows(queryset[:limit + 1]))
+    last = (rows[limit - 1][3], rows[limit - 1][0]) if len(rows) > limit else None
+    return [_to_dict(fmt, row) for row in rows[:limit]], last
+
+
+def serialize_keyed(queryset, formatter=None):
+    """serialize_events と同じ辞書を、並び順のキー (start_datetime, id) と組にして返す。"""
+    fmt = formatter or LocalTimeFormatter()
+    return [((row[3], row[0]), _to_dict(fmt, row)) for row in _rows(queryset)]
+
+
+def _rows(queryset):
+    return queryset.annotate(category_json=Cast('category', TextField())).values_list(*COLUMNS)
+
+
+def _to_dict(fmt, row):
+    (event_id, user_id, title, start, end,
+     event_type, priority, is_all_day, category, created_at) = row
+    return {
+        'id'        : event_id,
+        'user_id'   : user_id,
+        'title'     : title,
+        'start'     : fmt.minutes(start),
+        'end'       : fmt.minutes(end),
+        'type'      : event_type,
+        'priority'  : priority,
+        'is_all_day': is_all_day,
+        'category'  : json_loads(category) if category is not None else None,
+        'created_at': fmt.seconds(created_at),
+    }
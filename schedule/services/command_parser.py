@@ -0,0 +1,395 @@
+import re
+import unicodedata
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from django.utils import timezone
+from schedule.services.period_resolver import PeriodResolver, SUFFIX_RE
+
+
+# command は AIService.parse_unified_command と同じ形式、confidence は 0.0〜1.0
+ParsedCommand = namedtuple('ParsedCommand', 'command confidence')
+
+UNKNOWN = ParsedCommand({'intent': 'unknown'}, 0.0)
+
+DATE_TOKEN = (
+    r'(?:\d{4}[年/-]\d{1,2}[月/-]\d{1,2}日?'
+    r'|\d{1,2}月\d{1,2}日'
+    r'|\d{1,2}/\d{1,2}'
+    r'|(?:今週|来週|再来週)の?[月火水木金土日]曜日?'
+    r'|[月火水木金土日]曜日?'
+    r'|明後日|あさって|明日|あした|あす|今日|本日|きょう'
+    r'|\d+日後)'
+)
+DATE_RANGE_RE = re.compile(rf'({DATE_TOKEN})の?(?:から|〜|~)の?({DATE_TOKEN})(?:まで)?')
+DATE_RE       = re.compile(DATE_TOKEN)
+
+# 「2時間」は時刻ではないため 時(?!間)
+TIME_TOKEN    = r'(午前|午後|朝|昼|夕方|夜|am|pm)?(\d{1,2})(?:時(?!間)(?:(半)|(\d{1,2})分)?|:(\d{2}))'
+TIME_RANGE_RE = re.compile(rf'{TIME_TOKEN}(?:から|〜|~|-){TIME_TOKEN}(?:まで)?', re.IGNORECASE)
+TIME_RE       = re.compile(TIME_TOKEN, re.IGNORECASE)
+DURATION_RE   = re.compile(r'(\d+(?:\.\d+)?)時間(半)?|(\d+)分間')
+
+AM_MARKERS = {'午前', '朝', 'am'}
+PM_MARKERS = {'午後', '夕方', '夜', 'pm'}
+
+# 意図の判定（AIService._unified_command_request の判定基準に合わせる）
+DELETE_RE      = re.compile(r'削除|消して|消す|消去|キャンセル|なくして|取り消')
+UPDATE_RE      = re.compile(r'変更|修正|直して|ずらして|ずらす|からにして|に変えて|へ変えて|に移動|へ移動|に移して')
+SEARCH_RE      = re.compile(r'見せて|教えて|確認|表示|一覧|知りたい|何がある|なにがある|[?]$')
+WEAK_SEARCH_RE = re.compile(r'予定(は|を)?$')
+ADD_RE         = re.compile(r'追加|登録|入れて|いれて|入れといて|予約|(?<!何)(?<!なに)があ(る|ります)|する$|します$')
+
+SEARCH_VERB_RE = re.compile(
+    r'(を|の|は)?(見せて|教えて|確認(して|したい|させて)?|表示(して)?|一覧|知りたい|何がある|なにがある)'
+    r'(ください|下さい|くれる|ほしい)?'
+)
+ADD_TAIL_RE = re.compile(
+    r'(?:(?:の予定|予定)?(?:を|に)?(?:追加|登録|入れ|いれ|予約)(?:て|といて|して|する|しておいて|しといて)?'
+    r'(?:ください|下さい|お願い(?:します)?)?'
+    r'|(?:の予定|予定)?があ(?:る|ります)'
+    r'|を?(?:する|します))$'
+)
+MODIFY_TAIL_RE = re.compile(
+    r'(?:に|へ|を)?(?:変更|修正|削除|消去|キャンセル|消|直|ずら|移動|移|変え|なく|取り消)'
+    r'(?:して|す|する|します)?(?:ください|下さい|お願い(?:します)?)?$'
+)
+TARGET_FIELD_RE = re.compile(r'の(?:時間|時刻|開始時間|開始時刻|日時|日程)$')
+TITLE_FIELD_RE  = re.compile(r'の(?:タイトル|名前|件名)$')
+TITLE_HEAD_RE   = re.compile(r'^(?:から|まで|の|に|で|は|を|、|,|〜|~|-)+')
+TITLE_TAIL_RE   = re.compile(r'(?:から|まで|の|に|で|を|が|は|、|,|〜|~|-)+$')
+DEADLINE_RE     = re.compile(r'締切|締め切り|〆切|しめきり|期限|提出')
+# 繰り返しの指定（毎週・隔週・平日など）。繰り返しルール（rrule）の組み立ては Claude に任せる
+RECURRENCE_RE   = re.compile(r'毎(?:日|週|月|朝|晩|[月火水木金土日]曜)|隔(?:日|週|月)|平日|週\d回')
+# 変更・削除の対象に残った時間帯の指定（「午後の会議」の「午後の」、取り除けなかった数字など）
+TIME_QUALIFIER_RE = re.compile(r'(?:午前|午後|朝|昼|夕方|夜)の|\d')
+# タイトルとして意味をなさない残り（「予定」「予定を全部」など）
+NON_TITLE_RE    = re.compile(r'^(?:予定)?(?:を|は)?(?:全部|すべて|全て)?$')
+
+
+class LocalCommandParser:
+    """
+    定型の統合コマンド（「明日18時から会議」「今週の予定」「3/4の会議を削除」など）を
+    ルールベースで解析し、parse_unified_command と同じ形式の結果と確信度を返す。
+
+    確信度が閾値（settings.LOCAL_PARSER_MIN_CONFIDENCE）未満の入力だけを Claude に回す。
+    午前/午後の判定はプロンプトと同じく「1〜12時で午前/午後が不明かつ現在時刻より過去なら午後」。
+    """
+
+    def __init__(self, period_resolver=None):
+        self.period_resolver = period_resolver or PeriodResolver()
+
+    def parse(self, natural_input, default_duration_hours=1, now=None):
+        now  = timezone.localtime(now)
+        text = self._normalize(natural_input)
+        if not text:
+            return UNKNOWN
+
+        intent, confidence = self._detect_intent(text)
+        try:
+            if intent == 'search':
+                parsed = self._parse_search(text, now)
+            elif intent == 'add':
+                parsed = self._parse_add(text, now, default_duration_hours)
+            elif intent in ('update', 'delete'):
+                parsed = self._parse_modify(intent, text, now)
+            else:
+                return UNKNOWN
+        except ValueError:
+            return UNKNOWN   # 存在しない日付・時刻（25時 など）
+
+        return ParsedCommand(parsed.command, round(parsed.confidence * confidence, 3))
+
+    # ------------------------------------------------------------------ #
+    # Intent
+    # ------------------------------------------------------------------ #
+
+    def _detect_intent(self, text):
+        """(意図, 意図判定の確信度) を返す。"""
+        delete   = bool(DELETE_RE.search(text))
+        update   = bool(UPDATE_RE.search(text))
+        search   = bool(SEARCH_RE.search(text))
+        add      = bool(ADD_RE.search(text))
+        has_time = bool(TIME_RE.search(text))
+
+        if delete and update:
+            return 'unknown', 0.0
+        if delete or update:
+            return ('delete' if delete else 'update'), (0.7 if add or search else 1.0)
+        if search and not add:
+            return 'search', (0.6 if has_time else 1.0)
+        if add:
+            return 'add', (0.6 if search else 1.0)
+        if WEAK_SEARCH_RE.search(text) and not has_time:
+            return 'search', 0.9
+        # 「明日18時から会議」のように動詞のない入力は追加とみなす
+        return 'add', 0.9
+
+    # ------------------------------------------------------------------ #
+    # Search
+    # ------------------------------------------------------------------ #
+
+    def _parse_search(self, text, now):
+        period = SUFFIX_RE.sub('', SEARCH_VERB_RE.sub('', text)).strip()
+        if not period:
+            return ParsedCommand({'intent': 'search', 'period': '今日'}, 0.7)
+        if self.period_resolver.resolve(period, now.date()) is None:
+            return ParsedCommand({'intent': 'search', 'period': period}, 0.3)
+        return ParsedCommand({'intent': 'search', 'period': period}, 0.95)
+
+    # ------------------------------------------------------------------ #
+    # Add
+    # ------------------------------------------------------------------ #
+
+    def _parse_add(self, text, now, default_duration_hours):
+        if RECURRENCE_RE.search(text):
+            return UNKNOWN   # 繰り返しの予定はシリーズとして登録するため Claude に任せる
+        rest, days       = self._take_dates(text, now.date())
+        rest, start, end = self._take_times(rest)
+        rest, duration   = self._take_duration(rest)
+        title            = self._clean_title(rest, ADD_TAIL_RE)
+
+        if days is False or start is False:
+            return UNKNOWN   # 日付・時刻の指定が複数あり、どれが予定の日時か判断できない
+        if not days and not start:
+            return UNKNOWN
+
+        confidence = 0.3 if NON_TITLE_RE.match(title) else 0.95
+        first_day, last_day = days or (now.date(), now.date())
+        event = {
+            'title'         : title or '予定',
+            'event_type'    : 'activity',
+            'priority'      : 3,
+            'is_all_day'    : False,
+            'category'      : [],
+        }
+
+        # 複数日の期間（合宿・テスト期間など）
+        if first_day != last_day:
+            event.update({
+                'start_datetime': f'{first_day:%Y-%m-%d} 00:00',
+                'end_datetime'  : f'{last_day:%Y-%m-%d} 23:59',
+                'event_type'    : 'block',
+                'is_all_day'    : True,
+            })
+            return ParsedCommand({'intent': 'add', 'event_data': event}, confidence * (0.6 if start else 1.0))
+
+        if DEADLINE_RE.search(title):
+            # 締切は終了時刻の扱い（なし / 所要時間後）がプロンプトでも定まっていないため Claude に任せる
+            confidence *= 0.7
+            event['event_type'] = 'deadline'
+
+        if not start:
+            # 時刻のない予定は終日か時刻の聞き漏れか判断できない
+            event.update({
+                'start_datetime': f'{first_day:%Y-%m-%d} 00:00',
+                'end_datetime'  : f'{first_day:%Y-%m-%d} 23:59',
+                'is_all_day'    : True,
+            })
+            return ParsedCommand({'intent': 'add', 'event_data': event}, confidence * 0.5)
+
+        start_dt, certainty = self._resolve_time(first_day, start, now, explicit_day=bool(days))
+        if end:
+            end_dt, end_certainty = self._resolve_end(first_day, end, start_dt)
+            certainty = min(certainty, end_certainty)
+        else:
+            end_dt = start_dt + (duration or timedelta(hours=default_duration_hours))
+
+        event.update({
+            'start_datetime': f'{start_dt:%Y-%m-%d %H:%M}',
+            'end_datetime'  : f'{end_dt:%Y-%m-%d %H:%M}',
+        })
+        return ParsedCommand({'intent': 'add', 'event_data': event}, confidence * certainty)
+
+    # ------------------------------------------------------------------ #
+    # Update / Delete
+    # ------------------------------------------------------------------ #
+
+    def _parse_modify(self, intent, text, now):
+        target, change = text, ''
+        if intent == 'update':
+            # 「<対象>を<変更内容>に変更」
+            index = text.rfind('を')
+            if index < 0:
+                return UNKNOWN
+            target, change = text[:index], text[index + 1:]
+
+        target_rest, target_days = self._take_dates(target, now.date())
+        if target_days is False or (target_days and target_days[0] != target_days[1]):
+            return UNKNOWN
+
+        # 対象の時刻（「14時の会議」）は検索キーワードに含めない（検索は日付とタイトルで行う）
+        target_rest, target_time, _ = self._take_times(target_rest)
+        if target_time is False:
+            return UNKNOWN
+
+        title_change = intent == 'update' and bool(TITLE_FIELD_RE.search(target_rest))
+        target_rest  = TITLE_FIELD_RE.sub('', TARGET_FIELD_RE.sub('', target_rest.strip()))
+        keyword      = self._clean_title(target_rest, MODIFY_TAIL_RE)
+        search_day   = target_days[0] if target_days else None
+
+        command = {
+            'intent' : intent,
+            'search' : {
+                'date'         : f'{search_day:%Y-%m-%d}' if search_day else None,
+                'title_keyword': keyword,
+            },
+            'changes': {'title': None, 'start_datetime': None, 'end_datetime': None},
+        }
+        if NON_TITLE_RE.match(keyword):
+            confidence = 0.6 if search_day else 0.0
+        else:
+            confidence = 0.95 if search_day else 0.85
+        if TIME_QUALIFIER_RE.search(keyword):
+            confidence *= 0.5   # 時間帯の指定がキーワードに残っており、タイトルと一致しない
+        elif target_time and not search_day:
+            confidence *= 0.75  # 日付なしの時刻（「14時の会議」）がどの日を指すかは Claude に任せる
+
+        if intent == 'delete':
+            return ParsedCommand(command, confidence)
+
+        if title_change:
+            new_title = self._clean_title(change, MODIFY_TAIL_RE)
+            if NON_TITLE_RE.match(new_title):
+                return UNKNOWN
+            command['changes']['title'] = new_title
+            return ParsedCommand(command, confidence * 0.9)
+
+        change_rest, change_days = self._take_dates(change, now.date())
+        change_rest, start, end  = self._take_times(change_rest)
+        if change_days is False or start is False or not start:
+            return UNKNOWN   # 日付だけの変更は元の時刻が分からないため Claude に任せる
+        day = change_days[0] if change_days else search_day
+        if day is None:
+            return UNKNOWN
+
+        start_dt, certainty = self._resolve_time(day, start, now, explicit_day=True)
+        command['changes']['start_datetime'] = f'{start_dt:%Y-%m-%d %H:%M}'
+        if end:
+            end_dt, end_certainty = self._resolve_end(day, end, start_dt)
+            command['changes']['end_datetime'] = f'{end_dt:%Y-%m-%d %H:%M}'
+            certainty = min(certainty, end_certainty)
+        return ParsedCommand(command, confidence * certainty * 0.95)
+
+    # ------------------------------------------------------------------ #
+    # Token extraction
+    # ------------------------------------------------------------------ #
+
+    def _normalize(self, text):
+        text = unicodedata.normalize('NFKC', text or '')
+        text = re.sub(r'\s+', ' ', text).strip()
+        return re.sub(r'[。.!！]+$', '', text).strip()
+
+    def _take_dates(self, text, today):
+        """
+        日付（または「3/10〜3/12」のような日付範囲）を取り除き、(残りの文字列, (初日, 最終日)) を返す。
+        日付がなければ None、複数あって判断できなければ False。
+        """
+        m = DATE_RANGE_RE.search(text)
+        if m:
+            first = self._resolve_day(m.group(1), today)
+            last  = self._resolve_day(m.group(2), today)
+            if first is None or last is None or first > last:
+                return text, False
+            rest = self._blank(text, m)
+            return rest, (False if DATE_RE.search(rest) else (first, last))
+
+        matches = list(DATE_RE.finditer(text))
+        if not matches:
+            return text, None
+        if len(matches) > 1:
+            return text, False
+        day = self._resolve_day(matches[0].group(0), today)
+        return self._blank(text, matches[0]), ((day, day) if day else False)
+
+    def _resolve_day(self, token, today):
+        span = self.period_resolver.resolve(token, today)
+        if span is None or span['start'][:10] != span['end'][:10]:
+            return None
+        return date.fromisoformat(span['start'][:10])
+
+    def _take_times(self, text):
+        """時刻（または時刻範囲）を取り除き、(残り, 開始, 終了) を返す。開始・終了は (区分, 時, 分)。"""
+        m = TIME_RANGE_RE.search(text)
+        if m:
+            start = self._time_parts(m.groups()[:5])
+            end   = self._time_parts(m.groups()[5:])
+            rest  = self._blank(text, m)
+            return rest, (False if TIME_RE.search(rest) else start), end
+
+        matches = list(TIME_RE.finditer(text))
+        if not matches:
+            return text, None, None
+        if len(matches) > 1:
+            return text, False, None
+        return self._blank(text, matches[0]), self._time_parts(matches[0].groups()), None
+
+    def _time_parts(self, groups):
+        marker, hour, half, minute, colon_minute = groups
+        minute = 30 if half else int(minute or colon_minute or 0)
+        return (marker or '').lower() or None, int(hour), minute
+
+    def _take_duration(self, text):
+        m = DURATION_RE.search(text)
+        if not m:
+            return text, None
+        if m.group(3):
+            duration = timedelta(minutes=int(m.group(3)))
+        else:
+            duration = timedelta(hours=float(m.group(1)) + (0.5 if m.group(2) else 0))
+        return self._blank(text, m), duration
+
+    def _blank(self, text, match):
+        return text[:match.start()] + ' ' + text[match.end():]
+
+    def _clean_title(self, rest, tail_re):
+        rest   = tail_re.sub('', re.sub(r'\s+', ' ', rest).strip())
+        chunks = []
+        for chunk in rest.split(' '):
+            chunk = TITLE_TAIL_RE.sub('', TITLE_HEAD_RE.sub('', chunk))
+            chunk = SUFFIX_RE.sub('', chunk) if chunk.endswith('予定') else chunk
+            if chunk:
+                chunks.append(chunk)
+        return ' '.join(chunks)
+
+    # ------------------------------------------------------------------ #
+    # Time resolution
+    # ------------------------------------------------------------------ #
+
+    def _resolve_time(self, day, parts, now, explicit_day):
+        """(区分, 時, 分) を aware datetime に変換し、(日時, 確からしさ) を返す。"""
+        marker, hour, minute = parts
+        certainty = 1.0
+        if marker in PM_MARKERS and hour < 12:
+            hour += 12
+        elif marker == '昼' and hour < 6:
+            hour += 12
+        elif marker in AM_MARKERS and hour == 12:
+            hour = 0
+        elif marker is None and 1 <= hour <= 12:
+            candidate = self._at(day, hour, minute)
+            if hour < 12 and candidate < now:
+                hour += 12   # 午前/午後が不明で過去になる場合は午後
+                if self._at(day, hour, minute) < now:
+                    certainty = 0.6   # 午後でも過去（翌日の意味かもしれない）
+            elif day > now.date() and hour <= 6:
+                certainty = 0.6   # 明日以降の早朝/午後は文脈で判断する必要がある
+
+        if not explicit_day and self._at(day, hour, minute) < now:
+            certainty = min(certainty, 0.6)
+        return self._at(day, hour, minute), certainty
+
+    def _resolve_end(self, day, parts, start_dt):
+        marker, hour, minute = parts
+        if marker in PM_MARKERS and hour < 12:
+            hour += 12
+        end_dt = self._at(day, hour, minute)
+        if end_dt <= start_dt and marker is None and hour < 12:
+            end_dt += timedelta(hours=12)   # 「午後2時から4時」の 4 時は午後
+        if end_dt <= start_dt:
+            return start_dt, 0.0
+        return end_dt, 1.0
+
+    def _at(self, day, hour, minute):
+        if hour == 24 and minute == 0:
+            return self._at(day + timedelta(days=1), 0, 0)
+        return timezone.make_aware(datetime(day.year, day.month, day.day, hour, minute))
@@ -0,0 +1,73 @@
+from datetime import datetime
+
+
+class ConflictMessageRenderer:
+    """
+    衝突・警告メッセージをテンプレートで生成する（AI を使わない既定の経路）。
+
+    generate_conflict_message のプロンプトと同じルールを、
+    _get_conflict_type の分類結果と既存予定のタイトル・時間・種別から決定的に適用する。
+    """
+
+    def render(self, kind, new_event, existing_event):
+        """
+        kind: 'conflict' | 'warning'（ScheduleService._get_conflict_type の戻り値）
+        new_event / existing_event: _event_to_dict 形式の辞書（start, end, type, is_all_day, category）
+        """
+        title = existing_event.get('title') or '予定'
+
+        # 4. 同カテゴリ → 警告を緩和
+        if self._same_category(new_event, existing_event):
+            return f'同じカテゴリの「{title}」と重なっていますが、念のため確認してください。'
+
+        # 1. 時間指定 vs 時間指定
+        if kind == 'conflict':
+            return f'{self._time_range(existing_event)}の「{title}」と時間が完全に重複しています。'
+
+        # 3. 期間予定 + 日付イベント
+        if existing_event.get('type') == 'block':
+            return f'「{title}」期間中（{self._date_range(existing_event)}）ですが問題ありませんか？'
+        if new_event.get('type') == 'block':
+            return f'期間中の{self._date(existing_event.get("start"))}に「{title}」がありますが問題ありませんか？'
+
+        # 2. 終日イベント + 時間指定
+        if existing_event.get('is_all_day'):
+            return f'この日は「{title}」がありますが、時間は問題ありませんか？'
+        if new_event.get('is_all_day'):
+            return f'この日は{self._time_range(existing_event)}に「{title}」がありますが、問題ありませんか？'
+
+        # strict: 締切との重複
+        if existing_event.get('type') == 'deadline':
+            return f'{self._date(existing_event.get("start"))}は「{title}」の締切です。問題ありませんか？'
+        return f'「{title}」と時間が重なっていますが問題ありませんか？'
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers
+    # ------------------------------------------------------------------ #
+
+    def _same_category(self, new_event, existing_event):
+        new_category      = new_event.get('category') or []
+        existing_category = existing_event.get('category') or []
+        return bool(set(new_category) & set(existing_category))
+
+    def _parse(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d %H:%M')
+        except (TypeError, ValueError):
+            return None
+
+    def _date(self, value):
+        dt = self._parse(value)
+        return f'{dt.month}/{dt.day}' if dt else 'この日'
+
+    def _date_range(self, event):
+        start, end = self._date(event.get('start')), self._date(event.get('end'))
+        return start if not event.get('end') or start == end else f'{start}〜{end}'
+
+    def _time_range(self, event):
+        start, end = self._parse(event.get('start')), self._parse(event.get('end'))
+        if start is None:
+            return '同じ時間帯'
+        if end is None:
+            return f'{start:%H:%M}'
+        return f'{start:%H:%M}〜{end:%H:%M}'
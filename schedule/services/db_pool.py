@@ -0,0 +1,56 @@
+"""
+DB 接続プール（settings.DB_POOL）の補助。
+
+Claude の応答待ちは数秒かかるため、その間リクエストが接続を握ったままだと、
+同時に AI を待つリクエストの数だけ接続が必要になる。AI を呼び出す直前に
+release_connection() で接続をプールへ返し、次のクエリで改めて借りる。
+"""
+from django.db import connections
+from schedule.services.metrics import LatencyStats
+
+# 'wait': 接続を借りるまでの時間 / 'checkout': 借りてから返すまでの時間（schedule/db_backend で計測）
+pool_latency = LatencyStats()
+
+
+def release_connection(alias='default'):
+    """
+    接続をプールへ返す（次のクエリの実行時に自動で借り直される）。
+    プールを使っていない・接続していない・トランザクション中の場合は何もしない。
+    """
+    connection = connections[alias]
+    if not connection.settings_dict['OPTIONS'].get('pool'):
+        return
+    if connection.connection is None or connection.in_atomic_block:
+        return
+    connection.close()
+
+
+def pool_stats(alias='default'):
+    """
+    接続プールの状態（StatsView 用）。プールを使っていなければ None。
+        pool_size       : 現在の接続数（貸出中 + 待機中）
+        in_use          : 貸出中の接続数
+        saturation      : in_use / pool_max（1.0 で全接続が貸出中）
+        requests_waiting: 空きを待っているリクエスト数
+        requests_queued : 空きがなく待たされた累計回数
+        latency         : 接続を借りるまで（wait）・借りてから返すまで（checkout）の時間
+    """
+    connection = connections[alias]
+    if not connection.settings_dict['OPTIONS'].get('pool'):
+        return None
+
+    stats  = connection.pool.get_stats()
+    in_use   = stats['pool_size'] - stats['pool_available']
+    return {
+        'pool_min'        : stats['pool_min'],
+        'pool_max'        : stats['pool_max'],
+        'pool_size'       : stats['pool_size'],
+        'in_use'          : in_use,
+        'saturation'      : round(in_use / stats['pool_max'], 3),
+        'requests'        : stats.get('requests_num', 0),
+        'requests_waiting': stats.get('requests_waiting', 0),
+        'requests_queued' : stats.get('requests_queued', 0),
+        'requests_timeout': stats.get('requests_errors', 0),
+        'connections_lost': stats.get('connections_lost', 0),
+        'latency'         : pool_latency.snapshot(),
+    }
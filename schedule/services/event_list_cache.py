@@ -0,0 +1,60 @@
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import caches
+from schedule.services.event_version import get_version
+from schedule.services.metrics import HitCounter
+
+
+class EventListCache:
+    """
+    ユーザー × 期間（+ 絞り込み条件）ごとのイベント一覧（_event_to_dict 済みのリスト）のキャッシュ。
+
+    キーにユーザーの変更カウンタ（event_version）を含める。イベントの保存・削除・一括作成・
+    インポートはいずれもコミット後にカウンタを進める（schedule/signals.py）ため、
+    書き込み後の読み込みは必ず新しいキーで DB から取り直され、古いエントリは TTL で消える。
+
+    カウンタと一覧は同じ CACHES[alias] に置く。LocMemCache ではワーカーごとに独立し、他のワーカーでの
+    書き込みが TTL の間反映されないため、settings.SHARED_CACHE が False のときは常に DB から取得する。
+    """
+
+    def __init__(self, alias=None, timeout=None):
+        self.cache   = caches[alias or settings.EVENT_LIST_CACHE_ALIAS]
+        self.timeout = settings.EVENT_LIST_CACHE_TIMEOUT if timeout is None else timeout
+        self.stats   = HitCounter('hit', 'miss')
+
+    def fetch(self, user_id, kind, params, compute):
+        """
+        キャッシュにあればその一覧を、なければ compute() の結果を保存して返す。
+        kind  : 一覧の種類（'range': 期間指定 API / 'period': 自然言語の期間指定）
+        params: 期間・絞り込み条件（JSON に変換できる値のリスト）
+        """
+        if self.timeout <= 0 or not settings.SHARED_CACHE:
+            return compute()
+
+        # カウンタは DB より先に読む（取得中に書き込みがあっても、結果は古いキーに入るだけ）
+        key   = self._make_key(user_id, get_version(user_id), kind, params)
+        value = self.cache.get(key)
+        if value is not None:
+            self.stats.incr('hit')
+            return value
+
+        self.stats.incr('miss')
+        value = compute()
+        self.cache.set(key, value, self.timeout)
+        return value
+
+    def snapshot(self):
+        """ヒット数・ミス数とヒット率。"""
+        return self.merged_snapshot(self)
+
+    @staticmethod
+    def merged_snapshot(*event_caches):
+        """複数の EventListCache のヒット数・ミス数を合算したヒット率。"""
+        counts = HitCounter.merged(*(c.stats for c in event_caches)).snapshot()
+        counts['hit_ratio'] = round(counts['hit'] / counts['total'], 3) if counts['total'] else 0.0
+        return counts
+
+    def _make_key(self, user_id, version, kind, params):
+        raw = json.dumps([user_id, version, kind, params], ensure_ascii=False, default=str)
+        return 'events_list:' + hashlib.sha256(raw.encode('utf-8')).hexdigest()
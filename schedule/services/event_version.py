@@ -0,0 +1,52 @@
+import time
+from django.core.cache import cache
+from django.db import connection
+
+# 一覧レスポンスの形式を変えたら上げる（古い形式の ETag で 304 を返さないため）
+ETAG_FORMAT = 1
+
+
+def _key(user_id, kind):
+    return f'{kind}_version:{user_id}'
+
+
+def get_version(user_id, kind='events'):
+    """
+    ユーザーの変更カウンタを返す。
+    書き込みのたびに bump_version で 1 ずつ増える。キャッシュから消えた場合は
+    以前の値と衝突しないよう現在時刻（ナノ秒）から採番し直す。
+    kind: 'events'（予定一覧・区間インデックス用。繰り返し予定の変更でも進む）/ 'series'（繰り返し予定のみ）
+    """
+    return cache.get_or_set(_key(user_id, kind), time.time_ns, timeout=None)
+
+
+def bump_version(user_id, kind='events'):
+    """ユーザーの予定が変更されたことを記録し、新しいバージョンを返す。"""
+    try:
+        return cache.incr(_key(user_id, kind))
+    except ValueError:
+        version = time.time_ns()
+        cache.set(_key(user_id, kind), version, timeout=None)
+        return version
+
+
+def queryset_etag(*querysets):
+    """
+    イベント一覧の強い ETag を、対象行の件数と updated_at の最大値から作る（行の直列化はしない）。
+    繰り返し予定を含む一覧では、Event と EventSeries の QuerySet を両方渡す（件数は合計、最終更新は最大）。
+    各 QuerySet の updated_at を UNION ALL でつなぎ、まとめて 1 クエリで集計する。
+
+    追加・変更は updated_at の最大値を、削除・範囲外への移動は件数を必ず変えるため、
+    一覧の内容が変われば ETag も変わる。DB を正とするので、変更カウンタと違い
+    ワーカーごとの LocMemCache でも古い ETag が残らない。
+    """
+    parts, params = [], []
+    for queryset in querysets:
+        sql, sql_params = queryset.order_by().values('updated_at').query.sql_with_params()
+        parts.append(f'({sql})')
+        params.extend(sql_params)
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*), MAX(updated_at) FROM ({" UNION ALL ".join(parts)}) AS rows', params)
+        count, last = cursor.fetchone()
+    last = last.timestamp() if last else 0
+    return f'"v{ETAG_FORMAT}-{count}-{int(last * 1_000_000)}"'
@@ -0,0 +1,383 @@
+import heapq
+import re
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from schedule.models import Event
+from schedule.services.command_parser import DEADLINE_RE
+from schedule.services.interval_index import IntervalEntry, effective_end, epoch_micros
+from schedule.services.recurrence import series_registry
+from schedule.signals import events_bulk_imported
+
+
+# VEVENT から読み取るプロパティ（説明文などの長い値は保持しない）
+PROPERTIES = {'UID', 'SUMMARY', 'DTSTART', 'DTEND', 'DURATION', 'CATEGORIES', 'PRIORITY', 'STATUS', 'RRULE', 'RECURRENCE-ID'}
+
+DURATION_RE = re.compile(
+    r'^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$'
+)
+
+# ICS の PRIORITY（1 が最高, 9 が最低, 0 は未指定）→ Event.priority（1〜5）
+PRIORITY_MAP = {1: 1, 2: 1, 3: 2, 4: 2, 5: 3, 6: 4, 7: 4, 8: 5, 9: 5}
+
+# 重なり報告用の行（entry は IntervalEntry または繰り返し予定の回。ScheduleService._get_conflict_type にそのまま渡せる）
+SweepItem = namedtuple('SweepItem', 'entry title ical_uid imported')
+
+
+class IcsFormatError(ValueError):
+    """iCalendar として読めないファイル（VCALENDAR がない・VEVENT が閉じていない）"""
+
+
+def unfold(lines):
+    """RFC 5545 の折り返し行（先頭が空白・タブの行）を元の 1 行に戻す。"""
+    current = None
+    for raw in lines:
+        line = raw.rstrip('\r\n').replace('\x00', '')   # NUL は PostgreSQL の text に保存できない
+        if current is not None and line[:1] in (' ', '\t'):
+            current += line[1:]
+            continue
+        if current:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def parse_content_line(line):
+    """'NAME;PARAM=value:VALUE' を (NAME, {PARAM: value}, VALUE) に分解する。"""
+    quoted = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            quoted = not quoted
+        elif ch == ':' and not quoted:
+            head, value = line[:i], line[i + 1:]
+            break
+    else:
+        return None
+
+    name, *params = head.split(';')
+    parsed = {}
+    for param in params:
+        key, _, val = param.partition('=')
+        parsed[key.upper()] = val.strip('"')
+    return name.upper(), parsed, value
+
+
+def iter_vevents(lines):
+    """
+    ICS の行を 1 行ずつ読み、VEVENT ごとに {プロパティ名: [(params, value), ...]} を返す。
+    保持するのは読み取り中の VEVENT 1 件分だけなので、ファイルの大きさによらずメモリ使用量は一定。
+    VEVENT 内の VALARM などの入れ子のコンポーネントは読み飛ばす。
+    VCALENDAR がない・最後の VEVENT が閉じていないファイルは、読み終えた時点で IcsFormatError を送出する。
+    """
+    props    = None
+    nested   = 0
+    calendar = False
+    for line in unfold(lines):
+        parsed = parse_content_line(line.lstrip('\ufeff'))
+        if parsed is None:
+            continue
+        name, params, value = parsed
+
+        if name == 'BEGIN':
+            if value.upper() == 'VCALENDAR':
+                calendar = True
+            if props is None:
+                if value.upper() == 'VEVENT':
+                    props = {}
+            else:
+                nested += 1
+        elif name == 'END':
+            if props is not None:
+                if nested:
+                    nested -= 1
+                elif value.upper() == 'VEVENT':
+                    yield props
+                    props = None
+        elif props is not None and not nested and name in PROPERTIES:
+            props.setdefault(name, []).append((params, value))
+
+    if not calendar:
+        raise IcsFormatError('iCalendar ファイルではありません（BEGIN:VCALENDAR がありません）')
+    if props is not None:
+        raise IcsFormatError('VEVENT が閉じていません（ファイルが途中で切れている可能性があります）')
+
+
+def unescape_text(value):
+    return (value.replace('\\n', ' ').replace('\\N', ' ')
+                 .replace('\\,', ',').replace('\\;', ';').replace('\\\\', '\\'))
+
+
+def split_categories(value):
+    """CATEGORIES の値をエスケープされていないカンマで分割する。"""
+    return [unescape_text(c).strip() for c in re.split(r'(?<!\\),', value) if c.strip()]
+
+
+@lru_cache(maxsize=64)
+def _zone(tzid):
+    try:
+        return ZoneInfo(tzid)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None   # Windows 形式などの未知の TZID は既定のタイムゾーンで解釈する
+
+
+def parse_ics_datetime(params, value):
+    """
+    DTSTART / DTEND の値を解釈する。
+    Returns:
+        (date, True)      – 日付のみ（VALUE=DATE）
+        (datetime, False) – aware datetime（UTC 指定・TZID・フローティングは既定のタイムゾーン）
+    """
+    value = value.strip()
+    if params.get('VALUE', '').upper() == 'DATE' or len(value) == 8:
+        return datetime.strptime(value[:8], '%Y%m%d').date(), True
+
+    naive = datetime.strptime(value.rstrip('Zz')[:15], '%Y%m%dT%H%M%S')
+    if value[-1:] in ('Z', 'z'):
+        return naive.replace(tzinfo=dt_timezone.utc), False
+    zone = _zone(params['TZID']) if params.get('TZID') else None
+    return timezone.make_aware(naive, zone or timezone.get_current_timezone()), False
+
+
+def parse_ics_duration(value):
+    match = DURATION_RE.match(value.strip())
+    if not match:
+        raise ValueError(f'DURATION を解釈できません: {value}')
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    delta = timedelta(
+        weeks=int(weeks or 0), days=int(days or 0),
+        hours=int(hours or 0), minutes=int(minutes or 0), seconds=int(seconds or 0),
+    )
+    return -delta if sign == '-' else delta
+
+
+class IcsImporter:
+    """
+    iCalendar（.ics）ファイルから予定をインポートする（AI は使わない）。
+
+    VEVENT を 1 件ずつ読みながら Event に変換し、ICS_IMPORT_BATCH_SIZE 件ごとに
+    UID の重複を除いて bulk_create する。全件の書き込み後、取り込んだ期間の予定を
+    開始時刻順に 1 回走査（スイープ）して、重なりを 1 つのレポートにまとめる。
+    """
+
+    COUNT_KEYS = ('vevents', 'created', 'duplicate', 'cancelled', 'overrides', 'recurring', 'invalid')
+
+    def __init__(self, schedule_service, batch_size=None, report_limit=None):
+        self.schedule_service = schedule_service
+        self.batch_size       = batch_size   or settings.ICS_IMPORT_BATCH_SIZE
+        self.report_limit     = report_limit or settings.ICS_IMPORT_REPORT_LIMIT
+
+    def run(self, user_id, lines):
+        """
+        lines: ICS ファイルの行（str）のイテラブル
+        Returns:
+            { status, action, counts: {...}, overlaps: { conflict, warning, items, truncated } }
+        Raises:
+            IcsFormatError: iCalendar として読めない（何も取り込まない）
+        """
+        _, warn_level, _ = self.schedule_service._user_preferences(user_id)
+        counts   = dict.fromkeys(self.COUNT_KEYS, 0)
+        span     = [None, None]   # 取り込んだ予定の [最初の開始, 最後の終了]
+        inserted = set()          # 今回実際に挿入した行の id
+
+        with transaction.atomic():
+            batch = []
+            for props in iter_vevents(lines):
+                counts['vevents'] += 1
+                event = self._event_from_vevent(user_id, props, counts)
+                if event is None:
+                    continue
+                batch.append(event)
+                if len(batch) >= self.batch_size:
+                    self._flush(user_id, batch, counts, span, inserted)
+                    batch = []
+            self._flush(user_id, batch, counts, span, inserted)
+
+            overlaps = self._overlap_report(user_id, span, inserted, warn_level)
+            if counts['created']:
+                events_bulk_imported(user_id)
+
+        return {'status': 'success', 'action': 'import_ics', 'counts': counts, 'overlaps': overlaps}
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers
+    # ------------------------------------------------------------------ #
+
+    def _event_from_vevent(self, user_id, props, counts):
+        """VEVENT を未保存の Event に変換する。取り込まない VEVENT は counts に理由を数えて None を返す。"""
+        if self._first(props, 'STATUS', '').upper() == 'CANCELLED':
+            counts['cancelled'] += 1
+            return None
+        if 'RECURRENCE-ID' in props:
+            # 繰り返し予定の個別変更は親の予定と UID が同じため取り込まない
+            counts['overrides'] += 1
+            return None
+        if 'RRULE' in props:
+            counts['recurring'] += 1   # 初回の予定のみ取り込む
+
+        try:
+            start_params, start_value = props['DTSTART'][0]
+            start, all_day = parse_ics_datetime(start_params, start_value)
+            end = self._end(props, start, all_day)
+        except (KeyError, ValueError, OverflowError):
+            counts['invalid'] += 1
+            return None
+
+        title      = unescape_text(self._first(props, 'SUMMARY', '')).strip()[:200] or '予定'
+        category   = [c for _, value in props.get('CATEGORIES', []) for c in split_categories(value)]
+        is_multi   = all_day and end.date() > start
+        event_type = 'block' if is_multi else 'activity'
+        if not is_multi and (DEADLINE_RE.search(title) or any(DEADLINE_RE.search(c) for c in category)):
+            event_type = 'deadline'
+
+        if all_day:
+            start = timezone.make_aware(datetime.combine(start, time.min), timezone.get_current_timezone())
+
+        return Event(
+            user_id        = user_id,
+            title          = title,
+            start_datetime = start,
+            end_datetime   = end,
+            event_type     = event_type,
+            priority       = self._priority(self._first(props, 'PRIORITY', '0')),
+            is_all_day     = all_day,
+            category       = category,
+            ical_uid       = self._first(props, 'UID', '').strip()[:255],
+        )
+
+    def _end(self, props, start, all_day):
+        """
+        終了日時。終日の予定はアプリの表記（最終日の 23:59）に揃える
+        （ICS の DTEND は翌日 0 時の排他的な終了日）。
+        """
+        end = None
+        if 'DTEND' in props:
+            end, _ = parse_ics_datetime(*props['DTEND'][0])
+        elif 'DURATION' in props:
+            end = start + parse_ics_duration(props['DURATION'][0][1])
+
+        if all_day:
+            last = end.date() if isinstance(end, datetime) else end
+            last = last - timedelta(days=1) if last and last > start else start
+            return timezone.make_aware(datetime.combine(last, time(23, 59)), timezone.get_current_timezone())
+
+        if isinstance(end, date) and not isinstance(end, datetime):
+            raise ValueError('DTSTART と DTEND の形式が一致しません')
+        return end if end is not None and end >= start else None
+
+    def _first(self, props, name, default):
+        values = props.get(name)
+        return values[0][1] if values else default
+
+    def _priority(self, value):
+        try:
+            return PRIORITY_MAP.get(int(value), 3)
+        except ValueError:
+            return 3
+
+    def _flush(self, user_id, batch, counts, span, inserted):
+        """
+        UID が既存・バッチ内で重複する予定を除き、残りを bulk_create する。
+        実際に挿入した行の id を inserted に加え、その件数を created に数える。
+        """
+        if not batch:
+            return
+        uids     = [e.ical_uid for e in batch if e.ical_uid]
+        existing = set(
+            Event.objects.filter(user_id=user_id, ical_uid__in=uids).values_list('ical_uid', flat=True)
+        ) if uids else set()
+
+        new = []
+        for event in batch:
+            if event.ical_uid:
+                if event.ical_uid in existing:
+                    counts['duplicate'] += 1
+                    continue
+                existing.add(event.ical_uid)
+            new.append(event)
+            end = event.end_datetime or event.start_datetime
+            span[0] = event.start_datetime if span[0] is None else min(span[0], event.start_datetime)
+            span[1] = end                  if span[1] is None else max(span[1], end)
+
+        # UID のない予定は一意制約の対象外のため、そのまま挿入して id を受け取る
+        without_uid = [e for e in new if not e.ical_uid]
+        with_uid    = {e.ical_uid: e for e in new if e.ical_uid}
+        Event.objects.bulk_create(without_uid)
+        inserted.update(e.pk for e in without_uid)
+        counts['created'] += len(without_uid)
+
+        # 同時に別のインポートが走った場合の重複は一意制約で無視する。ignore_conflicts では id が返らないため、
+        # UID で読み直し、作成日時（bulk_create が各インスタンスに設定する）が一致する行だけを今回の挿入とみなす
+        Event.objects.bulk_create(with_uid.values(), ignore_conflicts=True)
+        if with_uid:
+            rows = Event.objects.filter(user_id=user_id, ical_uid__in=with_uid).values_list('id', 'ical_uid', 'created_at')
+            ours = [pk for pk, uid, created_at in rows if created_at == with_uid[uid].created_at]
+            inserted.update(ours)
+            counts['created']   += len(ours)
+            counts['duplicate'] += len(with_uid) - len(ours)
+
+    def _overlap_report(self, user_id, span, inserted, warning_level):
+        """
+        取り込んだ期間と重なる予定と繰り返し予定の回を開始時刻順に 1 回走査し、重なりを分類する。
+        走査中に保持するのは「まだ終わっていない予定」だけで、
+        今回挿入した行（inserted。同時に走った別のリクエストの書き込みは含まない）を含む組だけを報告する。
+        """
+        report = {'conflict': 0, 'warning': 0, 'items': [], 'truncated': False}
+        if span[0] is None:
+            return report
+
+        lo, hi = span[0], span[1] + timedelta(microseconds=1)
+        rows = (
+            self.schedule_service._conflict_candidates(user_id, lo, hi)
+            .order_by('start_datetime', 'id')
+            .values_list('id', 'start_datetime', 'end_datetime', 'event_type', 'is_all_day', 'category',
+                         'title', 'ical_uid')
+        )
+        events      = (SweepItem(IntervalEntry(*row[:6]), row[6], row[7], row[0] in inserted)
+                       for row in rows.iterator(chunk_size=2000))
+        occurrences = (SweepItem(o, o.title, '', False) for o in series_registry.overlapping(user_id, lo, hi))
+
+        active = []   # (実効終了時刻, 走査順, SweepItem) のヒープ（回の id は文字列のため id では比べない）
+        for order, item in enumerate(heapq.merge(events, occurrences, key=lambda item: item.entry.start)):
+            start = epoch_micros(item.entry.start)
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+
+            for _, _, other in active:
+                if not (item.imported or other.imported):
+                    continue
+                kind = self.schedule_service._get_conflict_type(
+                    item.entry.event_type, item.entry.is_all_day, item.entry.category, other.entry, warning_level
+                )
+                if kind:
+                    self._add_overlap(report, kind, item, other)
+
+            heapq.heappush(active, (effective_end(item.entry), order, item))
+        return report
+
+    def _add_overlap(self, report, kind, item, other):
+        report[kind] += 1
+        if len(report['items']) >= self.report_limit:
+            report['truncated'] = True
+            return
+        report['items'].append({
+            'status': kind,
+            'event' : self._summary(item),
+            'other' : self._summary(other),
+        })
+
+    def _summary(self, item):
+        start = timezone.localtime(item.entry.start)
+        end   = timezone.localtime(item.entry.end) if item.entry.end else None
+        return {
+            'id'      : item.entry.id,
+            'title'   : item.title,
+            'start'   : start.strftime('%Y-%m-%d %H:%M'),
+            'end'     : end.strftime('%Y-%m-%d %H:%M') if end else None,
+            'ical_uid': item.ical_uid,
+            'imported': item.imported,
+        }
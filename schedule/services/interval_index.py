@@ -0,0 +1,237 @@
+import copy
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from schedule.models import Event
+from schedule.services.event_version import get_version
+from schedule.services.metrics import HitCounter
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# _get_conflict_type が参照する属性（event_type, is_all_day, category）を持つ軽量エントリ
+IntervalEntry = namedtuple('IntervalEntry', 'id start end event_type is_all_day category')
+
+
+def epoch_micros(dt):
+    """aware datetime → エポックからのマイクロ秒（整数）"""
+    return (dt - EPOCH) // timedelta(microseconds=1)
+
+
+def effective_end(entry):
+    """
+    重なり判定用の終了時刻。
+    終了なし・長さ 0 の予定は「開始時刻ちょうど」を占有するものとして扱い、
+    ScheduleService._conflict_candidates と同じ条件（終了 > 新規開始 or 開始 >= 新規開始）になる。
+    """
+    start = epoch_micros(entry.start)
+    end   = epoch_micros(entry.end) if entry.end else start
+    return max(end, start + 1)
+
+
+def entry_from_event(event):
+    return IntervalEntry(
+        event.id, event.start_datetime, event.end_datetime,
+        event.event_type, event.is_all_day, event.category,
+    )
+
+
+class IntervalIndex:
+    """
+    1 ユーザー分のイベント区間インデックス（開始時刻でソートした配列上の拡張区間木）。
+
+    各部分木の最大終了時刻を持たせ、重なり検索を O(log n + k) で返す。
+    追加・削除はバッファ（pending / removed）に積み、一定量を超えたら再構築する。
+    add / remove はその場で書き換えるため、複数スレッドで共有するインデックスは updated() で作り直して差し替える。
+    """
+
+    REBUILD_THRESHOLD = 64
+
+    def __init__(self, entries, version=None):
+        self.version = version
+        self._build(entries)
+
+    def __len__(self):
+        return len(self._entries) - len(self._removed) + len(self._pending)
+
+    def add(self, entry):
+        self.remove(entry.id)
+        self._pending[entry.id] = entry
+        self._maybe_rebuild()
+
+    def remove(self, event_id):
+        if self._pending.pop(event_id, None) is None and event_id in self._ids:
+            self._removed.add(event_id)
+            self._maybe_rebuild()
+
+    def updated(self, added=(), removed=(), version=None):
+        """
+        追加・削除を反映した新しいインデックスを返す（自身は変更しない）。
+        配列は再構築まで共有し、バッファだけを複製する。
+        """
+        index          = copy.copy(self)
+        index._pending = dict(self._pending)
+        index._removed = set(self._removed)
+        index.version  = version
+        for event_id in removed:
+            index.remove(event_id)
+        for entry in added:
+            index.add(entry)
+        return index
+
+    def overlapping(self, start_dt, end_dt):
+        """[start_dt, end_dt) と重なるエントリを開始時刻順で返す。"""
+        s, e = epoch_micros(start_dt), epoch_micros(end_dt)
+        found = []
+        self._query(0, len(self._entries), s, e, found)
+        if self._removed:
+            found = [x for x in found if x.id not in self._removed]
+        for entry in self._pending.values():
+            if epoch_micros(entry.start) < e and effective_end(entry) > s:
+                found.append(entry)
+        found.sort(key=lambda x: (x.start, x.id))
+        return found
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers
+    # ------------------------------------------------------------------ #
+
+    def _build(self, entries):
+        self._entries = sorted(entries, key=lambda x: (x.start, x.id))
+        self._starts  = [epoch_micros(x.start) for x in self._entries]
+        self._ends    = [effective_end(x) for x in self._entries]
+        self._ids     = {x.id for x in self._entries}
+        self._max_end = [0] * len(self._entries)
+        self._pending = {}
+        self._removed = set()
+        self._fill_max_end(0, len(self._entries))
+
+    def _maybe_rebuild(self):
+        if len(self._pending) + len(self._removed) > self.REBUILD_THRESHOLD:
+            live = [x for x in self._entries if x.id not in self._removed]
+            self._build(live + list(self._pending.values()))
+
+    def _fill_max_end(self, lo, hi):
+        """区間 [lo, hi) を根 mid = (lo + hi) // 2 の部分木として最大終了時刻を埋める。"""
+        if lo >= hi:
+            return 0
+        mid = (lo + hi) // 2
+        self._max_end[mid] = max(
+            self._ends[mid],
+            self._fill_max_end(lo, mid),
+            self._fill_max_end(mid + 1, hi),
+        )
+        return self._max_end[mid]
+
+    def _query(self, lo, hi, s, e, found):
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        # 部分木内に s より後まで続く区間がなければ打ち切り
+        if self._max_end[mid] <= s:
+            return
+        self._query(lo, mid, s, e, found)
+        if self._starts[mid] >= e:
+            return  # 右側はさらに開始が遅いので対象外
+        if self._ends[mid] > s:
+            found.append(self._entries[mid])
+        self._query(mid + 1, hi, s, e, found)
+
+
+class IntervalIndexRegistry:
+    """
+    ユーザーごとの IntervalIndex を保持するプロセス内キャッシュ。
+
+    インデックスは初回（またはバージョン不一致時）に DB から遅延構築する。
+    イベントの保存・削除はシグナル経由で差分反映し、他プロセスでの書き込みは
+    共有キャッシュ上の変更カウンタ（event_version）の不一致で検知して再構築する。
+    保持中のインデックスは書き換えず、差分を反映した新しいインデックスに差し替える
+    （get() で受け取ったインデックスはロックの外で問い合わせてよい）。
+    """
+
+    def __init__(self, max_users=None):
+        self.max_users = max_users or getattr(settings, 'INTERVAL_INDEX_MAX_USERS', 1000)
+        self.stats     = HitCounter('hit', 'rebuild')
+        self._lock     = threading.Lock()
+        self._indexes  = OrderedDict()
+
+    def overlapping(self, user_id, start_dt, end_dt):
+        return self.get(user_id).overlapping(start_dt, end_dt)
+
+    def get(self, user_id):
+        version = get_version(user_id)
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is not None and index.version == version:
+                self._indexes.move_to_end(user_id)
+                self.stats.incr('hit')
+                return index
+
+        index = self._load(user_id, version)
+        with self._lock:
+            self._indexes[user_id] = index
+            self._indexes.move_to_end(user_id)
+            while len(self._indexes) > self.max_users:
+                self._indexes.popitem(last=False)
+        self.stats.incr('rebuild')
+        return index
+
+    def apply_save(self, event, old_version, new_version):
+        """保存されたイベントを差分反映（直前のバージョンと一致する場合のみ）。"""
+        with self._lock:
+            index = self._indexes.get(event.user_id)
+            if index is None:
+                return
+            if index.version != old_version:
+                del self._indexes[event.user_id]
+                return
+            self._indexes[event.user_id] = index.updated([entry_from_event(event)], version=new_version)
+
+    def apply_bulk_save(self, user_id, events, old_version, new_version):
+        """一括作成されたイベントをまとめて差分反映する（バージョンは 1 つだけ進む）。"""
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is None:
+                return
+            if index.version != old_version:
+                del self._indexes[user_id]
+                return
+            self._indexes[user_id] = index.updated([entry_from_event(e) for e in events], version=new_version)
+
+    def apply_delete(self, user_id, event_id, old_version, new_version):
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is None:
+                return
+            if index.version != old_version:
+                del self._indexes[user_id]
+                return
+            self._indexes[user_id] = index.updated(removed=[event_id], version=new_version)
+
+    def advance(self, user_id, old_version, new_version):
+        """
+        予定（Event）以外の変更（繰り返し予定の保存・削除）でカウンタが進んだ場合に、
+        インデックスの内容はそのままでバージョンだけを進める。
+        """
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is None:
+                return
+            if index.version != old_version:
+                del self._indexes[user_id]
+                return
+            self._indexes[user_id] = index.updated(version=new_version)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._indexes.pop(user_id, None)
+
+    def _load(self, user_id, version):
+        rows = Event.objects.filter(user_id=user_id).values_list(
+            'id', 'start_datetime', 'end_datetime', 'event_type', 'is_all_day', 'category',
+        )
+        return IntervalIndex([IntervalEntry(*row) for row in rows], version)
+
+
+interval_indexes = IntervalIndexRegistry()
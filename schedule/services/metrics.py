@@ -0,0 +1,140 @@
+import math
+import threading
+from collections import deque
+
+
+class HitCounter:
+    """スレッドセーフな区分別カウンタ（ヒット数の集計用）"""
+
+    def __init__(self, *keys):
+        self._lock   = threading.Lock()
+        self._counts = {key: 0 for key in keys}
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + amount
+
+    def snapshot(self):
+        """現在の集計値を辞書で返す（total を含む）。"""
+        with self._lock:
+            counts = dict(self._counts)
+        counts['total'] = sum(counts.values())
+        return counts
+
+    def reset(self):
+        with self._lock:
+            for key in self._counts:
+                self._counts[key] = 0
+
+    @classmethod
+    def merged(cls, *counters):
+        """counters の集計値を合算した新しいカウンタ（複数のサービスの集計をまとめて表示する用）。"""
+        merged = cls()
+        for counter in counters:
+            with counter._lock:
+                counts = dict(counter._counts)
+            for key, value in counts.items():
+                merged.incr(key, value)
+        return merged
+
+
+class TokenUsage:
+    """
+    スレッドセーフなタスク別トークン使用量の累計（AI 呼び出しのコスト把握用）。
+    cache_read_input_tokens はプロンプトキャッシュから読んだ分、
+    cache_creation_input_tokens はキャッシュへ書き込んだ分で、いずれも input_tokens には含まれない。
+    """
+
+    FIELDS = ('input_tokens', 'cache_read_input_tokens', 'cache_creation_input_tokens', 'output_tokens')
+
+    def __init__(self):
+        self._lock   = threading.Lock()
+        self._totals = {}
+
+    def record(self, task, usage):
+        """API 応答の usage を加算し、今回の呼び出し分を辞書で返す。"""
+        counts = {field: getattr(usage, field, None) or 0 for field in self.FIELDS}
+        with self._lock:
+            totals = self._totals.setdefault(task, dict.fromkeys(('calls',) + self.FIELDS, 0))
+            totals['calls'] += 1
+            for field, value in counts.items():
+                totals[field] += value
+        return counts
+
+    def snapshot(self):
+        """タスクごとの累計を返す（cache_hit_ratio は入力トークンのうちキャッシュから読んだ割合）。"""
+        with self._lock:
+            totals = {task: dict(values) for task, values in self._totals.items()}
+        for values in totals.values():
+            prompt = (values['input_tokens'] + values['cache_read_input_tokens']
+                      + values['cache_creation_input_tokens'])
+            values['cache_hit_ratio'] = round(values['cache_read_input_tokens'] / prompt, 3) if prompt else 0.0
+        return totals
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+
+    @classmethod
+    def merged(cls, *usages):
+        """usages の累計を合算した新しい TokenUsage。"""
+        merged = cls()
+        for usage in usages:
+            with usage._lock:
+                totals = {task: dict(values) for task, values in usage._totals.items()}
+            for task, values in totals.items():
+                target = merged._totals.setdefault(task, dict.fromkeys(values, 0))
+                for field, value in values.items():
+                    target[field] += value
+        return merged
+
+
+class LatencyStats:
+    """スレッドセーフな区分別レイテンシの集計（区分ごとに直近 window 件から p50 / p95 を求める）"""
+
+    def __init__(self, window=1000):
+        self._lock    = threading.Lock()
+        self._window  = window
+        self._samples = {}
+
+    def observe(self, key, seconds):
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self._window)
+            samples.append(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            samples = {key: sorted(values) for key, values in self._samples.items()}
+        return {
+            key: {
+                'count' : len(values),
+                'p50_ms': _percentile_ms(values, 50),
+                'p95_ms': _percentile_ms(values, 95),
+                'max_ms': round(values[-1] * 1000, 1),
+            }
+            for key, values in samples.items() if values
+        }
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    @classmethod
+    def merged(cls, *stats):
+        """stats の直近の計測値をすべて含む新しい LatencyStats（p50 / p95 は合わせた計測値から求める）。"""
+        merged = cls(window=sum(s._window for s in stats) or 1)
+        for s in stats:
+            with s._lock:
+                samples = {key: list(values) for key, values in s._samples.items()}
+            for key, values in samples.items():
+                for seconds in values:
+                    merged.observe(key, seconds)
+        return merged
+
+
+def _percentile_ms(sorted_values, percent):
+    # nearest-rank 法
+    rank = max(1, math.ceil(len(sorted_values) * percent / 100))
+    return round(sorted_values[rank - 1] * 1000, 1)
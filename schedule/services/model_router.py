@@ -0,0 +1,47 @@
+from typing import NamedTuple
+from django.conf import settings
+
+
+class Route(NamedTuple):
+    tier      : str
+    model     : str
+    max_tokens: int
+    timeout   : float
+
+
+class ModelRouter:
+    """
+    AI 呼び出しのタスクごとに、使うモデル・max_tokens・タイムアウトを決める。
+
+    settings.AI_TASK_ROUTES でタスク → 階層（tier）と max_tokens を、
+    settings.AI_MODEL_TIERS で階層 → モデル名とタイムアウト（レイテンシの上限）を指定する。
+    JSON を解析できない応答が返った場合は AI_ESCALATION_TIER の階層で再試行する。
+    """
+
+    def __init__(self, routes=None, tiers=None, escalation_tier=None):
+        self.routes          = routes or settings.AI_TASK_ROUTES
+        self.tiers           = tiers or settings.AI_MODEL_TIERS
+        self.escalation_tier = escalation_tier or settings.AI_ESCALATION_TIER
+
+    def route(self, task, escalated=False):
+        config = self.routes[task]
+        tier   = self.escalation_tier if escalated else config['tier']
+        return Route(
+            tier       = tier,
+            model      = self.tiers[tier]['model'],
+            max_tokens = config['max_tokens'],
+            timeout    = self.tiers[tier]['timeout'],
+        )
+
+    def can_escalate(self, task):
+        return self.route(task).model != self.route(task, escalated=True).model
+
+    def params(self, task, request, escalated=False):
+        """messages.create / stream に渡す引数。request 側の max_tokens が優先される。"""
+        route = self.route(task, escalated)
+        return {
+            'model'     : route.model,
+            'max_tokens': route.max_tokens,
+            'timeout'   : route.timeout,
+            **request,
+        }
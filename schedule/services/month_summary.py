@@ -0,0 +1,213 @@
+"""
+月間ビュー用の日別サマリー。
+
+カレンダーの点・バッジ・ブロック帯の描画に必要な集計だけを DB 側で求める。
+予定の一覧は返さないため、応答サイズと描画コストは月の予定数に比例しない。
+
+- 日付はローカル（settings.TIME_ZONE）の日付で数える
+- ブロック・終日の予定は期間中の各日に展開し、それ以外は開始日に 1 件と数える
+- 集計は generate_series で日付へ展開したうえでの GROUP BY 1 回、
+  ブロックの表示用情報（タイトル・期間）は月と重なるブロックだけを別に 1 回取得する
+- 繰り返し予定（EventSeries）は月と重なるシリーズの回だけを展開し、同じ規則で日別の集計に加える
+"""
+import calendar
+from datetime import date, datetime, time, timedelta
+from django.db import connection
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.utils import timezone
+from schedule.models import Event, EventSeries
+from schedule.services.event_version import queryset_etag
+from schedule.services.recurrence import series_registry
+
+
+PRIORITIES = [p for p, _ in Event.PRIORITY_CHOICES]
+
+# 優先度 → priorities の添字。範囲外の値は SUMMARY_SQL と同じくどの優先度にも数えない
+PRIORITY_SLOTS = {p: i for i, p in enumerate(PRIORITIES)}
+
+SUMMARY_SQL = f"""
+WITH ev AS (
+    SELECT id, event_type, priority, is_all_day,
+           start_datetime AT TIME ZONE %(tz)s                              AS local_start,
+           COALESCE(end_datetime, start_datetime) AT TIME ZONE %(tz)s      AS local_end
+      FROM {Event._meta.db_table}
+     WHERE user_id = %(user_id)s
+       AND period && %(range)s
+), days AS (
+    SELECT ev.*, d::date AS day
+      FROM ev,
+           LATERAL generate_series(
+               GREATEST(ev.local_start::date, %(first)s::date),
+               CASE WHEN ev.event_type = 'block' OR ev.is_all_day
+                    THEN LEAST(ev.local_end::date, %(last)s::date)
+                    ELSE ev.local_start::date END,
+               interval '1 day'
+           ) AS d
+)
+SELECT day,
+       COUNT(*),
+       COUNT(*) FILTER (WHERE event_type = 'activity'),
+       COUNT(*) FILTER (WHERE event_type = 'deadline'),
+       COUNT(*) FILTER (WHERE event_type = 'block'),
+       {', '.join(f'COUNT(*) FILTER (WHERE priority = {p})' for p in PRIORITIES)},
+       COUNT(*) FILTER (WHERE is_all_day),
+       MIN(local_start) FILTER (WHERE NOT is_all_day AND event_type <> 'block' AND local_start::date = day),
+       ARRAY_AGG(id ORDER BY local_start, id) FILTER (WHERE event_type = 'block')
+  FROM days
+ GROUP BY day
+ ORDER BY day
+"""
+
+
+def month_bounds(year, month, tz=None):
+    """月初 0 時〜翌月初 0 時（ローカル）の半開区間と、月の初日・末日。"""
+    tz    = tz or timezone.get_current_timezone()
+    first = date(year, month, 1)
+    last  = date(year, month, calendar.monthrange(year, month)[1])
+    lo    = datetime.combine(first, time.min, tzinfo=tz)
+    hi    = datetime.combine(last + timedelta(days=1), time.min, tzinfo=tz)
+    return lo, hi, first, last
+
+
+def month_summary(user_id, year, month):
+    """
+    指定月の日別サマリーを返す。予定のない日は days に含めない。
+
+    days  : [{date, total, types, priorities, all_day, first_start, blocks}]
+            types は件数 0 の種別を省略、priorities は優先度 1〜5 の件数、
+            first_start は時刻指定の予定（ブロック・終日を除く）の最も早い開始 'HH:MM'、
+            blocks はその日にかかるブロックの id（開始順）
+    blocks: 月と重なるブロックの表示用情報 {id, title, start, end, type, is_all_day, priority, category}
+    """
+    tz_name = timezone.get_current_timezone_name()
+    lo, hi, first, last = month_bounds(year, month)
+    params = {
+        'tz'     : tz_name,
+        'user_id': user_id,
+        'range'  : DateTimeTZRange(lo, hi, '[)'),
+        'first'  : first,
+        'last'   : last,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(SUMMARY_SQL, params)
+        rows = cursor.fetchall()
+
+    days = {}
+    for row in rows:
+        day, total, activity, deadline, block = row[:5]
+        priorities                            = list(row[5:5 + len(PRIORITIES)])
+        all_day, first_start, block_ids       = row[5 + len(PRIORITIES):]
+        days[day] = {
+            'date'       : day.isoformat(),
+            'total'      : total,
+            'types'      : {'activity': activity, 'deadline': deadline, 'block': block},
+            'priorities' : priorities,
+            'all_day'    : all_day,
+            'first_start': first_start.time() if first_start else None,
+            'blocks'     : block_ids or [],
+        }
+
+    blocks = [_block_dict(b) for b in Event.objects.filter(
+        user_id        = user_id,
+        event_type     = 'block',
+        period__overlap= params['range'],
+    ).order_by('start_datetime', 'id').values(
+        'id', 'title', 'start_datetime', 'end_datetime', 'is_all_day', 'priority', 'category',
+    )]
+
+    occurrences = series_registry.overlapping(user_id, lo, hi)
+    if occurrences:
+        _add_occurrences(days, blocks, occurrences, first, last)
+
+    for summary in days.values():
+        summary['types']       = {k: v for k, v in summary['types'].items() if v}
+        summary['first_start'] = summary['first_start'].strftime('%H:%M') if summary['first_start'] else None
+
+    return {
+        'month' : f'{year:04d}-{month:02d}',
+        'days'  : [days[day] for day in sorted(days)],
+        'blocks': blocks,
+    }
+
+
+def month_summary_etag(user_id, year, month):
+    """
+    month_summary の ETag（月と重なるイベントと繰り返し予定のシリーズの件数と最終更新日時。
+    それぞれ period の GiST インデックスを使い、まとめて 1 クエリ）。
+    """
+    lo, hi, _, _ = month_bounds(year, month)
+    month_range  = DateTimeTZRange(lo, hi, '[)')
+    return queryset_etag(
+        Event.objects.filter(user_id=user_id, period__overlap=month_range),
+        EventSeries.objects.filter(user_id=user_id, period__overlap=month_range),
+    )
+
+
+def _add_occurrences(days, blocks, occurrences, first, last):
+    """繰り返し予定の回を SUMMARY_SQL と同じ規則で日別の集計（days）とブロック（blocks）に加える。"""
+    block_starts = {b['id']: b['start'] for b in blocks}
+    for o in occurrences:
+        local_start = timezone.localtime(o.start_datetime)
+        local_end   = timezone.localtime(o.end_datetime or o.start_datetime)
+        spans_days  = o.event_type == 'block' or o.is_all_day
+        day         = max(local_start.date(), first)
+        end_day     = min(local_end.date(), last) if spans_days else local_start.date()
+        if o.event_type == 'block':
+            block = _block_dict({
+                'id'            : o.id,
+                'title'         : o.title,
+                'start_datetime': o.start_datetime,
+                'end_datetime'  : o.end_datetime,
+                'is_all_day'    : o.is_all_day,
+                'priority'      : o.priority,
+                'category'      : o.category,
+            })
+            blocks.append(block)
+            block_starts[o.id] = block['start']
+
+        while day <= end_day:
+            summary = days.get(day)
+            if summary is None:
+                summary = days[day] = {
+                    'date'       : day.isoformat(),
+                    'total'      : 0,
+                    'types'      : {'activity': 0, 'deadline': 0, 'block': 0},
+                    'priorities' : [0] * len(PRIORITIES),
+                    'all_day'    : 0,
+                    'first_start': None,
+                    'blocks'     : [],
+                }
+            summary['total'] += 1
+            if o.event_type in summary['types']:
+                summary['types'][o.event_type] += 1
+            slot = PRIORITY_SLOTS.get(o.priority)
+            if slot is not None:
+                summary['priorities'][slot] += 1
+            if o.is_all_day:
+                summary['all_day'] += 1
+            elif o.event_type != 'block' and local_start.date() == day:
+                at = local_start.time()
+                summary['first_start'] = min(summary['first_start'], at) if summary['first_start'] else at
+            if o.event_type == 'block':
+                summary['blocks'].append(o.id)
+            day += timedelta(days=1)
+
+    # ブロックは開始順（同じ開始日時では Event・回の順）
+    blocks.sort(key=lambda b: b['start'])
+    for summary in days.values():
+        summary['blocks'].sort(key=block_starts.get)
+
+
+def _block_dict(row):
+    start = timezone.localtime(row['start_datetime'])
+    end   = timezone.localtime(row['end_datetime']) if row['end_datetime'] else None
+    return {
+        'id'        : row['id'],
+        'title'     : row['title'],
+        'start'     : start.strftime('%Y-%m-%d %H:%M'),
+        'end'       : end.strftime('%Y-%m-%d %H:%M') if end else None,
+        'type'      : 'block',
+        'is_all_day': row['is_all_day'],
+        'priority'  : row['priority'],
+        'category'  : row['category'],
+    }
@@ -0,0 +1,77 @@
+"""
+イベント一覧のキーセットページネーション。
+
+(start_datetime, id) の順に並べ、前のページの最後の行より後ろだけを取得する。
+OFFSET を使わないため、何ページ目でも (user_id, start_datetime) インデックスの範囲走査で
+先頭の limit + 1 件を読むだけで済み、1 リクエストのメモリも limit 件分に収まる。
+
+繰り返し予定の回（recurrence.Occurrence）は id の代わりに -シリーズの id を並び順のキーにして
+同じ順序に混ぜる（同じ開始日時では回が先）。cursor の形式は変わらない。
+"""
+import base64
+import heapq
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+from operator import itemgetter
+from django.db.models import Q
+from schedule.services.bulk_serializer import LocalTimeFormatter, serialize_keyed, serialize_page
+from schedule.services.recurrence import Occurrence, occurrence_dict
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def encode_cursor(start_datetime, event_id):
+    """(start_datetime, id) を URL にそのまま載せられる不透明な文字列にする。"""
+    micros = (start_datetime - EPOCH) // timedelta(microseconds=1)
+    raw    = json.dumps([micros, event_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """encode_cursor の逆。形式が正しくなければ ValueError。"""
+    try:
+        raw              = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        micros, event_id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError('cursor が不正です')
+    if not isinstance(micros, int) or not isinstance(event_id, int):
+        raise ValueError('cursor が不正です')
+    return EPOCH + timedelta(microseconds=micros), event_id
+
+
+def paginate_events(queryset, cursor=None, limit=100, occurrences=()):
+    """
+    queryset を (start_datetime, id) 順に limit 件ずつ返す。
+    cursor     : 前のページの next_cursor を decode_cursor した値（None なら先頭から）
+    occurrences: 同じ一覧に混ぜる繰り返し予定の回（(start_datetime, -series_id) 順。
+                 cursor より後ろの回を少なくとも limit + 1 件、またはすべて含むこと）
+    Returns: { events: [...], next_cursor: 続きがなければ None }
+    """
+    queryset = queryset.order_by('start_datetime', 'id')
+    if cursor is not None:
+        start, event_id = cursor
+        # start_datetime__gte はインデックスの範囲条件として効かせるための冗長な条件
+        queryset = queryset.filter(start_datetime__gte=start).filter(
+            Q(start_datetime__gt=start) | Q(id__gt=event_id)
+        )
+    if occurrences:
+        events, last = _merge_page(queryset, cursor, limit, occurrences)
+    else:
+        events, last = serialize_page(queryset, limit)
+    return {
+        'events'     : events,
+        'next_cursor': encode_cursor(*last) if last else None,
+    }
+
+
+def _merge_page(queryset, cursor, limit, occurrences):
+    """queryset の先頭 limit + 1 行と繰り返し予定の回を並び順で混ぜ、先頭 limit 件を返す（serialize_page と同じ形）。"""
+    fmt    = LocalTimeFormatter()
+    rows   = serialize_keyed(queryset[:limit + 1], fmt)
+    extra  = [((o.start_datetime, -o.series_id), o) for o in occurrences]
+    if cursor is not None:
+        extra = [item for item in extra if item[0] > tuple(cursor)]
+    merged = list(heapq.merge(rows, extra, key=itemgetter(0)))[:limit + 1]
+    last   = merged[limit - 1][0] if len(merged) > limit else None
+    return [occurrence_dict(x, fmt) if isinstance(x, Occurrence) else x for _, x in merged[:limit]], last
@@ -0,0 +1,179 @@
+import re
+import unicodedata
+from datetime import date, timedelta
+from django.utils import timezone
+
+
+WEEKDAYS = {'月': 0, '火': 1, '水': 2, '木': 3, '金': 4, '土': 5, '日': 6}
+
+RELATIVE_DAYS = {
+    '今日': 0, '本日': 0, 'きょう': 0,
+    '明日': 1, 'あした': 1, 'あす': 1,
+    '明後日': 2, 'あさって': 2,
+    '昨日': -1, 'きのう': -1,
+    '一昨日': -2, 'おととい': -2,
+}
+
+RELATIVE_WEEKS  = {'今週': 0, '来週': 1, '再来週': 2, '先週': -1}
+RELATIVE_MONTHS = {'今月': 0, '来月': 1, '再来月': 2, '先月': -1}
+RELATIVE_YEARS  = {'今年': 0, '来年': 1, '去年': -1, '昨年': -1}
+
+# 「今日の予定」「来週は?」などの末尾表現を取り除く
+SUFFIX_RE = re.compile(r'(の予定|予定|の|は|を|[?？!！。、\s])+$')
+RANGE_RE  = re.compile(r'^(.+?)(?:〜|~|から)(.+?)(?:まで)?$')
+
+WEEK_RE       = '|'.join(sorted(RELATIVE_WEEKS, key=len, reverse=True))
+WEEKDAY_RE    = re.compile(rf'^({WEEK_RE})?の?([月火水木金土日])曜日?$')
+WEEKEND_RE    = re.compile(rf'^({WEEK_RE})?末$|^({WEEK_RE})?の?週末$')
+OFFSET_RE     = re.compile(r'^(\d+)(日|週間)(後|前)$')
+NEXT_DAYS_RE  = re.compile(r'^(?:今後|これから)?(\d+)(日|週間)(?:間)?$')
+YMD_RE        = re.compile(r'^(\d{4})[年/-](\d{1,2})[月/-](\d{1,2})日?$')
+YM_RE         = re.compile(r'^(\d{4})(?:年(\d{1,2})月|[/-](\d{1,2}))$')
+Y_RE          = re.compile(r'^(\d{4})年$')
+MD_RE         = re.compile(r'^(\d{1,2})(?:月(\d{1,2})日|/(\d{1,2}))$')
+M_RE          = re.compile(r'^(\d{1,2})月$')
+
+
+class PeriodResolver:
+    """
+    日本語の期間指定をルールベースで日時範囲に変換する。
+
+    確実に解釈できる表現（今日・来週・2026年3月・3/4・3日後・来週火曜 など）のみを扱い、
+    それ以外は None を返して AI による解析に委ねる。
+    """
+
+    def resolve(self, period_text, today=None):
+        """
+        Returns:
+            { "start": "YYYY-MM-DD 00:00", "end": "YYYY-MM-DD 23:59" }
+            または None（ローカルで解釈できない場合）
+        """
+        if today is None:
+            today = timezone.localdate()
+
+        text = self._normalize(period_text)
+        if not text:
+            return None
+
+        span = self._resolve_span(text, today)
+        if span is None:
+            span = self._resolve_range(text, today)
+        if span is None:
+            return None
+
+        start, end = span
+        return {
+            'start': start.strftime('%Y-%m-%d 00:00'),
+            'end'  : end.strftime('%Y-%m-%d 23:59'),
+        }
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers
+    # ------------------------------------------------------------------ #
+
+    def _normalize(self, text):
+        text = unicodedata.normalize('NFKC', text or '').strip()
+        text = SUFFIX_RE.sub('', text)
+        return text.replace(' ', '')
+
+    def _resolve_range(self, text, today):
+        """「3月1日〜3月5日」「今日から来週まで」のような範囲指定"""
+        m = RANGE_RE.match(text)
+        if not m:
+            return None
+        head = self._resolve_span(m.group(1), today)
+        tail = self._resolve_span(self._normalize(m.group(2)), today)
+        if head is None or tail is None or head[0] > tail[1]:
+            return None
+        return head[0], tail[1]
+
+    def _resolve_span(self, text, today):
+        """単一の期間表現を (開始日, 終了日) に変換する。"""
+        if text in RELATIVE_DAYS:
+            day = today + timedelta(days=RELATIVE_DAYS[text])
+            return day, day
+
+        if text in RELATIVE_WEEKS:
+            monday = self._week_start(today, RELATIVE_WEEKS[text])
+            return monday, monday + timedelta(days=6)
+
+        if text in RELATIVE_MONTHS:
+            return self._month_span(*self._add_months(today.year, today.month, RELATIVE_MONTHS[text]))
+
+        if text in RELATIVE_YEARS:
+            year = today.year + RELATIVE_YEARS[text]
+            return date(year, 1, 1), date(year, 12, 31)
+
+        m = WEEKEND_RE.match(text)
+        if m:
+            week   = m.group(1) or m.group(2)
+            monday = self._week_start(today, RELATIVE_WEEKS.get(week, 0))
+            return monday + timedelta(days=5), monday + timedelta(days=6)
+
+        m = WEEKDAY_RE.match(text)
+        if m:
+            weekday = WEEKDAYS[m.group(2)]
+            if m.group(1):
+                day = self._week_start(today, RELATIVE_WEEKS[m.group(1)]) + timedelta(days=weekday)
+            else:
+                # 週の指定がなければ今日以降で最も近い該当曜日
+                day = today + timedelta(days=(weekday - today.weekday()) % 7)
+            return day, day
+
+        m = OFFSET_RE.match(text)
+        if m:
+            days = int(m.group(1)) * (7 if m.group(2) == '週間' else 1)
+            day  = today + timedelta(days=days if m.group(3) == '後' else -days)
+            return day, day
+
+        m = NEXT_DAYS_RE.match(text)
+        if m and (text.startswith(('今後', 'これから')) or text.endswith('間')):
+            days = int(m.group(1)) * (7 if m.group(2) == '週間' else 1)
+            if days < 1:
+                return None
+            return today, today + timedelta(days=days - 1)
+
+        m = YMD_RE.match(text)
+        if m:
+            day = self._safe_date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+            return (day, day) if day else None
+
+        m = YM_RE.match(text)
+        if m:
+            month = int(m.group(2) or m.group(3))
+            return self._month_span(int(m.group(1)), month) if 1 <= month <= 12 else None
+
+        m = Y_RE.match(text)
+        if m:
+            year = int(m.group(1))
+            return date(year, 1, 1), date(year, 12, 31)
+
+        m = MD_RE.match(text)
+        if m:
+            day = self._safe_date(today.year, int(m.group(1)), int(m.group(2) or m.group(3)))
+            return (day, day) if day else None
+
+        m = M_RE.match(text)
+        if m:
+            month = int(m.group(1))
+            return self._month_span(today.year, month) if 1 <= month <= 12 else None
+
+        return None
+
+    def _week_start(self, today, offset):
+        return today - timedelta(days=today.weekday()) + timedelta(weeks=offset)
+
+    def _add_months(self, year, month, offset):
+        index = year * 12 + (month - 1) + offset
+        return index // 12, index % 12 + 1
+
+    def _month_span(self, year, month):
+        first = date(year, month, 1)
+        next_year, next_month = self._add_months(year, month, 1)
+        return first, date(next_year, next_month, 1) - timedelta(days=1)
+
+    def _safe_date(self, year, month, day):
+        try:
+            return date(year, month, day)
+        except ValueError:
+            return None
@@ -0,0 +1,425 @@
+"""
+繰り返し予定（EventSeries）の RRULE の解釈と、期間内の回の展開。
+
+シリーズは 1 行で保存し、各回は参照された期間の分だけ展開する。期間の先頭までは
+日数・週数・月数の計算で飛ぶため、展開のコストは期間内の回数だけに比例し、
+初回からの経過期間やシリーズ全体の回数には依存しない。各回は初回のローカル時刻
+（settings.TIME_ZONE の壁時計）を保つ。
+
+対応する RRULE（RFC 5545 のサブセット）:
+    FREQ      : DAILY / WEEKLY / MONTHLY
+    INTERVAL  : 1 以上の整数
+    BYDAY     : WEEKLY のみ。MO,TU,... の曜日（"1MO" のような序数は不可）
+    BYMONTHDAY: MONTHLY のみ。1〜31 / -1〜-31（-1 は月末）。その日がない月（2/30 など）は飛ばす
+    COUNT / UNTIL（どちらか一方）
+回は RRULE に該当する日だけで、DTSTART（初回の開始日時）が該当しない場合は次の該当日から始まる。
+"""
+import calendar
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from django.conf import settings
+from django.utils import timezone
+from schedule.models import EventSeries
+from schedule.services.bulk_serializer import LocalTimeFormatter
+from schedule.services.event_version import get_version
+from schedule.services.interval_index import effective_end, epoch_micros
+from schedule.services.metrics import HitCounter
+
+
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+
+# 最終回を求めるために数える期間の上限（該当日が少ないルールでも必ず止まるように）
+SEARCH_YEARS = 100
+
+RRule = namedtuple('RRule', 'freq interval byday bymonthday count until')
+
+
+class Occurrence(namedtuple('Occurrence', (
+    'id series_id user_id title start_datetime end_datetime '
+    'event_type priority is_all_day category created_at rrule'
+))):
+    """
+    展開した 1 回分。Event と同じ属性名を持ち、_get_conflict_type・ScheduleService._event_to_dict に
+    そのまま渡せる。start / end を持つため IntervalIndex のエントリにもなる。
+    id は 's{シリーズの id}:{元の開始日時（ローカル, YYYYMMDDHHMM）}'
+    """
+
+    __slots__ = ()
+
+    @property
+    def start(self):
+        return self.start_datetime
+
+    @property
+    def end(self):
+        return self.end_datetime
+
+
+@lru_cache(maxsize=1024)
+def parse_rrule(text):
+    """RRULE の文字列（先頭の 'RRULE:' は省略可）を RRule にする。未対応・不正な指定は ValueError。"""
+    body = text.strip()
+    if body.upper().startswith('RRULE:'):
+        body = body[6:]
+
+    parts = {}
+    for part in filter(None, body.split(';')):
+        key, sep, value = part.partition('=')
+        key = key.strip().upper()
+        if not sep or not value.strip() or key in parts:
+            raise ValueError(f'RRULE の形式が不正です: {part}')
+        parts[key] = value.strip().upper()
+
+    unknown = set(parts) - {'FREQ', 'INTERVAL', 'BYDAY', 'BYMONTHDAY', 'COUNT', 'UNTIL', 'WKST'}
+    if unknown:
+        raise ValueError(f'未対応の RRULE の指定です: {", ".join(sorted(unknown))}')
+
+    freq = parts.get('FREQ')
+    if freq not in ('DAILY', 'WEEKLY', 'MONTHLY'):
+        raise ValueError(f'未対応の FREQ です: {freq}')
+    if parts.get('WKST', 'MO') != 'MO':
+        raise ValueError('WKST は MO のみ対応しています')
+
+    interval = _positive_int(parts.get('INTERVAL', '1'), 'INTERVAL')
+
+    byday = ()
+    if 'BYDAY' in parts:
+        if freq != 'WEEKLY':
+            raise ValueError('BYDAY は FREQ=WEEKLY でのみ指定できます')
+        days = parts['BYDAY'].split(',')
+        if any(day not in WEEKDAYS for day in days):
+            raise ValueError(f'BYDAY が不正です: {parts["BYDAY"]}')
+        byday = tuple(sorted({WEEKDAYS.index(day) for day in days}))
+
+    bymonthday = ()
+    if 'BYMONTHDAY' in parts:
+        if freq != 'MONTHLY':
+            raise ValueError('BYMONTHDAY は FREQ=MONTHLY でのみ指定できます')
+        try:
+            bymonthday = tuple(sorted({int(day) for day in parts['BYMONTHDAY'].split(',')}))
+        except ValueError:
+            raise ValueError(f'BYMONTHDAY が不正です: {parts["BYMONTHDAY"]}')
+        if any(day == 0 or not -31 <= day <= 31 for day in bymonthday):
+            raise ValueError(f'BYMONTHDAY が不正です: {parts["BYMONTHDAY"]}')
+
+    if 'COUNT' in parts and 'UNTIL' in parts:
+        raise ValueError('COUNT と UNTIL は同時に指定できません')
+    count = _positive_int(parts['COUNT'], 'COUNT') if 'COUNT' in parts else None
+    if count is not None and count > settings.RECURRENCE_MAX_COUNT:
+        raise ValueError(f'COUNT は {settings.RECURRENCE_MAX_COUNT} 以下にしてください')
+    until = _parse_until(parts['UNTIL']) if 'UNTIL' in parts else None
+
+    return RRule(freq, interval, byday, bymonthday, count, until)
+
+
+def series_end(rrule, dtstart, duration):
+    """
+    最終回の終了日時（EventSeries.series_end に保存する値）。無期限なら None。
+    COUNT は初回から数えた最終回、UNTIL は UNTIL の時点で終わるものとして求める。
+    該当する回が 1 つもないルールは ValueError。
+    """
+    rule  = parse_rrule(rrule)
+    first = timezone.localtime(dtstart)
+    limit = first.date() + timedelta(days=366 * SEARCH_YEARS)
+    if rule.until is not None:
+        limit = min(limit, timezone.localtime(rule.until).date())
+
+    last, n = None, 0
+    for day in _dates(rule, first.date(), first.date(), limit):
+        start = _at(day, first.time())
+        if start < dtstart or (rule.until is not None and start > rule.until):
+            continue
+        last, n = start, n + 1
+        if rule.count is None or n >= rule.count:
+            break
+    if last is None:
+        raise ValueError('繰り返しルールに該当する日がありません')
+
+    if rule.count is not None:
+        return last + (duration or timedelta(0))
+    if rule.until is not None:
+        return rule.until + (duration or timedelta(0))
+    return None
+
+
+def expand(series, lo, hi, limit=None):
+    """
+    series の回のうち開始日時が [lo, hi) にあるものを開始順に返す（取り消した回を除く）。
+    limit を指定した場合は先頭から最大 limit 件。
+    """
+    rule  = parse_rrule(series.rrule)
+    first = timezone.localtime(series.dtstart)
+    lo    = max(lo, series.dtstart)
+    if series.series_end is not None:
+        hi = min(hi, series.series_end - (series.duration or timedelta(0)) + timedelta(microseconds=1))
+    if lo >= hi:
+        return []
+
+    excluded    = set(series.exdates)
+    occurrences = []
+    for day in _dates(rule, first.date(), timezone.localtime(lo).date(), timezone.localtime(hi).date()):
+        start = _at(day, first.time())
+        if start < lo or start in excluded:
+            continue
+        if start >= hi or (limit is not None and len(occurrences) >= limit):
+            break
+        occurrences.append(_occurrence(series, start))
+    return occurrences
+
+
+def first_occurrence(series):
+    """series の最初の回（取り消した回を除く）。なければ None。"""
+    hi    = series.dtstart + timedelta(days=366 * SEARCH_YEARS)
+    found = expand(series, series.dtstart, hi, limit=1)
+    return found[0] if found else None
+
+
+def occurrence_id(series_id, start):
+    return f's{series_id}:{timezone.localtime(start):%Y%m%d%H%M}'
+
+
+def parse_recurrence_id(value):
+    """URL の回の指定（元の開始日時 'YYYYMMDDHHMM'、ローカル）を aware な datetime にする。不正なら ValueError。"""
+    return timezone.make_aware(datetime.strptime(value, '%Y%m%d%H%M'), timezone.get_current_timezone())
+
+
+def occurrence_dict(occurrence, formatter=None):
+    """ScheduleService._event_to_dict と同じ形の辞書に、シリーズの id と RRULE を加えたもの。"""
+    fmt = formatter or LocalTimeFormatter()
+    return {
+        'id'        : occurrence.id,
+        'user_id'   : occurrence.user_id,
+        'title'     : occurrence.title,
+        'start'     : fmt.minutes(occurrence.start_datetime),
+        'end'       : fmt.minutes(occurrence.end_datetime),
+        'type'      : occurrence.event_type,
+        'priority'  : occurrence.priority,
+        'is_all_day': occurrence.is_all_day,
+        'category'  : occurrence.category,
+        'created_at': fmt.seconds(occurrence.created_at),
+        'series_id' : occurrence.series_id,
+        'rrule'     : occurrence.rrule,
+    }
+
+
+def series_dict(series):
+    start = timezone.localtime(series.dtstart)
+    end   = timezone.localtime(series.series_end) if series.series_end else None
+    return {
+        'id'        : series.id,
+        'user_id'   : series.user_id,
+        'title'     : series.title,
+        'start'     : start.strftime('%Y-%m-%d %H:%M'),
+        'duration'  : int(series.duration.total_seconds() // 60) if series.duration is not None else None,
+        'rrule'     : series.rrule,
+        'series_end': end.strftime('%Y-%m-%d %H:%M') if end else None,
+        'exdates'   : [timezone.localtime(d).strftime('%Y-%m-%d %H:%M') for d in sorted(series.exdates)],
+        'type'      : series.event_type,
+        'priority'  : series.priority,
+        'is_all_day': series.is_all_day,
+        'category'  : series.category,
+    }
+
+
+class OccurrenceCache:
+    """
+    (シリーズ, 期間) ごとの展開結果のプロセス内 LRU キャッシュ。
+
+    キーにシリーズの updated_at を含める。回の取り消し・切り出しはシリーズの行を保存し直すため、
+    変更後は新しいキーで展開し直され、古いエントリは LRU で押し出される。
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or settings.RECURRENCE_CACHE_MAX_ENTRIES
+        self.stats       = HitCounter('hit', 'miss')
+        self._lock       = threading.Lock()
+        self._entries    = OrderedDict()
+
+    def get(self, series, lo, hi, limit=None):
+        key = (series.id, series.updated_at, lo, hi, limit)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.stats.incr('hit')
+                return value
+
+        self.stats.incr('miss')
+        value = tuple(expand(series, lo, hi, limit))
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+
+class SeriesRegistry:
+    """
+    ユーザーごとの繰り返し予定（EventSeries の行）を保持するプロセス内キャッシュ。
+
+    シリーズの保存・削除はコミット後に共有キャッシュ上の変更カウンタ（event_version の 'series'）を
+    進める（schedule/signals.py）。カウンタの不一致で他プロセスでの変更も検知し、DB から読み直す。
+    通常の予定（Event）の書き込みではこのカウンタは進まない。
+    settings.SHARED_CACHE が False（カウンタがワーカーごとに独立する）のときは保持せず、毎回 DB から読む。
+    展開結果のキャッシュはキーにシリーズの updated_at を含むため、どちらの場合も使う。
+    """
+
+    def __init__(self, max_users=None):
+        self.max_users   = max_users or settings.RECURRENCE_MAX_USERS
+        self.stats       = HitCounter('hit', 'load')
+        self.occurrences = OccurrenceCache()
+        self._lock       = threading.Lock()
+        self._series     = OrderedDict()   # user_id -> (version, シリーズのタプル)
+
+    def get(self, user_id):
+        if not settings.SHARED_CACHE:
+            self.stats.incr('load')
+            return self._load(user_id)
+
+        version = get_version(user_id, 'series')
+        with self._lock:
+            cached = self._series.get(user_id)
+            if cached is not None and cached[0] == version:
+                self._series.move_to_end(user_id)
+                self.stats.incr('hit')
+                return cached[1]
+
+        series = self._load(user_id)
+        with self._lock:
+            self._series[user_id] = (version, series)
+            self._series.move_to_end(user_id)
+            while len(self._series) > self.max_users:
+                self._series.popitem(last=False)
+        self.stats.incr('load')
+        return series
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._series.pop(user_id, None)
+
+    def _load(self, user_id):
+        return tuple(EventSeries.objects.filter(user_id=user_id).order_by('dtstart', 'id'))
+
+    def between(self, user_id, lo, hi, limit=None, event_type=None, priority=None, category=None):
+        """
+        開始日時が [lo, hi) にある回を、全シリーズ分まとめて (開始日時, -シリーズの id) の順に返す。
+        limit はシリーズごとの上限。event_type / priority / category でシリーズを絞り込める。
+        """
+        found = []
+        for series in self.get(user_id):
+            if event_type and series.event_type != event_type:
+                continue
+            if priority and series.priority != priority:
+                continue
+            if category and category not in (series.category or []):
+                continue
+            if series.dtstart >= hi or (series.series_end is not None and series.series_end < lo):
+                continue
+            found.extend(self.occurrences.get(series, lo, hi, limit))
+        found.sort(key=lambda o: (o.start_datetime, -o.series_id))
+        return found
+
+    def overlapping(self, user_id, start_dt, end_dt):
+        """[start_dt, end_dt) と重なる回を開始順に返す（IntervalIndex.overlapping と同じ判定）。"""
+        s, e  = epoch_micros(start_dt), epoch_micros(end_dt)
+        found = []
+        for series in self.get(user_id):
+            reach = max(series.duration or timedelta(0), timedelta(microseconds=1))
+            if series.dtstart >= end_dt or (series.series_end is not None and series.series_end < start_dt):
+                continue
+            for occurrence in self.occurrences.get(series, start_dt - reach, end_dt):
+                if epoch_micros(occurrence.start) < e and effective_end(occurrence) > s:
+                    found.append(occurrence)
+        found.sort(key=lambda o: (o.start_datetime, -o.series_id))
+        return found
+
+    def snapshot(self):
+        return {'series': self.stats.snapshot(), 'occurrences': self.occurrences.stats.snapshot()}
+
+
+series_registry = SeriesRegistry()
+
+
+# ---------------------------------------------------------------------- #
+# Internal helpers
+# ---------------------------------------------------------------------- #
+
+def _positive_int(value, name):
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise ValueError(f'{name} は 1 以上の整数で指定してください')
+    return number
+
+
+def _parse_until(value):
+    """UNTIL（'YYYYMMDD' はその日の終わりまで、'YYYYMMDDTHHMMSS[Z]'）を aware な datetime にする。"""
+    tz = timezone.get_current_timezone()
+    try:
+        if len(value) == 8:
+            day = datetime.strptime(value, '%Y%m%d').date()
+            return timezone.make_aware(datetime.combine(day, time.max), tz)
+        if value.endswith('Z'):
+            return datetime.strptime(value, '%Y%m%dT%H%M%SZ').replace(tzinfo=dt_timezone.utc)
+        return timezone.make_aware(datetime.strptime(value, '%Y%m%dT%H%M%S'), tz)
+    except ValueError:
+        raise ValueError(f'UNTIL が不正です: {value}')
+
+
+def _occurrence(series, start):
+    start = start.astimezone(dt_timezone.utc)   # DB から読んだ日時と同じく UTC で持つ（LocalTimeFormatter の前提）
+    return Occurrence(
+        occurrence_id(series.id, start), series.id, series.user_id, series.title,
+        start, start + series.duration if series.duration is not None else None,
+        series.event_type, series.priority, series.is_all_day, series.category,
+        series.created_at, series.rrule,
+    )
+
+
+def _at(day, at):
+    return timezone.make_aware(datetime.combine(day, at), timezone.get_current_timezone())
+
+
+def _dates(rule, first, from_day, to_day):
+    """
+    first（初回の日付）から始まる rule の該当日のうち、[from_day, to_day] にあるものを昇順に返す。
+    from_day の手前の周期は計算で飛ばす。
+    """
+    from_day = max(from_day, first)
+    if rule.freq == 'DAILY':
+        step = timedelta(days=rule.interval)
+        day  = first + step * ((from_day - first).days // rule.interval)
+        while day <= to_day:
+            if day >= from_day:
+                yield day
+            day += step
+
+    elif rule.freq == 'WEEKLY':
+        weekdays = rule.byday or (first.weekday(),)
+        week     = first - timedelta(days=first.weekday())   # 初回の週の月曜
+        step     = timedelta(weeks=rule.interval)
+        week    += step * ((from_day - week).days // 7 // rule.interval)
+        while week <= to_day:
+            for weekday in weekdays:
+                day = week + timedelta(days=weekday)
+                if from_day <= day <= to_day:
+                    yield day
+            week += step
+
+    else:  # MONTHLY
+        monthdays = rule.bymonthday or (first.day,)
+        origin    = first.year * 12 + first.month - 1
+        month     = origin + (from_day.year * 12 + from_day.month - 1 - origin) // rule.interval * rule.interval
+        while date(month // 12, month % 12 + 1, 1) <= to_day:
+            year, mon = divmod(month, 12)
+            last      = calendar.monthrange(year, mon + 1)[1]
+            days      = sorted({d if d > 0 else last + 1 + d for d in monthdays if abs(d) <= last})
+            for d in days:
+                day = date(year, mon + 1, d)
+                if from_day <= day <= to_day:
+                    yield day
+            month += rule.interval
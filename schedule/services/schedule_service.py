@@ -1,14 +1,29 @@
-from django.db.models import Q
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models import Case, CharField, Q, Value, When
 from django.utils import timezone
-from datetime import datetime
-from schedule.models import Event, UserSettings
+from datetime import datetime, timedelta
+from schedule.models import Event, EventSeries
 from schedule.services.ai_service import AIService
+from schedule.services.conflict_messages import ConflictMessageRenderer
+from schedule.services.event_list_cache import EventListCache
+from schedule.services.event_version import queryset_etag
+from schedule.services.interval_index import IntervalEntry, IntervalIndex, entry_from_event, interval_indexes
+from schedule.services.pagination import paginate_events
+from schedule.services.recurrence import (
+    Occurrence, expand, first_occurrence, occurrence_dict, parse_recurrence_id, series_dict, series_end, series_registry,
+)
+from schedule.services.settings_cache import user_settings_cache
+from schedule.signals import events_bulk_created
 
 class ScheduleService:
     """スケジュール管理のビジネスロジック"""
 
-    def __init__(self):
-        self.ai_service = AIService()
+    def __init__(self, ai_service=None):
+        self.ai_service       = ai_service or AIService()
+        self.message_renderer = ConflictMessageRenderer()
+        self.event_cache      = EventListCache()
 
     def create_event(self, user_id, natural_input, force=False):
         """
@@ -19,70 +34,33 @@ class ScheduleService:
           - 期間警告 (warning) : フロントに Yes/No を促して返す
         force=True のとき警告を無視して作成する。
         """
-        # ユーザー設定を取得
-        settings_obj = UserSettings.objects.filter(user_id=user_id).first()
-        duration     = settings_obj.default_duration_hours if settings_obj else 1
-        warn_level   = settings_obj.warning_level          if settings_obj else 'standard'
+        duration, warn_level, ai_warning = self._user_preferences(user_id)
 
         event_data = self.ai_service.parse_natural_language(natural_input, duration)
 
-        start_dt = self._parse_datetime(event_data['start_datetime'])
-        end_dt   = self._parse_datetime(event_data['end_datetime']) if event_data.get('end_datetime') else None
+        start_dt, end_dt = self._event_range(event_data)
 
         if not force:
-            check = self._check_conflicts(user_id, start_dt, end_dt, event_data, warn_level)
-            hard  = check['conflicts']
-            soft  = check['warnings']
-
-            new_dict = {
-                'title'     : event_data['title'],
-                'start'     : event_data['start_datetime'],
-                'end'       : event_data.get('end_datetime'),
-                'type'      : event_data.get('event_type', 'activity'),
-                'is_all_day': event_data.get('is_all_day', False),
-                'category'  : event_data.get('category'),
-            }
+            check    = self._check_conflicts(user_id, start_dt, end_dt, event_data, warn_level)
+            hard     = check['conflicts']
+            soft     = check['warnings']
+            new_dict = self._proposed_dict(event_data)
 
             if hard:
-                conflict_list = []
-                for c in hard:
-                    cd = self._event_to_dict(c)
-                    cd['warning_message'] = self.ai_service.generate_conflict_message(new_dict, cd)
-                    conflict_list.append(cd)
                 return {
                     'status'        : 'conflict',
-                    'conflicts'     : conflict_list,
+                    'conflicts'     : self._with_warning_messages(new_dict, hard, 'conflict', ai_warning),
                     'proposed_event': event_data,
                 }
 
             if soft:
-                warning_list = []
-                for w in soft:
-                    wd = self._event_to_dict(w)
-                    wd['warning_message'] = self.ai_service.generate_conflict_message(new_dict, wd)
-                    warning_list.append(wd)
                 return {
                     'status'        : 'warning',
-                    'warnings'      : warning_list,
+                    'warnings'      : self._with_warning_messages(new_dict, soft, 'warning', ai_warning),
                     'proposed_event': event_data,
                 }
 
-        event = Event.objects.create(
-            user_id        = user_id,
-            title          = event_data['title'],
-            start_datetime = start_dt,
-            end_datetime   = end_dt,
-            event_type     = event_data.get('event_type', 'activity'),
-            priority       = event_data.get('priority', 3),
-            is_all_day     = event_data.get('is_all_day', False),
-            category       = event_data.get('category'),
-        )
-
-        return {
-            'status'  : 'success',
-            'event_id': event.id,
-            'event'   : self._event_to_dict(event),
-        }
+        return self._create_event_from_data(user_id, event_data, start_dt, end_dt)
 
     def update_event(self, event_id, user_id, title=None, start_datetime=None, end_datetime=None):
         """タイトル・開始・終了日時を更新する。"""
@@ -118,17 +96,7 @@ class ScheduleService:
         title_kw  = search.get('title_keyword', '')
 
         # イベントを検索
-        candidates = Event.objects.filter(user_id=user_id)
-        if date_str:
-            try:
-                day        = datetime.strptime(date_str, '%Y-%m-%d').date()
-                candidates = candidates.filter(start_datetime__date=day)
-            except ValueError:
-                pass
-        if title_kw:
-            candidates = candidates.filter(title__icontains=title_kw)
-
-        events_list = list(candidates.order_by('start_datetime'))
+        events_list = self._find_events(user_id, date_str, title_kw)
         found_count = len(events_list)
 
         if found_count == 0:
@@ -158,15 +126,34 @@ class ScheduleService:
         return self._apply_modify(events_list[0], intent, command.get('changes', {}))
 
     def apply_modify_to_event(self, event_id, user_id, intent, changes):
-        """選択確定後に特定イベントへ変更・削除を適用する。"""
+        """選択確定後に特定イベント（繰り返し予定の回は 's{シリーズの id}:{YYYYMMDDHHMM}'）へ変更・削除を適用する。"""
+        if str(event_id).startswith('s'):
+            series_id, _, recurrence_id = str(event_id)[1:].partition(':')
+            if not series_id.isdigit():
+                raise ValueError('イベントが見つかりません')
+            return self._apply_modify(self._find_occurrence(user_id, int(series_id), recurrence_id), intent, changes)
         try:
-            event = Event.objects.get(id=event_id, user_id=user_id)
+            event = Event.objects.get(id=int(event_id), user_id=user_id)
         except Event.DoesNotExist:
             raise ValueError('イベントが見つかりません')
         return self._apply_modify(event, intent, changes)
 
     def _apply_modify(self, event, intent, changes):
-        """変更・削除を実際に実行する共通処理。"""
+        """変更・削除を実際に実行する共通処理（繰り返し予定の回はその回だけを取り消す・切り出す）。"""
+        if isinstance(event, Occurrence):
+            if intent == 'delete':
+                return self.cancel_occurrence(event.user_id, event.series_id, event.start_datetime)
+            result = self.detach_occurrence(
+                event.user_id, event.series_id, event.start_datetime,
+                changes.get('title'), changes.get('start_datetime'), changes.get('end_datetime'),
+            )
+            return {
+                'status' : 'success',
+                'action' : 'update',
+                'message': f'「{result["event"]["title"]}」（{result["event"]["start"][:10]} の回）を更新しました',
+                'event'  : result['event'],
+            }
+
         if intent == 'delete':
             event_dict = self._event_to_dict(event)
             event.delete()
@@ -194,106 +181,370 @@ class ScheduleService:
 
     def execute_command(self, user_id, natural_input):
         """統合コマンド: 追加/検索/変更/削除を自然言語から判定して実行する。"""
-        settings_obj = UserSettings.objects.filter(user_id=user_id).first()
-        duration     = settings_obj.default_duration_hours if settings_obj else 1
-        warn_level   = settings_obj.warning_level          if settings_obj else 'standard'
+        for event, data in self.stream_command(user_id, natural_input):
+            if event == 'result':
+                return data
+
+    def stream_command(self, user_id, natural_input):
+        """
+        execute_command の各段階の結果を (イベント名, データ) で順に返す（SSE 用）。
+            intent          – 意図の判定結果
+            draft           – 追加する予定の解析結果（intent=add）
+            period          – 検索期間の解決結果（intent=search）
+            conflicts       – 重複・警告対象の予定（警告文なし）
+            warning_message – 警告文 1 件（index は conflicts 内の位置）
+            result          – execute_command と同じ最終レスポンス（必ず最後に 1 回）
+        """
+        duration, warn_level, ai_warning = self._user_preferences(user_id)
 
         cmd    = self.ai_service.parse_unified_command(natural_input, duration)
         intent = cmd.get('intent', 'unknown')
+        yield 'intent', {'intent': intent}
 
         if intent == 'add':
             event_data = cmd.get('event_data') or {}
             if not event_data.get('start_datetime'):
-                return {'status': 'error', 'message': '予定の日時を読み取れませんでした。日時を含めて入力してください。'}
+                yield 'result', {'status': 'error', 'message': '予定の日時を読み取れませんでした。日時を含めて入力してください。'}
+                return
+            yield 'draft', {'proposed_event': event_data}
 
-            start_dt = self._parse_datetime(event_data['start_datetime'])
-            end_dt   = self._parse_datetime(event_data['end_datetime']) if event_data.get('end_datetime') else None
-
-            check = self._check_conflicts(user_id, start_dt, end_dt, event_data, warn_level)
-
-            new_dict = {
-                'title'     : event_data.get('title', ''),
-                'start'     : event_data['start_datetime'],
-                'end'       : event_data.get('end_datetime'),
-                'type'      : event_data.get('event_type', 'activity'),
-                'is_all_day': event_data.get('is_all_day', False),
-                'category'  : event_data.get('category'),
-            }
+            start_dt, end_dt = self._event_range(event_data)
 
-            if check['conflicts']:
-                conflict_list = []
-                for c in check['conflicts']:
-                    cd = self._event_to_dict(c)
-                    cd['warning_message'] = self.ai_service.generate_conflict_message(new_dict, cd)
-                    conflict_list.append(cd)
-                return {'status': 'conflict', 'action': 'add', 'conflicts': conflict_list, 'proposed_event': event_data}
+            check    = self._check_conflicts(user_id, start_dt, end_dt, event_data, warn_level)
+            new_dict = self._proposed_dict(event_data)
 
-            if check['warnings']:
-                warning_list = []
-                for w in check['warnings']:
-                    wd = self._event_to_dict(w)
-                    wd['warning_message'] = self.ai_service.generate_conflict_message(new_dict, wd)
-                    warning_list.append(wd)
-                return {'status': 'warning', 'action': 'add', 'warnings': warning_list, 'proposed_event': event_data}
+            for kind, key in (('conflict', 'conflicts'), ('warning', 'warnings')):
+                if check[key]:
+                    dicts = [self._event_to_dict(e) for e in check[key]]
+                    yield 'conflicts', {'status': kind, key: dicts}
+                    for index, msg in self._iter_warning_messages(new_dict, dicts, kind, ai_warning):
+                        dicts[index]['warning_message'] = msg
+                        yield 'warning_message', {'status': kind, 'index': index, 'message': msg}
+                    yield 'result', {'status': kind, 'action': 'add', key: dicts, 'proposed_event': event_data}
+                    return
 
-            return self._create_event_from_data(user_id, event_data, start_dt, end_dt)
+            yield 'result', self._create_event_from_data(user_id, event_data, start_dt, end_dt)
 
         elif intent == 'search':
-            period = cmd.get('period') or '今日'
-            events = self.get_events(user_id, period)
-            return {'status': 'success', 'action': 'search', 'period': period, 'events': events}
+            period     = cmd.get('period') or '今日'
+            range_data = self.ai_service.parse_period(period)
+            yield 'period', {'period': period, **range_data}
+            page       = self._events_in_period(user_id, range_data)
+            yield 'result', {'status': 'success', 'action': 'search', 'period': period, **page}
 
         elif intent in ('update', 'delete'):
-            search   = cmd.get('search') or {}
-            date_str = search.get('date')
-            title_kw = search.get('title_keyword', '')
-            changes  = cmd.get('changes') or {}
+            yield 'result', self._modify_from_command(user_id, intent, cmd.get('search') or {}, cmd.get('changes') or {})
 
-            candidates = Event.objects.filter(user_id=user_id)
-            if date_str:
-                try:
-                    day        = datetime.strptime(date_str, '%Y-%m-%d').date()
-                    candidates = candidates.filter(start_datetime__date=day)
-                except ValueError:
-                    pass
-            if title_kw:
-                candidates = candidates.filter(title__icontains=title_kw)
+        else:
+            yield 'result', {
+                'status' : 'error',
+                'message': '入力の意図を読み取れませんでした。予定の追加・検索・変更・削除のいずれかを入力してください。',
+            }
 
-            events_list = list(candidates.order_by('start_datetime'))
-            found_count = len(events_list)
+    def bulk_add_events(self, user_id, natural_input, force=False):
+        """
+        複数行の入力（1 行 1 件）から予定をまとめて追加する。
 
-            if found_count == 0:
-                action_str = '変更' if intent == 'update' else '削除'
-                return {'status': 'not_found', 'message': f'予定が見つかりませんでした。{action_str}する予定を確認してください。'}
+        AI 解析は parse_bulk_events（長い入力はチャンク単位）で行い、衝突チェックは
+        既存の予定と同じ入力内の先行する行の両方に対して 1 パスで行う。
+        conflict の行は追加せず、warning の行は force=True のときのみ追加する。
+        追加する行は 1 トランザクション内の bulk_create でまとめて作成する。
 
-            if found_count > 1:
-                action_str = '変更' if intent == 'update' else '削除'
-                return {
-                    'status' : 'multiple',
-                    'action' : intent,
-                    'message': f'{found_count}件の予定が見つかりました。{action_str}する予定を選んでください。',
-                    'events' : [self._event_to_dict(e) for e in events_list],
-                    'intent' : intent,
-                    'changes': changes,
-                }
+        Returns:
+            items の各要素は { index, input, status, ... }
+              status – 'created' | 'conflict' | 'warning' | 'error'
+        """
+        lines = [line.strip() for line in natural_input.splitlines() if line.strip()]
+        duration, warn_level, _ = self._user_preferences(user_id)
 
-            return self._apply_modify(events_list[0], intent, changes)
+        items, drafts = [], []
+        for index, (line, event_data) in enumerate(zip(lines, self.ai_service.parse_bulk_events(lines, duration))):
+            item = {'index': index, 'input': line}
+            items.append(item)
+            try:
+                start_dt, end_dt = self._event_range(event_data or {})
+            except (KeyError, TypeError, ValueError):
+                item.update(status='error', message='予定の日時を読み取れませんでした')
+                continue
+            item['proposed_event'] = event_data
+            drafts.append((item, event_data, start_dt, end_dt))
+
+        spans     = [(start_dt, end_dt) for _, _, start_dt, end_dt in drafts]
+        existing  = self._bulk_conflict_index(user_id, spans)
+        recurring = self._bulk_recurring_index(user_id, spans)
+        batch     = IntervalIndex([])
+        accepted  = []
+        hits      = []   # (item, kind, 相手) – 相手は _bulk_conflicts の戻り値を参照
+
+        for item, event_data, start_dt, end_dt in drafts:
+            found = self._bulk_conflicts(existing, recurring, batch, start_dt, end_dt, event_data, warn_level)
+            hits.extend((item, kind, other) for kind, other in found)
+            kinds = {kind for kind, _ in found}
+            if 'conflict' in kinds:
+                item['status'] = 'conflict'
+            elif 'warning' in kinds and not force:
+                item['status'] = 'warning'
+            else:
+                item['status'] = 'created'
+                batch.add(IntervalEntry(
+                    -(item['index'] + 1), start_dt, end_dt,
+                    event_data.get('event_type', 'activity'),
+                    event_data.get('is_all_day', False),
+                    event_data.get('category'),
+                ))
+                accepted.append((item, self._new_event(user_id, event_data, start_dt, end_dt)))
+
+        self._attach_bulk_conflicts(items, hits)
+
+        if accepted:
+            with transaction.atomic():
+                created = Event.objects.bulk_create([event for _, event in accepted])
+                events_bulk_created(user_id, created)
+            for (item, _), event in zip(accepted, created):
+                item['event_id'] = event.id
+                item['event']    = self._event_to_dict(event)
+
+        counts = {key: 0 for key in ('created', 'conflict', 'warning', 'error')}
+        for item in items:
+            counts[item['status']] += 1
+        return {'status': 'success', 'action': 'bulk_add', 'counts': counts, 'items': items}
 
-        else:
+    def force_add_event(self, user_id, event_data):
+        """警告を無視してイベントを作成する（proposed_event を直接受け取る）。"""
+        start_dt, end_dt = self._event_range(event_data)
+        return self._create_event_from_data(user_id, event_data, start_dt, end_dt)
+
+    def _create_event_from_data(self, user_id, event_data, start_dt, end_dt):
+        """
+        event_data dict から Event を作成して辞書を返す。
+        rrule があれば繰り返し予定（EventSeries）を 1 行だけ作成し、event には初回を返す。
+        """
+        if event_data.get('rrule'):
+            series = self._new_series(user_id, event_data, start_dt, end_dt)
+            series.save()
+            first = first_occurrence(series)
             return {
-                'status' : 'error',
-                'message': '入力の意図を読み取れませんでした。予定の追加・検索・変更・削除のいずれかを入力してください。',
+                'status'  : 'success',
+                'action'  : 'add',
+                'event_id': first.id if first else None,
+                'event'   : self._event_to_dict(first) if first else None,
+                'series'  : series_dict(series),
             }
 
-    def force_add_event(self, user_id, event_data):
-        """警告を無視してイベントを作成する（proposed_event を直接受け取る）。"""
+        event = self._new_event(user_id, event_data, start_dt, end_dt)
+        event.save()
+        return {'status': 'success', 'action': 'add', 'event_id': event.id, 'event': self._event_to_dict(event)}
+
+    # ------------------------------------------------------------------ #
+    # Recurring events
+    # ------------------------------------------------------------------ #
+
+    def create_series(self, user_id, event_data, force=False):
+        """
+        構造化された入力（SeriesCreateSerializer）から繰り返し予定を作成する（AI 解析なし）。
+        force=False のとき create_event と同じく、各回の衝突・警告があれば作成せずに返す。
+        """
+        start_dt, end_dt = self._event_range(event_data)
+
+        if not force:
+            _, warn_level, _ = self._user_preferences(user_id)
+            check    = self._check_conflicts(user_id, start_dt, end_dt, event_data, warn_level)
+            new_dict = self._proposed_dict(event_data)
+            for kind, key in (('conflict', 'conflicts'), ('warning', 'warnings')):
+                if check[key]:
+                    return {
+                        'status'        : kind,
+                        key             : self._with_warning_messages(new_dict, check[key], kind),
+                        'proposed_event': event_data,
+                    }
+
+        return self._create_event_from_data(user_id, event_data, start_dt, end_dt)
+
+    def list_series(self, user_id):
+        """ユーザーの繰り返し予定（シリーズ）の一覧。"""
+        return [series_dict(series) for series in series_registry.get(user_id)]
+
+    def delete_series(self, user_id, series_id):
+        """繰り返し予定をすべての回ごと削除する（切り出し済みの回の Event は残る）。"""
+        deleted, _ = EventSeries.objects.filter(id=series_id, user_id=user_id).delete()
+        if not deleted:
+            raise ValueError('繰り返し予定が見つかりません')
+
+    def cancel_occurrence(self, user_id, series_id, recurrence_id):
+        """
+        繰り返し予定の 1 回だけを取り消す（シリーズの exdates に元の開始日時を加える）。
+        recurrence_id は元の開始日時（aware な datetime、または URL の 'YYYYMMDDHHMM'）。
+        """
+        with transaction.atomic():
+            series, occurrence = self._locked_occurrence(user_id, series_id, recurrence_id)
+            series.exdates = series.exdates + [occurrence.start_datetime]
+            series.save(update_fields=['exdates', 'updated_at'])
+
+        event_dict = self._event_to_dict(occurrence)
+        return {
+            'status' : 'success',
+            'action' : 'delete',
+            'message': f'「{event_dict["title"]}」（{event_dict["start"][:10]} の回）を削除しました',
+            'event'  : event_dict,
+        }
+
+    def detach_occurrence(self, user_id, series_id, recurrence_id, title=None, start_datetime=None, end_datetime=None):
+        """
+        繰り返し予定の 1 回だけを変更する。その回を通常の Event として切り出して変更を適用し、
+        シリーズ側ではその回を取り消す（RFC 5545 の RECURRENCE-ID による個別変更に相当）。
+        """
+        with transaction.atomic():
+            series, occurrence = self._locked_occurrence(user_id, series_id, recurrence_id)
+            event = Event(
+                user_id        = user_id,
+                title          = title or occurrence.title,
+                start_datetime = self._parse_datetime(start_datetime) if start_datetime else occurrence.start_datetime,
+                end_datetime   = self._parse_datetime(end_datetime) if end_datetime else occurrence.end_datetime,
+                event_type     = occurrence.event_type,
+                priority       = occurrence.priority,
+                is_all_day     = occurrence.is_all_day,
+                category       = occurrence.category,
+            )
+            event.save()
+            series.exdates = series.exdates + [occurrence.start_datetime]
+            series.save(update_fields=['exdates', 'updated_at'])
+        return {'status': 'success', 'event': self._event_to_dict(event)}
+
+    def _new_series(self, user_id, event_data, start_dt, end_dt):
+        """event_data dict（rrule あり）から未保存の EventSeries を組み立てる。RRULE が未対応・不正なら ValueError。"""
+        if end_dt is not None and end_dt < start_dt:
+            raise ValueError('終了日時は開始日時より後にしてください')
+        rrule    = event_data['rrule'].strip().upper().removeprefix('RRULE:')
+        duration = end_dt - start_dt if end_dt is not None else None
+        return EventSeries(
+            user_id    = user_id,
+            title      = event_data.get('title', '予定'),
+            dtstart    = start_dt,
+            duration   = duration,
+            rrule      = rrule,
+            series_end = series_end(rrule, start_dt, duration),
+            event_type = event_data.get('event_type', 'activity'),
+            priority   = event_data.get('priority', 3),
+            is_all_day = event_data.get('is_all_day', False),
+            category   = event_data.get('category'),
+        )
+
+    def _find_occurrence(self, user_id, series_id, recurrence_id, series=None):
+        """シリーズの回を元の開始日時で取得する（取り消し済み・ルールに該当しない日時は ValueError）。"""
+        if series is None:
+            series = EventSeries.objects.filter(id=series_id, user_id=user_id).first()
+            if series is None:
+                raise ValueError('繰り返し予定が見つかりません')
+        start = recurrence_id if isinstance(recurrence_id, datetime) else parse_recurrence_id(recurrence_id)
+        found = expand(series, start, start + timedelta(microseconds=1))
+        if not found:
+            raise ValueError('繰り返し予定の該当する回が見つかりません')
+        return found[0]
+
+    def _locked_occurrence(self, user_id, series_id, recurrence_id):
+        """トランザクション内で、シリーズの行をロックしてから回を取得する（exdates の同時更新を防ぐ）。"""
+        series = EventSeries.objects.select_for_update().filter(id=series_id, user_id=user_id).first()
+        if series is None:
+            raise ValueError('繰り返し予定が見つかりません')
+        return series, self._find_occurrence(user_id, series_id, recurrence_id, series)
+
+    def get_events(self, user_id, period_text, cursor=None, limit=None):
+        """期間指定でイベントを取得（1 ページ分。続きは next_cursor で取得する）。"""
+        range_data = self.ai_service.parse_period(period_text)
+        return self._events_in_period(user_id, range_data, cursor, limit)
+
+    def _events_in_period(self, user_id, range_data, cursor=None, limit=None):
+        """
+        parse_period の結果（start / end）の範囲に開始するイベントを 1 ページ分取得。
+        cursor は decode_cursor 済みの値、limit の既定は settings.EVENT_PAGE_SIZE。
+        Returns: { events: [...], next_cursor }
+        """
+        start_dt   = self._parse_datetime(range_data['start'])
+        end_dt     = self._parse_datetime(range_data['end'])
+        limit      = limit or settings.EVENT_PAGE_SIZE
+
+        def compute():
+            events = Event.objects.filter(
+                user_id            = user_id,
+                start_datetime__gte= start_dt,
+                start_datetime__lte= end_dt,
+            )
+            lo, hi    = self._page_window(start_dt, end_dt + timedelta(microseconds=1), cursor)
+            recurring = series_registry.between(user_id, lo, hi, limit + 2)
+            return paginate_events(events, cursor, limit, recurring)
+
+        return self.event_cache.fetch(user_id, 'period', [start_dt, end_dt, cursor, limit], compute)
+
+    def get_events_in_range(self, user_id, start_dt, end_dt, event_type=None, priority=None, category=None,
+                            cursor=None, limit=None):
+        """
+        日時範囲 [start_dt, end_dt) でイベントを 1 ページ分取得（AI を介さない構造化検索）。
+        event_type / priority / category を指定した場合はさらに絞り込む。
+        cursor は decode_cursor 済みの値、limit の既定は settings.EVENT_PAGE_SIZE。
+        Returns: { events: [...], next_cursor }
+        """
+        limit = limit or settings.EVENT_PAGE_SIZE
+
+        def compute():
+            events = Event.objects.filter(
+                user_id            = user_id,
+                start_datetime__gte= start_dt,
+                start_datetime__lt = end_dt,
+            )
+            if event_type:
+                events = events.filter(event_type=event_type)
+            if priority:
+                events = events.filter(priority=priority)
+            if category:
+                events = events.filter(category__contains=[category])
+            lo, hi    = self._page_window(start_dt, end_dt, cursor)
+            recurring = series_registry.between(user_id, lo, hi, limit + 2, event_type, priority, category)
+            return paginate_events(events, cursor, limit, recurring)
+
+        params = [start_dt, end_dt, event_type, priority, category, cursor, limit]
+        return self.event_cache.fetch(user_id, 'range', params, compute)
+
+    def events_in_range_etag(self, user_id, start_dt, end_dt):
+        """
+        get_events_in_range の ETag。絞り込み条件は URL で区別されるため、範囲内の全イベントから求める
+        （(user_id, start_datetime) INCLUDE updated_at のインデックスのみで完結する部分と、
+        範囲と重なる繰り返し予定のシリーズを (user_id, period) の GiST インデックスで数える部分の 1 クエリ）。
+        """
+        return queryset_etag(
+            Event.objects.filter(
+                user_id            = user_id,
+                start_datetime__gte= start_dt,
+                start_datetime__lt = end_dt,
+            ),
+            EventSeries.objects.filter(
+                user_id        = user_id,
+                period__overlap= DateTimeTZRange(start_dt, end_dt, '[)'),
+            ),
+        )
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers
+    # ------------------------------------------------------------------ #
+
+    def _user_preferences(self, user_id):
+        """ユーザー設定（デフォルト所要時間, 注意喚起レベル, AI 注意文）を返す（user_settings_cache 経由）。"""
+        prefs = user_settings_cache.get(user_id)
+        return prefs['default_duration_hours'], prefs['warning_level'], prefs['ai_warning_message']
+
+    def _page_window(self, start_dt, end_dt, cursor):
+        """繰り返し予定を展開する期間 [lo, hi)。2 ページ目以降は前のページの最後の開始日時から。"""
+        if cursor is not None:
+            start_dt = max(start_dt, cursor[0])
+        return start_dt, end_dt
+
+    def _event_range(self, event_data):
         start_dt = self._parse_datetime(event_data['start_datetime'])
         end_dt   = self._parse_datetime(event_data['end_datetime']) if event_data.get('end_datetime') else None
-        return self._create_event_from_data(user_id, event_data, start_dt, end_dt)
+        return start_dt, end_dt
 
-    def _create_event_from_data(self, user_id, event_data, start_dt, end_dt):
-        """event_data dict から Event を作成して辞書を返す。"""
-        event = Event.objects.create(
+    def _new_event(self, user_id, event_data, start_dt, end_dt):
+        """event_data dict から未保存の Event を組み立てる。"""
+        return Event(
             user_id        = user_id,
             title          = event_data.get('title', '予定'),
             start_datetime = start_dt,
@@ -303,25 +554,70 @@ class ScheduleService:
             is_all_day     = event_data.get('is_all_day', False),
             category       = event_data.get('category'),
         )
-        return {'status': 'success', 'action': 'add', 'event_id': event.id, 'event': self._event_to_dict(event)}
 
-    def get_events(self, user_id, period_text):
-        """期間指定でイベントを取得。"""
-        range_data = self.ai_service.parse_period(period_text)
-        start_dt   = self._parse_datetime(range_data['start'])
-        end_dt     = self._parse_datetime(range_data['end'])
+    def _proposed_dict(self, event_data):
+        """警告文生成用に、追加予定の event_data を _event_to_dict と同じ形に揃える。"""
+        return {
+            'title'     : event_data.get('title', ''),
+            'start'     : event_data['start_datetime'],
+            'end'       : event_data.get('end_datetime'),
+            'type'      : event_data.get('event_type', 'activity'),
+            'is_all_day': event_data.get('is_all_day', False),
+            'category'  : event_data.get('category'),
+        }
 
-        events = Event.objects.filter(
-            user_id            = user_id,
-            start_datetime__gte= start_dt,
-            start_datetime__lte= end_dt,
-        ).order_by('start_datetime')
+    def _find_events(self, user_id, date_str, title_kw):
+        """
+        日付（YYYY-MM-DD）とタイトルキーワードで変更・削除対象の候補を検索する。
+        繰り返し予定の回は日付を指定した場合のみ含める（無期限のシリーズを全期間展開しないため）。
+        """
+        candidates = Event.objects.filter(user_id=user_id)
+        day_start  = None
+        if date_str:
+            try:
+                day_start  = self._parse_datetime(f'{date_str} 00:00')
+                candidates = candidates.filter(
+                    start_datetime__gte=day_start,
+                    start_datetime__lt =day_start + timedelta(days=1),
+                )
+            except ValueError:
+                pass
+        if title_kw:
+            candidates = candidates.filter(title__icontains=title_kw)
+        found = list(candidates.order_by('start_datetime'))
+
+        if day_start is not None:
+            found += [
+                o for o in series_registry.between(user_id, day_start, day_start + timedelta(days=1))
+                if not title_kw or title_kw.lower() in o.title.lower()
+            ]
+            found.sort(key=lambda e: e.start_datetime)
+        return found
+
+    def _modify_from_command(self, user_id, intent, search, changes):
+        """統合コマンドの update / delete を実行する。"""
+        date_str = search.get('date')
+        title_kw = search.get('title_keyword', '')
+
+        events_list = self._find_events(user_id, date_str, title_kw)
+        found_count = len(events_list)
 
-        return [self._event_to_dict(e) for e in events]
+        if found_count == 0:
+            action_str = '変更' if intent == 'update' else '削除'
+            return {'status': 'not_found', 'message': f'予定が見つかりませんでした。{action_str}する予定を確認してください。'}
 
-    # ------------------------------------------------------------------ #
-    # Internal helpers
-    # ------------------------------------------------------------------ #
+        if found_count > 1:
+            action_str = '変更' if intent == 'update' else '削除'
+            return {
+                'status' : 'multiple',
+                'action' : intent,
+                'message': f'{found_count}件の予定が見つかりました。{action_str}する予定を選んでください。',
+                'events' : [self._event_to_dict(e) for e in events_list],
+                'intent' : intent,
+                'changes': changes,
+            }
+
+        return self._apply_modify(events_list[0], intent, changes)
 
     def _check_conflicts(self, user_id, start_dt, end_dt, new_event_data, warning_level='standard'):
         """
@@ -330,7 +626,12 @@ class ScheduleService:
             dict: { 'conflicts': [...], 'warnings': [...] }
               conflicts – 時間が完全重複する activity 同士 → 追加不可
               warnings  – block 期間中の追加、終日イベントとの重複 → 確認が必要
+            相手は Event、または繰り返し予定の回（recurrence.Occurrence）。
+        new_event_data に rrule があれば、追加する繰り返し予定の各回について確認する。
         """
+        if new_event_data.get('rrule'):
+            return self._check_series_conflicts(user_id, start_dt, end_dt, new_event_data, warning_level)
+
         if not end_dt:
             return {'conflicts': [], 'warnings': []}
 
@@ -338,11 +639,21 @@ class ScheduleService:
         new_event_type = new_event_data.get('event_type', 'activity')
         new_category   = new_event_data.get('category')
 
-        candidates = Event.objects.filter(user_id=user_id).filter(
-            Q(start_datetime__lt=end_dt, end_datetime__gt=start_dt)
-            | Q(start_datetime__gte=start_dt, start_datetime__lt=end_dt)
-            | Q(start_datetime__lte=start_dt, end_datetime__gte=end_dt)
-        )
+        # 既存の繰り返し予定は、新規期間と重なるシリーズの回だけを展開して分類する
+        recurring = {'conflict': [], 'warning': []}
+        for occurrence in series_registry.overlapping(user_id, start_dt, end_dt):
+            kind = self._get_conflict_type(new_event_type, new_is_all_day, new_category, occurrence, warning_level)
+            if kind:
+                recurring[kind].append(occurrence)
+
+        if settings.CONFLICT_DETECTION == 'sql':
+            result = self._check_conflicts_sql(
+                user_id, start_dt, end_dt, new_event_type, new_is_all_day, new_category, warning_level
+            )
+            return self._merge_conflicts(result, recurring)
+
+        # ユーザーごとの区間インデックスで重なる予定を求め、分類で残ったものだけ DB から取得する
+        candidates = interval_indexes.overlapping(user_id, start_dt, end_dt)
 
         hard, soft = [], []
         for existing in candidates:
@@ -350,12 +661,216 @@ class ScheduleService:
                 new_event_type, new_is_all_day, new_category, existing, warning_level
             )
             if kind == 'conflict':
-                hard.append(existing)
+                hard.append(existing.id)
             elif kind == 'warning':
-                soft.append(existing)
+                soft.append(existing.id)
+
+        events = Event.objects.in_bulk(hard + soft)
+        return self._merge_conflicts({
+            'conflicts': [events[i] for i in hard if i in events],
+            'warnings' : [events[i] for i in soft if i in events],
+        }, recurring)
+
+    def _merge_conflicts(self, result, recurring):
+        """Event の衝突チェック結果に繰り返し予定の回を開始順で混ぜる。"""
+        for key, kind in (('conflicts', 'conflict'), ('warnings', 'warning')):
+            if recurring[kind]:
+                result[key] = sorted(result[key] + recurring[kind], key=lambda e: e.start_datetime)
+        return result
+
+    def _check_series_conflicts(self, user_id, start_dt, end_dt, new_event_data, warning_level):
+        """
+        追加する繰り返し予定の、初回から settings.RECURRENCE_CHECK_DAYS 日分の回について衝突をまとめて確認する。
+        既存の予定は _bulk_conflict_index（DB の問い合わせは最大 1 回）、既存の繰り返し予定は
+        その期間と重なるシリーズの回だけを区間インデックスにして、回ごとに重なりを求める。
+        相手は重複を除いて開始順に返す。
+        """
+        series = self._new_series(user_id, new_event_data, start_dt, end_dt)
+        if not end_dt:
+            return {'conflicts': [], 'warnings': []}
 
+        horizon = start_dt + timedelta(days=settings.RECURRENCE_CHECK_DAYS)
+        spans   = [(o.start_datetime, o.end_datetime) for o in expand(series, start_dt, horizon)]
+        if not spans:
+            return {'conflicts': [], 'warnings': []}
+
+        existing  = self._bulk_conflict_index(user_id, spans)
+        recurring = IntervalIndex(series_registry.overlapping(user_id, spans[0][0], spans[-1][1]))
+
+        found = {'conflict': {}, 'warning': {}}
+        for span_start, span_end in spans:
+            for entry in existing.overlapping(span_start, span_end) + recurring.overlapping(span_start, span_end):
+                kind = self._get_conflict_type(
+                    series.event_type, series.is_all_day, series.category, entry, warning_level
+                )
+                if kind:
+                    found[kind].setdefault(entry.id, entry)
+
+        events = Event.objects.in_bulk([
+            i for entries in found.values() for i, e in entries.items() if not isinstance(e, Occurrence)
+        ])
+        result = {}
+        for key, kind in (('conflicts', 'conflict'), ('warnings', 'warning')):
+            others = [e if isinstance(e, Occurrence) else events.get(i) for i, e in found[kind].items()]
+            result[key] = sorted((e for e in others if e is not None), key=lambda e: e.start_datetime)
+        return result
+
+    def _check_conflicts_sql(self, user_id, start_dt, end_dt, new_type, new_all_day, new_category, warning_level):
+        """
+        衝突チェック（PostgreSQL 版）。period && 範囲 で重なりを求め、
+        _get_conflict_type と同じ分類を SQL の CASE 式で行い、該当する行だけを返す。
+        """
+        kind = self._conflict_kind_expression(new_type, new_all_day, new_category, warning_level)
+        rows = (
+            self._conflict_candidates(user_id, start_dt, end_dt)
+            .annotate(conflict_kind=kind)
+            .filter(conflict_kind__isnull=False)
+            .order_by('start_datetime')
+        )
+
+        hard, soft = [], []
+        for existing in rows:
+            (hard if existing.conflict_kind == 'conflict' else soft).append(existing)
         return {'conflicts': hard, 'warnings': soft}
 
+    def _conflict_kind_expression(self, new_type, new_all_day, new_category, warning_level='standard'):
+        """
+        _get_conflict_type の判定を既存イベント側の列に対する CASE 式に変換する。
+        新規イベント側の条件は Python で確定できるため、該当する WHEN 句だけを組み立てる。
+        """
+        whens   = []
+        default = None
+
+        # 同カテゴリ例外（JSON 配列のいずれかの要素が一致）
+        if new_category:
+            whens.append(When(category__has_any_keys=list(new_category), then=Value(None)))
+
+        # 時間指定 activity 同士の完全重複 → conflict
+        if new_type == 'activity' and not new_all_day:
+            whens.append(When(event_type='activity', is_all_day=False, then=Value('conflict')))
+
+        if warning_level != 'gentle':
+            if new_type == 'block' or new_all_day:
+                default = 'warning'
+            else:
+                whens.append(When(Q(event_type='block') | Q(is_all_day=True), then=Value('warning')))
+                if warning_level == 'strict':
+                    if new_type == 'deadline':
+                        default = 'warning'
+                    else:
+                        whens.append(When(event_type='deadline', then=Value('warning')))
+
+        return Case(*whens, default=Value(default), output_field=CharField(null=True))
+
+    def _conflict_candidates(self, user_id, start_dt, end_dt):
+        """
+        新規期間 [start_dt, end_dt) と重なる既存イベントの QuerySet。
+        生成列 period との && 1 条件で、(user_id, period) の GiST インデックスを使う。
+        """
+        return Event.objects.filter(
+            user_id        = user_id,
+            period__overlap= DateTimeTZRange(start_dt, end_dt, '[)'),
+        )
+
+    def _bulk_conflict_index(self, user_id, spans):
+        """
+        複数の期間 [(start_dt, end_dt)] の衝突チェックに使う既存予定の区間インデックス
+        （一括追加・繰り返し予定の追加用。DB の問い合わせは最大 1 回）。
+        """
+        if settings.CONFLICT_DETECTION != 'sql':
+            return interval_indexes.get(user_id)
+
+        spans = [(start_dt, end_dt) for start_dt, end_dt in spans if end_dt]
+        if not spans:
+            return IntervalIndex([])
+        lo = min(start_dt for start_dt, _ in spans)
+        hi = max(end_dt for _, end_dt in spans)
+        return IntervalIndex([entry_from_event(e) for e in self._conflict_candidates(user_id, lo, hi)])
+
+    def _bulk_recurring_index(self, user_id, spans):
+        """一括追加の期間全体と重なる既存の繰り返し予定の回の区間インデックス。"""
+        spans = [(start_dt, end_dt) for start_dt, end_dt in spans if end_dt]
+        if not spans:
+            return IntervalIndex([])
+        lo = min(start_dt for start_dt, _ in spans)
+        hi = max(end_dt for _, end_dt in spans)
+        return IntervalIndex(series_registry.overlapping(user_id, lo, hi))
+
+    def _bulk_conflicts(self, existing, recurring, batch, start_dt, end_dt, event_data, warning_level):
+        """
+        既存の予定（existing）・既存の繰り返し予定の回（recurring）と、
+        同じ入力内で追加が決まった行（batch）との衝突を返す。
+        Returns:
+            [(kind, 相手)] – 相手は既存イベントの id、同じ入力内の行の ('line', index)、
+                             または繰り返し予定の回の ('occurrence', Occurrence)
+        """
+        if not end_dt:
+            return []
+
+        new_type     = event_data.get('event_type', 'activity')
+        new_all_day  = event_data.get('is_all_day', False)
+        new_category = event_data.get('category')
+
+        found = []
+        for entry in existing.overlapping(start_dt, end_dt) + batch.overlapping(start_dt, end_dt):
+            kind = self._get_conflict_type(new_type, new_all_day, new_category, entry, warning_level)
+            if kind:
+                # batch のエントリは id = -(index + 1)
+                found.append((kind, entry.id if entry.id > 0 else ('line', -entry.id - 1)))
+        for occurrence in recurring.overlapping(start_dt, end_dt):
+            kind = self._get_conflict_type(new_type, new_all_day, new_category, occurrence, warning_level)
+            if kind:
+                found.append((kind, ('occurrence', occurrence)))
+        return found
+
+    def _attach_bulk_conflicts(self, items, hits):
+        """
+        衝突・警告の相手と警告文（テンプレート）を各行に付与する。
+        既存イベントは 1 回の問い合わせでまとめて取得する。
+        """
+        event_ids = [other for _, _, other in hits if not isinstance(other, tuple)]
+        events    = Event.objects.in_bulk(event_ids) if event_ids else {}
+
+        for item, kind, other in hits:
+            if item['status'] not in ('conflict', 'warning'):
+                continue
+            if isinstance(other, tuple) and other[0] == 'occurrence':
+                other = self._event_to_dict(other[1])
+            elif isinstance(other, tuple):
+                index = other[1]
+                other = {**self._proposed_dict(items[index]['proposed_event']), 'index': index}
+            elif other in events:
+                other = self._event_to_dict(events[other])
+            else:
+                continue
+            other['warning_message'] = self.message_renderer.render(
+                kind, self._proposed_dict(item['proposed_event']), other
+            )
+            item.setdefault('conflicts' if kind == 'conflict' else 'warnings', []).append(other)
+
+    def _iter_warning_messages(self, new_dict, dicts, kind, use_ai=False):
+        """_with_warning_messages の逐次版。警告文ができた順に (index, message) を返す。"""
+        if use_ai:
+            yield from self.ai_service.stream_conflict_messages(new_dict, dicts)
+        else:
+            for index, d in enumerate(dicts):
+                yield index, self.message_renderer.render(kind, new_dict, d)
+
+    def _with_warning_messages(self, new_dict, events, kind, use_ai=False):
+        """
+        重複イベントを辞書化し、警告文を付与する。
+        既定はテンプレートで即時生成し、use_ai=True（ユーザー設定）の場合のみ
+        AI で文面をまとめて生成する。
+        """
+        dicts = [self._event_to_dict(e) for e in events]
+        if use_ai:
+            messages = self.ai_service.generate_conflict_messages(new_dict, dicts)
+        else:
+            messages = [self.message_renderer.render(kind, new_dict, d) for d in dicts]
+        for d, msg in zip(dicts, messages):
+            d['warning_message'] = msg
+        return dicts
+
     def _get_conflict_type(self, new_type, new_all_day, new_category, existing, warning_level='standard'):
         """
         Returns:
@@ -402,6 +917,8 @@ class ScheduleService:
         return timezone.make_aware(dt, timezone.get_current_timezone())
 
     def _event_to_dict(self, event):
+        if isinstance(event, Occurrence):
+            return occurrence_dict(event)
         start_local = timezone.localtime(event.start_datetime)
         end_local   = timezone.localtime(event.end_datetime) if event.end_datetime else None
 
@@ -0,0 +1,60 @@
+from django.conf import settings
+from schedule.models import UserSettings
+from schedule.services.ai_cache import DjangoCacheBackend, LRUCacheBackend
+from schedule.services.metrics import HitCounter
+
+
+class UserSettingsCache:
+    """
+    ユーザー設定（UserSettings.to_dict()）の読み込みキャッシュ。
+
+    イベント追加・統合コマンドのたびに参照する設定を、DB ではなくキャッシュから返す。
+    設定の行がないユーザーには既定値を返し、その既定値もキャッシュする（読み込みで行は作らない）。
+    設定を書き換えたら invalidate() を呼ぶこと（UserSettingsView.patch）。
+
+    backend:
+        'lru'   : プロセス内 LRU。最速だが invalidate() は呼び出したワーカーにしか届かず、
+                  他のワーカーには最長 timeout 秒のあいだ古い設定が残る
+        'django': CACHES[alias]（REDIS_URL を設定した Redis 等）を全ワーカーで共有する
+    既定（settings.py）は SHARED_CACHE なら 'django'、そうでなければ timeout 0（キャッシュしない）。
+    """
+
+    def __init__(self, backend=None, timeout=None):
+        self.backend = backend or self._default_backend()
+        self.timeout = settings.USER_SETTINGS_CACHE_TIMEOUT if timeout is None else timeout
+        self.stats   = HitCounter('hit', 'miss')
+
+    def get(self, user_id):
+        """ユーザー設定の辞書を返す（キャッシュになければ DB から読み込んで保存する）。"""
+        if self.timeout <= 0:
+            return self._load(user_id)
+
+        key   = self._make_key(user_id)
+        value = self.backend.get(key)
+        if value is not None:
+            self.stats.incr('hit')
+            return value
+
+        self.stats.incr('miss')
+        value = self._load(user_id)
+        self.backend.set(key, value, self.timeout)
+        return value
+
+    def invalidate(self, user_id):
+        self.backend.delete(self._make_key(user_id))
+
+    def _load(self, user_id):
+        obj = UserSettings.objects.filter(user_id=user_id).first()
+        return (obj or UserSettings(user_id=user_id)).to_dict()
+
+    def _make_key(self, user_id):
+        return f'user_settings:{user_id}'
+
+    def _default_backend(self):
+        if settings.USER_SETTINGS_CACHE_BACKEND == 'django':
+            return DjangoCacheBackend(settings.USER_SETTINGS_CACHE_ALIAS)
+        return LRUCacheBackend(settings.USER_SETTINGS_CACHE_MAX_ENTRIES)
+
+
+# プロセス内で共有する（同期・非同期のサービスとビューが同じキャッシュを参照・無効化する）
+user_settings_cache = UserSettingsCache()
@@ -0,0 +1,66 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from schedule.models import Event, EventSeries
+from schedule.services.event_version import bump_version
+from schedule.services.interval_index import interval_indexes
+
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance, **kwargs):
+    """イベント保存後（コミット後）に変更カウンタを進め、区間インデックスへ反映する。"""
+    def on_commit():
+        new_version = bump_version(instance.user_id)
+        interval_indexes.apply_save(instance, new_version - 1, new_version)
+    transaction.on_commit(on_commit)
+
+
+@receiver(post_delete, sender=Event)
+def event_deleted(sender, instance, **kwargs):
+    user_id, event_id = instance.user_id, instance.id
+
+    def on_commit():
+        new_version = bump_version(user_id)
+        interval_indexes.apply_delete(user_id, event_id, new_version - 1, new_version)
+    transaction.on_commit(on_commit)
+
+
+def events_bulk_created(user_id, events):
+    """
+    bulk_create は post_save を送らないため、一括作成した側から呼び出す。
+    コミット後に変更カウンタを 1 回だけ進め、区間インデックスへまとめて反映する。
+    """
+    events = list(events)
+
+    def on_commit():
+        new_version = bump_version(user_id)
+        interval_indexes.apply_bulk_save(user_id, events, new_version - 1, new_version)
+    transaction.on_commit(on_commit)
+
+
+def events_bulk_imported(user_id):
+    """
+    インポートなど件数の多い一括書き込みの後に呼び出す。
+    コミット後に変更カウンタを進め、区間インデックスは次回の参照時に DB から再構築させる。
+    """
+    def on_commit():
+        bump_version(user_id)
+        interval_indexes.invalidate(user_id)
+    transaction.on_commit(on_commit)
+
+
+@receiver(post_save, sender=EventSeries)
+@receiver(post_delete, sender=EventSeries)
+def series_changed(sender, instance, **kwargs):
+    """
+    繰り返し予定の保存・削除後（コミット後）に、予定一覧用と繰り返し予定用の両方の変更カウンタを進める。
+    区間インデックスは繰り返し予定を含まないため、内容はそのままでバージョンだけを進める。
+    """
+    user_id = instance.user_id
+
+    def on_commit():
+        # 一覧のキャッシュが新しいカウンタで古いシリーズを読まないよう、繰り返し予定用を先に進める
+        bump_version(user_id, 'series')
+        new_version = bump_version(user_id)
+        interval_indexes.advance(user_id, new_version - 1, new_version)
+    transaction.on_commit(on_commit)
@@ -0,0 +1,62 @@
+import json
+import anthropic
+from django.http import StreamingHttpResponse
+from rest_framework import status
+
+
+def ai_error_payload(e):
+    """AI 呼び出し・解析中の例外を (レスポンス本文, ステータスコード) に変換する。"""
+    if isinstance(e, anthropic.APIConnectionError):
+        return (
+            {'status': 'error', 'message': 'AI APIへの接続に失敗しました。ネットワークを確認してください。'},
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    if isinstance(e, anthropic.AuthenticationError):
+        return {'status': 'error', 'message': 'APIキーが無効です。'}, status.HTTP_401_UNAUTHORIZED
+    if isinstance(e, ValueError):
+        return (
+            {'status': 'error', 'message': f'AIのレスポンスの解析に失敗しました: {str(e)}'},
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return (
+        {'status': 'error', 'message': f'予期しないエラーが発生しました: {str(e)}'},
+        status.HTTP_500_INTERNAL_SERVER_ERROR,
+    )
+
+
+def sse_event(event, data):
+    return f'event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n'
+
+
+def _error_event(e):
+    payload, code = ai_error_payload(e)
+    return sse_event('error', {**payload, 'code': code})
+
+
+def _sse_body(stream):
+    # ヘッダー送信後は HTTP ステータスを変えられないため、例外は error イベントで通知する
+    try:
+        for event, data in stream:
+            yield sse_event(event, data)
+    except Exception as e:
+        yield _error_event(e)
+
+
+async def _async_sse_body(stream):
+    try:
+        async for event, data in stream:
+            yield sse_event(event, data)
+    except Exception as e:
+        yield _error_event(e)
+
+
+def sse_response(stream):
+    """
+    (イベント名, データ) を返すジェネレーター（同期・非同期どちらでも可）を
+    Server-Sent Events のレスポンスにする。
+    """
+    body = _async_sse_body(stream) if hasattr(stream, '__aiter__') else _sse_body(stream)
+    response = StreamingHttpResponse(body, content_type='text/event-stream; charset=utf-8')
+    response['Cache-Control']     = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'   # nginx 等のプロキシでバッファリングさせない
+    return response
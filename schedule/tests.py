@@ -0,0 +1,1166 @@
+import calendar
+import json
+import random
+import sys
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DataError, connection, transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+from django.db.models import JSONField, Q, Value
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from schedule import views
+from schedule.models import Event, EventSeries, UserSettings
+from schedule.services import prompts
+from schedule.services.ai_cache import AIResponseCache, DjangoCacheBackend, LRUCacheBackend
+from schedule.services.ai_service import AIService, MessageArrayScanner
+from schedule.services.bulk_serializer import serialize_events
+from schedule.services.command_parser import LocalCommandParser
+from schedule.services.event_version import bump_version, get_version
+from schedule.services.ics_import import IcsFormatError, IcsImporter
+from schedule.services.interval_index import IntervalIndex, IntervalIndexRegistry, entry_from_event, interval_indexes
+from schedule.services.metrics import HitCounter, LatencyStats, TokenUsage
+from schedule.services.month_summary import SUMMARY_SQL, month_bounds, month_summary
+from schedule.services.pagination import encode_cursor
+from schedule.services.period_resolver import PeriodResolver
+from schedule.services.recurrence import expand, parse_rrule, series_end, series_registry
+from schedule.services.schedule_service import ScheduleService
+from schedule.services.settings_cache import UserSettingsCache
+from schedule.signals import events_bulk_created
+
+
+def _local(*args):
+    return timezone.make_aware(datetime(*args), timezone.get_current_timezone())
+
+
+class UnifiedCommandCacheTests(SimpleTestCase):
+    """統合コマンドの AI 解析結果のキャッシュ（相対指定を含む入力は分単位）"""
+
+    def setUp(self):
+        self.service = AIService(cache=AIResponseCache(LRUCacheBackend()))
+        self.calls   = mock.patch.object(self.service, '_request_unified_command', return_value={'intent': 'add'}).start()
+        mock.patch.object(self.service, '_local_command', return_value=None).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _parse_at(self, now, text):
+        with mock.patch('schedule.services.ai_cache.timezone.localtime', return_value=now):
+            return self.service.parse_unified_command(text)
+
+    def test_relative_input_is_cached_per_minute(self):
+        self._parse_at(_local(2026, 3, 2, 10, 5), '30分後に打ち合わせ')
+        self._parse_at(_local(2026, 3, 2, 10, 5, 40), '30分後に打ち合わせ')
+        self._parse_at(_local(2026, 3, 2, 10, 6), '30分後に打ち合わせ')
+        self._parse_at(_local(2026, 3, 2, 10, 6), '今から打ち合わせ')
+        self.assertEqual(self.calls.call_count, 3)
+
+    def test_absolute_input_is_cached_per_hour(self):
+        self._parse_at(_local(2026, 3, 2, 10, 5), '8時に打ち合わせ')
+        self._parse_at(_local(2026, 3, 2, 10, 59), '8時に打ち合わせ')
+        self.assertEqual(self.calls.call_count, 1)
+        self._parse_at(_local(2026, 3, 2, 11, 0), '8時に打ち合わせ')
+        self.assertEqual(self.calls.call_count, 2)
+
+
+class PromptCacheTests(SimpleTestCase):
+    """プロンプトキャッシュのブレークポイント（全タスク共通のプレフィックスの末尾に 1 か所）"""
+
+    def test_single_breakpoint_after_shared_prefix(self):
+        for task in prompts.TASK_INSTRUCTIONS:
+            with self.subTest(task=task):
+                blocks = prompts.system_blocks(task)
+                self.assertEqual([i for i, b in enumerate(blocks) if 'cache_control' in b], [0])
+                self.assertEqual(blocks[0]['text'], prompts.STATIC_PROMPT)
+
+    def test_warns_once_when_nothing_is_cached(self):
+        service = AIService(cache=AIResponseCache(LRUCacheBackend()))
+        usage   = SimpleNamespace(input_tokens=900, cache_read_input_tokens=0, cache_creation_input_tokens=0, output_tokens=50)
+        with self.assertLogs('schedule.services.ai_service', 'WARNING') as logs:
+            service._record_call('parse_period', 'model-a', usage, 0)
+            service._record_call('parse_period', 'model-a', usage, 0)
+            service._record_call('parse_period', 'model-a', SimpleNamespace(**{**vars(usage), 'cache_read_input_tokens': 4000}), 0)
+        self.assertEqual(len(logs.records), 1)
+
+
+class EventQueryPlanTests(TestCase):
+    """ホットパスのイベント検索クエリの実行計画（EXPLAIN）がインデックスを使うこと"""
+
+    ROWS          = 30_000
+    USERS         = 300
+    INDEX_MARKERS = ('Index Scan', 'Index Only Scan', 'Bitmap Index Scan', 'USING INDEX')
+
+    @classmethod
+    def setUpTestData(cls):
+        tz    = timezone.get_current_timezone()
+        base  = datetime(2024, 1, 1, tzinfo=tz)
+        rng   = random.Random(0)
+        types = ['activity'] * 8 + ['block', 'deadline']
+
+        events = []
+        for i in range(cls.ROWS):
+            start = base + timedelta(minutes=30 * rng.randrange(0, 3 * 365 * 48))
+            kind  = types[rng.randrange(len(types))]
+            span  = timedelta(days=rng.randrange(1, 5)) if kind == 'block' else timedelta(hours=1)
+            events.append(Event(
+                user_id        = f'explain_user_{i % cls.USERS}',
+                title          = f'ダミー予定{i}',
+                start_datetime = start,
+                end_datetime   = start + span,
+                event_type     = kind,
+                is_all_day     = kind == 'block',
+                category       = [],
+            ))
+        Event.objects.bulk_create(events, batch_size=5_000)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Event._meta.db_table}')
+
+    def test_hot_path_queries_use_indexes(self):
+        user_id  = 'explain_user_0'
+        start_dt = _local(2025, 3, 4, 10, 0)
+        end_dt   = start_dt + timedelta(hours=1)
+        day      = _local(2025, 3, 4)
+
+        queries = {
+            'get_events': Event.objects.filter(
+                user_id=user_id, start_datetime__gte=day, start_datetime__lte=day + timedelta(days=7),
+            ).order_by('start_datetime'),
+            'get_events_next_page': Event.objects.filter(
+                user_id=user_id, start_datetime__gte=day, start_datetime__lt=day + timedelta(days=365),
+            ).order_by('start_datetime', 'id').filter(start_datetime__gte=start_dt).filter(
+                Q(start_datetime__gt=start_dt) | Q(id__gt=0),
+            )[:settings.EVENT_PAGE_SIZE + 1],
+            'check_conflicts': ScheduleService()._conflict_candidates(user_id, start_dt, end_dt),
+            'modify_by_day_and_title': Event.objects.filter(
+                user_id=user_id, start_datetime__gte=day, start_datetime__lt=day + timedelta(days=1),
+                title__icontains='会議',
+            ).order_by('start_datetime'),
+        }
+        plans = {name: qs.explain() for name, qs in queries.items()}
+
+        lo, hi, first, last = month_bounds(2025, 3)
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN ' + SUMMARY_SQL, {
+                'tz'     : timezone.get_current_timezone_name(),
+                'user_id': user_id,
+                'range'  : DateTimeTZRange(lo, hi, '[)'),
+                'first'  : first,
+                'last'   : last,
+            })
+            plans['month_summary'] = '\n'.join(row[0] for row in cursor.fetchall())
+
+        for name, plan in plans.items():
+            with self.subTest(query=name):
+                self.assertTrue(any(marker in plan for marker in self.INDEX_MARKERS), plan)
+
+
+class ConflictDetectionTests(TestCase):
+    """他のワーカーでの書き込み（このプロセスのシグナルを経由しない行）との衝突を見落とさないこと"""
+
+    user_id = 'conflict_user'
+
+    def setUp(self):
+        self.service = ScheduleService()
+        self.start   = _local(2030, 1, 10, 10, 0)
+        self.end     = self.start + timedelta(hours=1)
+        interval_indexes.invalidate(self.user_id)
+
+    def _write_from_other_worker(self):
+        Event.objects.bulk_create([Event(
+            user_id=self.user_id, title='他のワーカーで追加', start_datetime=self.start,
+            end_datetime=self.end, event_type='activity', category=[],
+        )])
+
+    def _conflicts(self):
+        check = self.service._check_conflicts(self.user_id, self.start, self.end, {'event_type': 'activity'})
+        return [e.title for e in check['conflicts']]
+
+    @override_settings(CONFLICT_DETECTION='sql')
+    def test_sql_detection_reads_the_database(self):
+        self.assertEqual(self._conflicts(), [])
+        self._write_from_other_worker()
+        self.assertEqual(self._conflicts(), ['他のワーカーで追加'])
+
+    @override_settings(CONFLICT_DETECTION='interval_index')
+    def test_interval_index_is_rebuilt_when_the_shared_counter_moves(self):
+        self.assertEqual(self._conflicts(), [])
+        self._write_from_other_worker()
+        bump_version(self.user_id)   # 共有キャッシュなら他のワーカーの書き込みでも進む
+        self.assertEqual(self._conflicts(), ['他のワーカーで追加'])
+
+
+class IntervalIndexRegistryTests(SimpleTestCase):
+    """区間インデックスへの差分反映（コミット後のシグナル）と、別スレッドからの問い合わせが競合しないこと"""
+
+    user_id = 'interval_user'
+
+    def setUp(self):
+        self.version  = 0
+        self.registry = IntervalIndexRegistry()
+        self.start    = _local(2030, 1, 1, 9, 0)
+        base          = [self._event(i) for i in range(200)]
+        mock.patch.object(self.registry, '_load', lambda user_id, version: IntervalIndex(
+            [entry_from_event(e) for e in base], version)).start()
+        mock.patch('schedule.services.interval_index.get_version', lambda user_id: self.version).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _event(self, i):
+        start = self.start + timedelta(hours=i)
+        return SimpleNamespace(id=i, user_id=self.user_id, start_datetime=start, end_datetime=start + timedelta(hours=2),
+                               event_type='activity', is_all_day=False, category=[])
+
+    def _advance(self, apply, *args):
+        apply(*args, self.version, self.version + 1)
+        self.version += 1
+
+    def test_updates_replace_the_shared_index(self):
+        before = self.registry.get(self.user_id)
+        self._advance(self.registry.apply_delete, self.user_id, 0)
+        self._advance(self.registry.apply_save, self._event(1000))
+        after = self.registry.get(self.user_id)
+        self.assertIsNot(before, after)
+        self.assertEqual(len(before), 200)
+        self.assertEqual(len(after), 200)
+        self.assertEqual(self.registry.stats.snapshot()['rebuild'], 1)
+
+    def test_queries_during_concurrent_updates(self):
+        self.addCleanup(sys.setswitchinterval, sys.getswitchinterval())
+        sys.setswitchinterval(1e-6)
+        self.registry.get(self.user_id)
+        errors, done = [], threading.Event()
+
+        def write():
+            try:
+                for i in range(2000):
+                    # 追加と削除を繰り返し、バッファの追加と再構築を何度も起こす
+                    self._advance(self.registry.apply_save, self._event(1000 + i % 150))
+                    self._advance(self.registry.apply_delete, self.user_id, i % 200)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                done.set()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        lo, hi = self.start + timedelta(hours=50), self.start + timedelta(hours=60)
+        while not done.is_set():
+            index = self.registry.get(self.user_id)
+            for entry in index.overlapping(lo, hi):
+                self.assertTrue(entry.start < hi and entry.end > lo)
+        writer.join()
+        self.assertEqual(errors, [])
+
+
+class CommandParserTests(SimpleTestCase):
+    """統合コマンドのローカル解析"""
+
+    def test_corpus_inputs_above_threshold_are_correct(self):
+        call_command('command_parser_report', min_accuracy=1.0, stdout=StringIO())
+
+    def test_target_time_is_not_part_of_title_keyword(self):
+        now    = _local(2026, 3, 2, 15, 0)
+        parser = LocalCommandParser()
+        for text in ('明日14時の会議を15時に変更', '今日の14時からの会議を削除'):
+            with self.subTest(text=text):
+                parsed = parser.parse(text, now=now)
+                self.assertEqual(parsed.command['search']['title_keyword'], '会議')
+
+    def test_leftover_time_qualifier_falls_back_to_claude(self):
+        parsed = LocalCommandParser().parse('明日の午後の会議を削除', now=_local(2026, 3, 2, 15, 0))
+        self.assertLess(parsed.confidence, settings.LOCAL_PARSER_MIN_CONFIDENCE)
+
+
+def _ics(*vevents, end=True):
+    body = ''.join(
+        f'BEGIN:VEVENT\r\nUID:{uid}\r\nSUMMARY:{title}\r\nDTSTART:{start}\r\nDTEND:{stop}\r\nEND:VEVENT\r\n'
+        for uid, title, start, stop in vevents
+    )
+    text = 'BEGIN:VCALENDAR\r\nVERSION:2.0\r\n' + body + ('END:VCALENDAR\r\n' if end else '')
+    return text.splitlines(keepends=True)
+
+
+class IcsImportTests(TestCase):
+    """ICS インポートの件数と重なりのレポート（同時に走った別のリクエストの書き込みを含めない）"""
+
+    user_id = 'ics_user'
+
+    def setUp(self):
+        self.importer = IcsImporter(ScheduleService())
+
+    def test_reimport_counts_duplicates(self):
+        lines = _ics(('a@test', '定例', '20300107T010000Z', '20300107T020000Z'),
+                     ('b@test', '面談', '20300108T010000Z', '20300108T020000Z'))
+        first  = self.importer.run(self.user_id, lines)['counts']
+        second = self.importer.run(self.user_id, lines)['counts']
+        self.assertEqual((first['created'], first['duplicate']), (2, 0))
+        self.assertEqual((second['created'], second['duplicate']), (0, 2))
+
+    def test_rows_written_concurrently_are_not_counted_or_reported(self):
+        start = _local(2030, 1, 7, 10, 0)
+        Event.objects.create(user_id=self.user_id, title='既存', start_datetime=start,
+                             end_datetime=start + timedelta(hours=1), event_type='activity', category=[])
+        bulk_create = Event.objects.bulk_create
+
+        def concurrent_bulk_create(objs, **kwargs):
+            # 重複チェックの後、同じ UID を別のリクエストが先に書き込む
+            if kwargs.get('ignore_conflicts'):
+                Event.objects.create(user_id=self.user_id, title='別のリクエスト', ical_uid='a@test', start_datetime=start,
+                                     end_datetime=start + timedelta(hours=1), event_type='activity', category=[])
+            return bulk_create(objs, **kwargs)
+
+        lines = _ics(('a@test', '定例', '20300107T010000Z', '20300107T020000Z'),
+                     ('b@test', '面談', '20300108T010000Z', '20300108T020000Z'))
+        with mock.patch.object(Event.objects, 'bulk_create', side_effect=concurrent_bulk_create):
+            result = self.importer.run(self.user_id, lines)
+        self.assertEqual((result['counts']['created'], result['counts']['duplicate']), (1, 1))
+        self.assertEqual(result['overlaps']['conflict'] + result['overlaps']['warning'], 0)
+
+    def test_overlaps_with_imported_events_are_reported(self):
+        start = _local(2030, 1, 7, 10, 0)
+        Event.objects.create(user_id=self.user_id, title='既存', start_datetime=start,
+                             end_datetime=start + timedelta(hours=1), event_type='activity', category=[])
+        result = self.importer.run(self.user_id, _ics(('a@test', '定例', '20300107T010000Z', '20300107T020000Z')))
+        self.assertEqual(result['overlaps']['conflict'], 1)
+        self.assertEqual([item['event']['imported'] for item in result['overlaps']['items']], [True])
+
+    def test_overlaps_with_recurring_series_match_conflict_detection(self):
+        series_registry.invalidate(self.user_id)
+        service = ScheduleService()
+        with self.captureOnCommitCallbacks(execute=True):
+            service.create_series(self.user_id, {
+                'title': '授業', 'start_datetime': '2030-01-01 10:00', 'end_datetime': '2030-01-01 11:00',
+                'rrule': 'FREQ=DAILY', 'event_type': 'activity', 'category': [],
+            }, force=True)
+            Event.objects.create(user_id=self.user_id, title='既存', start_datetime=_local(2030, 1, 7, 10, 30),
+                                 end_datetime=_local(2030, 1, 7, 11, 30), event_type='activity', category=[])
+        expected = service._check_conflicts(self.user_id, _local(2030, 1, 7, 10, 0), _local(2030, 1, 7, 11, 0),
+                                            {'event_type': 'activity', 'category': []})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = self.importer.run(self.user_id, _ics(('a@test', '定例', '20300107T010000Z', '20300107T020000Z')))
+        overlaps = result['overlaps']
+        self.assertEqual((overlaps['conflict'], overlaps['warning']), (len(expected['conflicts']), len(expected['warnings'])))
+        existing = [pair['other'] if pair['event']['imported'] else pair['event'] for pair in overlaps['items']]
+        self.assertEqual(sorted(str(e['id']) for e in existing), sorted(str(e.id) for e in expected['conflicts']))
+        self.assertIn('授業', [e['title'] for e in existing])
+
+    def test_malformed_calendar_is_rejected(self):
+        truncated = _ics(('a@test', '定例', '20300107T010000Z', '20300107T020000Z'), end=False)[:-2]
+        for lines in (['not a calendar\r\n'], truncated):
+            with self.subTest(lines=lines), self.assertRaises(IcsFormatError):
+                self.importer.run(self.user_id, lines)
+        self.assertFalse(Event.objects.filter(user_id=self.user_id).exists())
+
+        response = self.client.post('/api/schedule/import-ics/', {
+            'file'   : SimpleUploadedFile('broken.ics', ''.join(truncated).encode()),
+            'user_id': self.user_id,
+        })
+        self.assertEqual(response.status_code, 400)
+
+
+class MonthSummaryTests(TestCase):
+    """月の日別サマリー（繰り返し予定の回を含む）"""
+
+    user_id = 'summary_user'
+
+    def test_out_of_range_priority_is_not_counted(self):
+        data = {'title': '朝練', 'start_datetime': '2030-04-01 07:00', 'end_datetime': '2030-04-01 08:00',
+                'rrule': 'FREQ=WEEKLY;COUNT=2', 'event_type': 'activity', 'priority': 9, 'category': []}
+        with self.captureOnCommitCallbacks(execute=True):
+            ScheduleService().create_series(self.user_id, data, force=True)
+
+        days = month_summary(self.user_id, 2030, 4)['days']
+        self.assertEqual([(d['date'], d['total'], sum(d['priorities'])) for d in days],
+                         [('2030-04-01', 1, 0), ('2030-04-08', 1, 0)])
+
+
+@override_settings(SHARED_CACHE=True)
+class EventListCacheTests(TestCase):
+    """イベント一覧キャッシュが、書き込みの直後に古い一覧を返さないこと（書き込みの種類ごと）"""
+
+    user_id = 'event_list_cache_user'
+
+    def setUp(self):
+        cache.clear()
+        self.service = ScheduleService()
+        self.start   = _local(2030, 1, 1)
+        self.end     = _local(2030, 2, 1)
+        self.period  = {'start': '2030-01-01 00:00', 'end': '2030-01-31 23:59'}
+
+    def _mutations(self):
+        """(書き込みの種類, 書き込みを行う関数)。ビュー・サービスの書き込み経路をそのまま使う。"""
+        event_data = {
+            'title'         : '確認用の予定',
+            'start_datetime': '2030-01-10 10:00',
+            'end_datetime'  : '2030-01-10 11:00',
+            'event_type'    : 'activity',
+            'category'      : [],
+        }
+        return [
+            ('_create_event_from_data', lambda: self.service.force_add_event(self.user_id, event_data)),
+            ('update_event',            lambda: self.service.update_event(self._first().id, self.user_id, title='更新後')),
+            ('_apply_modify (update)',  lambda: self.service.apply_modify_to_event(
+                self._first().id, self.user_id, 'update', {'start_datetime': '2030-01-11 09:00'})),
+            ('_apply_modify (範囲外へ移動)', lambda: self.service.apply_modify_to_event(
+                self._first().id, self.user_id, 'update', {'start_datetime': '2030-03-01 09:00'})),
+            ('_apply_modify (delete)',  lambda: self.service.apply_modify_to_event(
+                Event.objects.get(user_id=self.user_id).id, self.user_id, 'delete', {})),
+            ('bulk_create + events_bulk_created', self._bulk_create),
+            ('EventDetailView.delete',  self._view_delete),
+            ('ICS インポート',           lambda: IcsImporter(self.service).run(
+                self.user_id, _ics(('check@example.com', 'ICS 予定', '20300115T010000Z', '20300115T020000Z')))),
+        ]
+
+    def _first(self):
+        return Event.objects.filter(user_id=self.user_id).order_by('start_datetime', 'id').first()
+
+    def _bulk_create(self):
+        events = [
+            self.service._new_event(self.user_id, {'title': f'一括{i}', 'category': []},
+                                    self.start.replace(day=20 + i, hour=9), None)
+            for i in range(3)
+        ]
+        with transaction.atomic():
+            events_bulk_created(self.user_id, Event.objects.bulk_create(events))
+
+    def _view_delete(self):
+        response = self.client.delete(f'/api/schedule/events/{self._first().id}/',
+                                      data={'user_id': self.user_id}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+    def _cached(self):
+        return (
+            self.service.get_events_in_range(self.user_id, self.start, self.end),
+            self.service._events_in_period(self.user_id, self.period),
+        )
+
+    def _expected(self):
+        events = Event.objects.filter(
+            user_id=self.user_id, start_datetime__gte=self.start, start_datetime__lt=self.end,
+        ).order_by('start_datetime', 'id')
+        expected = {'events': [self.service._event_to_dict(e) for e in events], 'next_cursor': None}
+        return expected, expected
+
+    def test_lists_are_fresh_after_each_write(self):
+        for name, mutate in self._mutations():
+            with self.subTest(write=name):
+                self._cached()
+                hits = self.service.event_cache.stats.snapshot()['hit']
+                self._cached()
+                self.assertEqual(self.service.event_cache.stats.snapshot()['hit'], hits + 2)
+                with self.captureOnCommitCallbacks(execute=True):
+                    mutate()
+                self.assertEqual(self._cached(), self._expected())
+
+    @override_settings(SHARED_CACHE=False)
+    def test_lists_are_not_cached_without_a_shared_cache(self):
+        self._cached()
+        self._cached()
+        self.assertEqual(self.service.event_cache.stats.snapshot()['total'], 0)
+
+
+RRULES = [
+    'FREQ=DAILY',
+    'FREQ=DAILY;INTERVAL=3;COUNT=40',
+    'FREQ=WEEKLY',
+    'FREQ=WEEKLY;BYDAY=MO,WE,FR;COUNT=25',
+    'FREQ=WEEKLY;INTERVAL=2;BYDAY=TU,TH',
+    'FREQ=WEEKLY;BYDAY=SA;UNTIL=20310331',
+    'FREQ=MONTHLY',
+    'FREQ=MONTHLY;BYMONTHDAY=31',
+    'FREQ=MONTHLY;INTERVAL=2;BYMONTHDAY=1,-1;COUNT=15',
+    'FREQ=MONTHLY;BYMONTHDAY=29;UNTIL=20320301T000000Z',
+]
+
+
+def _brute_force(series, lo, hi):
+    """初回の日から 1 日ずつ RRULE の定義どおりに判定して数えた、開始日時が [lo, hi) の回（比較用）。"""
+    rule  = parse_rrule(series.rrule)
+    first = timezone.localtime(series.dtstart)
+    tz    = timezone.get_current_timezone()
+    found, n, day = [], 0, first.date()
+    while day <= timezone.localtime(hi).date():
+        if rule.freq == 'DAILY':
+            hit = (day - first.date()).days % rule.interval == 0
+        elif rule.freq == 'WEEKLY':
+            weeks = ((day - timedelta(days=day.weekday())) - (first.date() - timedelta(days=first.weekday()))).days // 7
+            hit   = weeks % rule.interval == 0 and day.weekday() in (rule.byday or (first.weekday(),))
+        else:
+            months = (day.year - first.year) * 12 + day.month - first.month
+            last   = calendar.monthrange(day.year, day.month)[1]
+            days   = {d if d > 0 else last + 1 + d for d in rule.bymonthday or (first.day,) if abs(d) <= last}
+            hit    = months % rule.interval == 0 and day.day in days
+        start = timezone.make_aware(datetime.combine(day, first.time()), tz)
+        if hit and start >= series.dtstart:
+            if rule.until is not None and start > rule.until:
+                break
+            n += 1
+            if lo <= start < hi and start not in series.exdates:
+                found.append(start)
+            if rule.count is not None and n >= rule.count:
+                break
+        day += timedelta(days=1)
+    return found
+
+
+class RecurrenceExpansionTests(SimpleTestCase):
+    """繰り返し予定の展開を、1 日ずつ数える素朴な実装と突き合わせる"""
+
+    WINDOWS = 60
+
+    def test_expansion_matches_brute_force(self):
+        rng      = random.Random(0)
+        dtstart  = _local(2030, 1, 31, 9, 30)
+        duration = timedelta(minutes=90)
+        for i, rrule in enumerate(RRULES):
+            with self.subTest(rrule=rrule):
+                series = EventSeries(id=i + 1, user_id='expansion_user', title=rrule, dtstart=dtstart, duration=duration,
+                                     rrule=rrule, series_end=series_end(rrule, dtstart, duration), exdates=[])
+                series.exdates = _brute_force(series, dtstart, dtstart + timedelta(days=400))[3::7]
+
+                for _ in range(self.WINDOWS):
+                    lo = dtstart + timedelta(days=rng.randint(-30, 1500), minutes=rng.randint(0, 1439))
+                    hi = lo + timedelta(days=rng.randint(0, 120), minutes=rng.randint(0, 1439))
+                    self.assertEqual([o.start_datetime for o in expand(series, lo, hi)], _brute_force(series, lo, hi))
+
+                # series_end（GiST インデックスで絞り込む期間の終わり）が最終回の終了を含むこと
+                everything = _brute_force(series, dtstart, dtstart + timedelta(days=3000))
+                if series.series_end is not None:
+                    self.assertLessEqual(everything[-1] + duration, series.series_end)
+
+
+class RecurringSeriesTests(TestCase):
+    """繰り返し予定の保存・一覧・回の取り消しと切り出し・衝突チェック"""
+
+    user_id = 'series_user'
+
+    def setUp(self):
+        series_registry.invalidate(self.user_id)
+        self.service = ScheduleService()
+        data = {
+            'title'         : '授業',
+            'start_datetime': '2030-04-01 09:00',
+            'end_datetime'  : '2030-04-01 10:30',
+            'rrule'         : 'FREQ=DAILY',
+            'event_type'    : 'activity',
+            'category'      : [],
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.create_series(self.user_id, data, force=True)
+            self.service.create_series(self.user_id, {
+                **data, 'title': 'サークル', 'start_datetime': '2030-04-02 19:00', 'end_datetime': '2030-04-02 21:00',
+                'rrule': 'FREQ=WEEKLY;BYDAY=TU,TH',
+            }, force=True)
+        self.daily = EventSeries.objects.get(user_id=self.user_id, rrule='FREQ=DAILY')
+
+    def _listed(self, lo, hi):
+        return [e['id'] for e in self.service.get_events_in_range(self.user_id, lo, hi)['events']]
+
+    def test_series_are_stored_as_one_row_each(self):
+        self.assertEqual(EventSeries.objects.filter(user_id=self.user_id).count(), 2)
+        self.assertFalse(Event.objects.filter(user_id=self.user_id).exists())
+
+    def test_list_query_count_does_not_depend_on_occurrences(self):
+        start  = _local(2030, 4, 1)
+        counts = {}
+        for days in (7, 365):
+            with CaptureQueriesContext(connection) as queries:
+                page = self.service.get_events_in_range(self.user_id, start, start + timedelta(days=days), limit=500)
+            counts[days] = (len(queries), len(page['events']))
+        self.assertEqual(counts[7][0], counts[365][0])
+        self.assertGreater(counts[365][1], counts[7][1])
+
+    def test_expansions_are_cached(self):
+        start = _local(2030, 4, 1)
+        series_registry.between(self.user_id, start, start + timedelta(days=30))
+        hits = series_registry.occurrences.stats.snapshot()['hit']
+        series_registry.between(self.user_id, start, start + timedelta(days=30))
+        self.assertEqual(series_registry.occurrences.stats.snapshot()['hit'], hits + 2)
+
+    def test_cancel_and_detach_occurrence(self):
+        lo, hi = _local(2030, 4, 10), _local(2030, 4, 13)
+        before = self._listed(lo, hi)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.cancel_occurrence(self.user_id, self.daily.id, '203004100900')
+        after = self._listed(lo, hi)
+        self.assertNotIn(f's{self.daily.id}:203004100900', after)
+        self.assertEqual(len(after), len(before) - 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = self.service.detach_occurrence(self.user_id, self.daily.id, '203004110900', title='補講',
+                                                    start_datetime='2030-04-11 13:00', end_datetime='2030-04-11 14:30')
+        after = self._listed(lo, hi)
+        self.assertIn(result['event']['id'], after)
+        self.assertNotIn(f's{self.daily.id}:203004110900', after)
+        self.assertEqual(len(after), len(before) - 1)
+        self.assertEqual(EventSeries.objects.filter(user_id=self.user_id).count(), 2)
+
+    def test_conflicts_with_occurrences(self):
+        def conflicts(start, data=None):
+            check = self.service._check_conflicts(self.user_id, start, start + timedelta(hours=1),
+                                                  data or {'event_type': 'activity'})
+            return check['conflicts']
+
+        self.assertTrue(any(str(e.id).startswith('s') for e in conflicts(_local(2030, 6, 4, 19, 30))))   # 火曜のサークル
+        self.assertEqual(conflicts(_local(2030, 6, 5, 19, 30)), [])                                       # 水曜は空いている
+
+        # 追加する繰り返し予定の各回の衝突をまとめて返す
+        data = {'title': 'ジム', 'start_datetime': '2030-05-07 20:00', 'end_datetime': '2030-05-07 21:00',
+                'rrule': 'FREQ=WEEKLY', 'event_type': 'activity', 'category': []}
+        self.assertGreaterEqual(len(conflicts(_local(2030, 5, 7, 20, 0), data)), 10)
+
+    def _write_from_other_worker(self):
+        EventSeries.objects.bulk_create([EventSeries(
+            user_id=self.user_id, title='他のワーカーで追加', dtstart=_local(2030, 4, 5, 12, 0), duration=timedelta(hours=1),
+            rrule='FREQ=WEEKLY', series_end=None, exdates=[],
+        )])
+
+    @override_settings(SHARED_CACHE=False)
+    def test_series_are_read_from_the_database_without_a_shared_cache(self):
+        self.assertEqual(len(series_registry.get(self.user_id)), 2)
+        self._write_from_other_worker()
+        self.assertEqual(len(series_registry.get(self.user_id)), 3)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_series_are_kept_until_the_shared_counter_moves(self):
+        loads = series_registry.stats.snapshot()['load']
+        series_registry.get(self.user_id)
+        series_registry.get(self.user_id)
+        self.assertEqual(series_registry.stats.snapshot()['load'], loads + 1)
+        self._write_from_other_worker()
+        bump_version(self.user_id, 'series')   # 共有キャッシュなら他のワーカーの書き込みでも進む
+        self.assertEqual(len(series_registry.get(self.user_id)), 3)
+
+
+class UserSettingsCacheTests(TestCase):
+    """設定の PATCH が、次の読み込み（他のワーカーを含む）で反映されること"""
+
+    user_id = 'settings_user'
+
+    def setUp(self):
+        cache.clear()
+
+    def _patch(self, **data):
+        response = self.client.patch('/api/schedule/settings/', data={'user_id': self.user_id, **data},
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+    def _warning_level(self):
+        response = self.client.get('/api/schedule/settings/', {'user_id': self.user_id})
+        return response.json()['settings']['warning_level']
+
+    def test_patch_is_visible_on_the_next_read(self):
+        self.assertEqual(self._warning_level(), 'standard')
+        self._patch(warning_level='strict')
+        self.assertEqual(self._warning_level(), 'strict')
+
+    def test_patch_from_another_worker_is_visible_with_a_shared_cache(self):
+        worker_a = UserSettingsCache(backend=DjangoCacheBackend(), timeout=60)
+        worker_b = UserSettingsCache(backend=DjangoCacheBackend(), timeout=60)
+        self.assertEqual(worker_a.get(self.user_id)['warning_level'], 'standard')
+        UserSettings.objects.create(user_id=self.user_id, warning_level='gentle')
+        worker_b.invalidate(self.user_id)
+        self.assertEqual(worker_a.get(self.user_id)['warning_level'], 'gentle')
+
+
+class ConflictClassificationTests(TestCase):
+    """SQL の CASE 式（_check_conflicts_sql）と Python の _get_conflict_type が同じ分類を返すこと"""
+
+    user_id    = 'classification_user'
+    CATEGORIES = (['会議'], ['運動'], [])
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.start = _local(2030, 2, 1, 10, 0)
+        cls.end   = cls.start + timedelta(hours=1)
+        Event.objects.bulk_create([
+            Event(user_id=cls.user_id, title=f'{event_type}/{is_all_day}/{category}', start_datetime=cls.start,
+                  end_datetime=cls.end, event_type=event_type, is_all_day=is_all_day, category=category)
+            for event_type in ('activity', 'block', 'deadline')
+            for is_all_day in (False, True)
+            for category in cls.CATEGORIES
+        ])
+
+    def test_sql_and_python_agree(self):
+        service = ScheduleService()
+        rows    = list(Event.objects.filter(user_id=self.user_id))
+        for level in ('gentle', 'standard', 'strict'):
+            for new_type in ('activity', 'block', 'deadline'):
+                for new_all_day in (False, True):
+                    for new_category in (['会議'], ['勉強'], None):
+                        with self.subTest(level=level, type=new_type, all_day=new_all_day, category=new_category):
+                            result = service._check_conflicts_sql(self.user_id, self.start, self.end, new_type,
+                                                                  new_all_day, new_category, level)
+                            sql = {e.id: 'conflict' for e in result['conflicts']}
+                            sql.update({e.id: 'warning' for e in result['warnings']})
+                            python = {e.id: kind for e in rows if (kind := service._get_conflict_type(
+                                new_type, new_all_day, new_category, e, level))}
+                            self.assertEqual(sql, python)
+
+
+class BulkAddTests(TestCase):
+    """一括追加（入力内の行同士の衝突・1 トランザクションでの作成・変更カウンタと区間インデックスの更新）"""
+
+    user_id = 'bulk_user'
+
+    def setUp(self):
+        cache.clear()
+        interval_indexes.invalidate(self.user_id)
+        self.service = ScheduleService()
+
+    def _item(self, title, start, end, **extra):
+        return {'title': title, 'start_datetime': start, 'end_datetime': end, 'event_type': 'activity',
+                'category': [], **extra}
+
+    def _bulk_add(self, parsed):
+        lines = '\n'.join(item['title'] for item in parsed)
+        with mock.patch.object(self.service.ai_service, 'parse_bulk_events', return_value=parsed):
+            return self.service.bulk_add_events(self.user_id, lines)
+
+    def test_lines_in_the_same_batch_conflict(self):
+        result = self._bulk_add([
+            self._item('定例', '2030-03-01 10:00', '2030-03-01 11:00'),
+            self._item('面談', '2030-03-01 10:30', '2030-03-01 11:30'),
+            self._item('昼食', '2030-03-01 12:00', '2030-03-01 13:00'),
+        ])
+        self.assertEqual([item['status'] for item in result['items']], ['created', 'conflict', 'created'])
+        self.assertEqual([c['index'] for c in result['items'][1]['conflicts']], [0])
+        self.assertEqual(Event.objects.filter(user_id=self.user_id).count(), 2)
+
+    def test_one_invalid_row_rolls_back_the_batch(self):
+        version = get_version(self.user_id)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks, self.assertRaises(DataError):
+            self._bulk_add([
+                self._item('定例', '2030-03-01 10:00', '2030-03-01 11:00'),
+                self._item('長' * 300, '2030-03-02 10:00', '2030-03-02 11:00'),   # title は 200 文字まで
+            ])
+        self.assertFalse(Event.objects.filter(user_id=self.user_id).exists())
+        self.assertEqual(callbacks, [])
+        self.assertEqual(get_version(self.user_id), version)
+
+    def test_bulk_created_signal_updates_version_and_index_once(self):
+        interval_indexes.get(self.user_id)
+        version  = get_version(self.user_id)
+        rebuilds = interval_indexes.stats.snapshot()['rebuild']
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            result = self._bulk_add([
+                self._item('定例', '2030-03-01 10:00', '2030-03-01 11:00'),
+                self._item('昼食', '2030-03-01 12:00', '2030-03-01 13:00'),
+            ])
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(get_version(self.user_id), version + 1)
+
+        index = interval_indexes.get(self.user_id)
+        self.assertEqual(interval_indexes.stats.snapshot()['rebuild'], rebuilds)
+        self.assertEqual([e.id for e in index.overlapping(_local(2030, 3, 1), _local(2030, 3, 2))],
+                         [item['event_id'] for item in result['items']])
+
+
+class EventListEtagTests(TestCase):
+    """一覧の ETag（1 クエリで求め、一覧の内容が変われば変わる）と If-None-Match での 304"""
+
+    user_id = 'etag_user'
+    params  = {'user_id': 'etag_user', 'start': '2030-05-01', 'end': '2030-05-31'}
+
+    def setUp(self):
+        self.service = ScheduleService()
+        self.event   = Event.objects.create(user_id=self.user_id, title='定例', start_datetime=_local(2030, 5, 10, 10, 0),
+                                            end_datetime=_local(2030, 5, 10, 11, 0), event_type='activity', category=[])
+
+    def _etag(self):
+        response = self.client.get('/api/schedule/events/', self.params)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_etag_is_one_query(self):
+        with self.assertNumQueries(1):
+            self.service.events_in_range_etag(self.user_id, _local(2030, 5, 1), _local(2030, 6, 1))
+
+    def test_matching_if_none_match_returns_304(self):
+        etag     = self._etag()
+        response = self.client.get('/api/schedule/events/', self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_etag_changes_after_each_write(self):
+        writes = [
+            ('create',       lambda: self.service.force_add_event(self.user_id, {
+                'title': '面談', 'start_datetime': '2030-05-12 10:00', 'end_datetime': '2030-05-12 11:00',
+                'event_type': 'activity', 'category': []})),
+            ('update',       lambda: self.service.update_event(self.event.id, self.user_id, title='更新後')),
+            ('move out',     lambda: self.service.update_event(self.event.id, self.user_id,
+                                                               start_datetime='2030-07-01 10:00', end_datetime='2030-07-01 11:00')),
+            ('delete',       lambda: Event.objects.filter(user_id=self.user_id).first().delete()),
+        ]
+        for name, write in writes:
+            with self.subTest(write=name):
+                etag = self._etag()
+                write()
+                response = self.client.get('/api/schedule/events/', self.params, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+
+class EventPageWalkTests(TestCase):
+    """一覧のキーセットページネーション（同じ開始日時の予定と繰り返し予定の回をまたいで重複も抜けもなくたどれる）"""
+
+    user_id = 'page_user'
+    params  = {'user_id': 'page_user', 'start': '2030-06-10', 'end': '2030-06-10', 'limit': 3}
+
+    def setUp(self):
+        series_registry.invalidate(self.user_id)
+        service = ScheduleService()
+
+        def create(hour, title):
+            return Event.objects.create(user_id=self.user_id, title=title, start_datetime=_local(2030, 6, 10, hour, 0),
+                                        end_datetime=_local(2030, 6, 10, hour, 30), event_type='activity', category=[]).id
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first  = create(9, '朝')
+            same   = [create(10, f'同時刻{i}') for i in range(7)]
+            last   = create(11, '昼')
+            service.create_series(self.user_id, {
+                'title': '毎日', 'start_datetime': '2030-06-10 10:00', 'end_datetime': '2030-06-10 10:30',
+                'rrule': 'FREQ=DAILY', 'event_type': 'activity', 'category': [],
+            }, force=True)
+        self.expected_events = [first, *same, last]
+        self.series_title    = '毎日'
+
+    def _walk(self):
+        pages, cursor = [], None
+        while True:
+            params   = {**self.params, **({'cursor': cursor} if cursor else {})}
+            response = self.client.get('/api/schedule/events/', params)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            pages.append(page['events'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                return pages
+            self.assertLess(len(pages), 10)
+
+    def test_pages_have_no_duplicates_or_gaps(self):
+        pages  = self._walk()
+        listed = [e for page in pages for e in page]
+        self.assertEqual([len(page) for page in pages], [3, 3, 3, 1])
+        self.assertEqual(len({str(e['id']) for e in listed}), len(listed))
+        # 同じ開始日時では繰り返し予定の回が先、続いて id 順
+        self.assertEqual(listed[1]['title'], self.series_title)
+        self.assertEqual([e['id'] for e in listed if e['title'] != self.series_title], self.expected_events)
+
+    def test_last_full_page_has_no_next_cursor(self):
+        response = self.client.get('/api/schedule/events/', {**self.params, 'limit': 10})
+        self.assertEqual(len(response.json()['events']), 10)
+        self.assertIsNone(response.json()['next_cursor'])
+
+    def test_malformed_cursor_is_rejected(self):
+        for cursor in ('not-base64!', encode_cursor(_local(2030, 6, 10), 1)[:-2], 'WzEsIngiXQ'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/api/schedule/events/', {**self.params, 'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('cursor', response.json()['errors'])
+
+
+class BulkSerializerTests(TestCase):
+    """serialize_events が _event_to_dict と項目ごとに同じ辞書を返す（終日・終了なし・カテゴリ null・夏時間の切り替え）"""
+
+    user_id = 'serializer_user'
+
+    def setUp(self):
+        self.service = ScheduleService()
+        utc  = dt_timezone.utc
+        rows = [
+            ('終日', _local(2030, 3, 9), _local(2030, 3, 10), {'is_all_day': True}),
+            ('終了なし', _local(2030, 3, 9, 12, 0), None, {}),
+            ('カテゴリなし', _local(2030, 3, 9, 13, 0), _local(2030, 3, 9, 14, 0), {}),
+        ]
+        # America/New_York の夏時間の開始（2030-03-10 07:00 UTC）と終了（2030-11-03 06:00 UTC）を 15 分刻みでまたぐ
+        for switch in (datetime(2030, 3, 10, 7, 0, tzinfo=utc), datetime(2030, 11, 3, 6, 0, tzinfo=utc)):
+            for step in range(-8, 8):
+                start = switch + timedelta(minutes=15 * step, seconds=30)
+                rows.append((f'{start:%m-%d %H:%M}', start, start + timedelta(minutes=45), {}))
+        for title, start, end, extra in rows:
+            Event.objects.create(**{'user_id': self.user_id, 'title': title, 'start_datetime': start, 'end_datetime': end,
+                                    'event_type': 'activity', 'category': ['学業'], **extra})
+        # JSONField に None を渡すと SQL の NULL になるため、JSON の null は Value で書き込む
+        Event.objects.filter(user_id=self.user_id, title='カテゴリなし').update(category=Value(None, JSONField()))
+
+    def test_matches_event_to_dict(self):
+        queryset = Event.objects.filter(user_id=self.user_id).order_by('start_datetime', 'id')
+        for tz in ('Asia/Tokyo', 'America/New_York', 'UTC'):
+            with self.subTest(tz=tz), timezone.override(tz):
+                expected = [self.service._event_to_dict(event) for event in queryset]
+                self.assertEqual(serialize_events(queryset), expected)
+
+    def test_null_end_and_category(self):
+        by_title = {e['title']: e for e in serialize_events(Event.objects.filter(user_id=self.user_id))}
+        self.assertIsNone(by_title['終了なし']['end'])
+        self.assertIsNone(by_title['カテゴリなし']['category'])
+        self.assertTrue(by_title['終日']['is_all_day'])
+
+
+class _StubClient:
+    """anthropic.Anthropic の代わり（messages.create / stream に渡された引数を記録し、用意した応答テキストを順に返す）"""
+
+    usage = SimpleNamespace(input_tokens=100, cache_read_input_tokens=2000, cache_creation_input_tokens=0, output_tokens=20)
+
+    def __init__(self, *replies, chunk_size=7):
+        self.replies    = list(replies)
+        self.chunk_size = chunk_size   # stream で応答テキストを分ける文字数
+        self.calls      = []
+        self.messages   = self
+
+    def create(self, **params):
+        self.calls.append(params)
+        return SimpleNamespace(content=[SimpleNamespace(text=self.replies.pop(0))], usage=self.usage)
+
+    def stream(self, **params):
+        self.calls.append(params)
+        text, size = self.replies.pop(0), self.chunk_size
+        stream     = mock.MagicMock()
+        stream.__enter__.return_value = stream
+        stream.text_stream = [text[i:i + size] for i in range(0, len(text), size)]
+        stream.get_final_message.return_value = SimpleNamespace(usage=self.usage)
+        return stream
+
+    def tasks(self):
+        """呼び出された順のタスク名（system の最後のブロックから取り出す）"""
+        return [call['system'][-1]['text'].removeprefix('今回のタスク: ') for call in self.calls]
+
+
+class ConflictMessagesTests(SimpleTestCase):
+    """重複予定の警告文（1 回の AI 呼び出しでまとめて生成し、応答が不正なら 1 件ずつ生成し直す）"""
+
+    new_event = {'title': '打ち合わせ', 'start': '2030-05-10 10:00', 'end': '2030-05-10 11:00', 'type': 'activity'}
+    existing  = [
+        {'title': f'既存{i}', 'start': '2030-05-10 10:30', 'end': '2030-05-10 11:30', 'type': 'activity'} for i in range(3)
+    ]
+
+    def _generate(self, *replies):
+        service        = AIService(cache=AIResponseCache(LRUCacheBackend()))
+        service.client = _StubClient(*replies)
+        return service.generate_conflict_messages(self.new_event, self.existing), service
+
+    def test_messages_are_generated_in_one_request(self):
+        messages, service = self._generate('```json\n{"messages": [" 1件目 ", "2件目", "3件目"]}\n```')
+        self.assertEqual(messages, ['1件目', '2件目', '3件目'])
+        self.assertEqual(service.client.tasks(), ['generate_conflict_messages'])
+        self.assertIn('既存の予定3', service.client.calls[0]['messages'][0]['content'])
+
+    def test_malformed_or_short_reply_falls_back_per_event(self):
+        replies = {
+            'not json'     : 'すみません、生成できませんでした',
+            'too short'    : '{"messages": ["1件目", "2件目"]}',
+            'empty message': '{"messages": ["1件目", " ", "3件目"]}',
+            'not a list'   : '{"messages": "1件目"}',
+        }
+        for name, reply in replies.items():
+            with self.subTest(reply=name):
+                messages, service = self._generate(reply, ' 個別1 ', '個別2', '個別3')
+                self.assertEqual(messages, ['個別1', '個別2', '個別3'])
+                self.assertEqual(service.client.tasks(), ['generate_conflict_messages'] + ['generate_conflict_message'] * 3)
+                for event, call in zip(self.existing, service.client.calls[1:]):
+                    self.assertIn(event['title'], call['messages'][0]['content'])
+
+
+class PeriodResolverTests(SimpleTestCase):
+    """定型の期間指定をローカルで日付範囲に変換し、解釈できない表現は AI に委ねる"""
+
+    today = datetime(2026, 3, 4).date()   # 水曜日
+
+    def test_supported_expressions(self):
+        cases = {
+            '今日'              : ('2026-03-04', '2026-03-04'),
+            '明日の予定'        : ('2026-03-05', '2026-03-05'),
+            'おととい'          : ('2026-03-02', '2026-03-02'),
+            '今週'              : ('2026-03-02', '2026-03-08'),
+            '来週は？'          : ('2026-03-09', '2026-03-15'),
+            '先週'              : ('2026-02-23', '2026-03-01'),
+            '今月'              : ('2026-03-01', '2026-03-31'),
+            '先月'              : ('2026-02-01', '2026-02-28'),
+            '再来月'            : ('2026-05-01', '2026-05-31'),
+            '来年'              : ('2027-01-01', '2027-12-31'),
+            '週末'              : ('2026-03-07', '2026-03-08'),
+            '来週末'            : ('2026-03-14', '2026-03-15'),
+            '来週の火曜日'      : ('2026-03-10', '2026-03-10'),
+            '水曜'              : ('2026-03-04', '2026-03-04'),
+            '月曜'              : ('2026-03-09', '2026-03-09'),
+            '3日後'             : ('2026-03-07', '2026-03-07'),
+            '2週間前'           : ('2026-02-18', '2026-02-18'),
+            '今後7日間'         : ('2026-03-04', '2026-03-10'),
+            '2026年4月'         : ('2026-04-01', '2026-04-30'),
+            '2026/3/10'         : ('2026-03-10', '2026-03-10'),
+            '12月'              : ('2026-12-01', '2026-12-31'),
+            '２０２５年'        : ('2025-01-01', '2025-12-31'),
+            '３月１日〜３月５日': ('2026-03-01', '2026-03-05'),
+            '今日から来週まで'  : ('2026-03-04', '2026-03-15'),
+        }
+        resolver = PeriodResolver()
+        for text, (start, end) in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(resolver.resolve(text, self.today), {'start': f'{start} 00:00', 'end': f'{end} 23:59'})
+
+    def test_unsupported_expressions_are_not_resolved(self):
+        resolver = PeriodResolver()
+        for text in ('', '来週の午後', '月末', 'ゴールデンウィーク', '2026年2月30日', '13月', '3月5日〜3月1日', '0日間'):
+            with self.subTest(text=text):
+                self.assertIsNone(resolver.resolve(text, self.today))
+
+    def test_unsupported_expressions_fall_through_to_ai(self):
+        service        = AIService(cache=AIResponseCache(LRUCacheBackend()))
+        service.client = _StubClient('{"start": "2026-03-09 12:00", "end": "2026-03-15 23:59"}')
+        with mock.patch('schedule.services.period_resolver.timezone.localdate', return_value=self.today):
+            self.assertEqual(service.parse_period('来週')['start'], '2026-03-09 00:00')
+            self.assertEqual(service.parse_period('来週の午後')['start'], '2026-03-09 12:00')
+        self.assertEqual(service.client.tasks(), ['parse_period'])
+        self.assertEqual(service.period_stats.snapshot(), {'local': 1, 'llm': 1, 'total': 2})
+
+
+class StreamingCommandTests(TestCase):
+    """統合コマンドのストリーミング（警告文の逐次取り出しと SSE のイベント順）"""
+
+    user_id = 'stream_user'
+    reply   = '```json\n{"messages": ["「会議」と \\"重複\\" しています", "[注意] {カテゴリ}, \\\\ が同じ\\u3067す"]}\n```'
+    expected = ['「会議」と "重複" しています', '[注意] {カテゴリ}, \\ が同じです']
+
+    def test_scanner_handles_every_chunk_boundary(self):
+        for split in range(1, len(self.reply)):
+            with self.subTest(split=split):
+                scanner = MessageArrayScanner()
+                found   = scanner.feed(self.reply[:split]) + scanner.feed(self.reply[split:])
+                self.assertEqual(found, self.expected)
+
+    def test_scanner_yields_each_message_once_it_is_closed(self):
+        scanner, found = MessageArrayScanner(), []
+        for i, char in enumerate(self.reply):
+            for message in scanner.feed(char):
+                found.append((message, i))
+        # どちらの警告文も「す"」で閉じる
+        closing = [i for i in range(len(self.reply)) if self.reply[:i + 1].endswith('す"')]
+        self.assertEqual(found, list(zip(self.expected, closing)))
+
+    def _events(self, data):
+        response = self.client.post('/api/schedule/command/', {'user_id': self.user_id, 'stream': True, **data},
+                                    content_type='application/json')
+        self.assertEqual(response['Content-Type'], 'text/event-stream; charset=utf-8')
+        body = b''.join(response.streaming_content).decode()
+        return [
+            (lines[0].removeprefix('event: '), json.loads(lines[1].removeprefix('data: ')))
+            for lines in (chunk.split('\n') for chunk in body.split('\n\n') if chunk)
+        ]
+
+    def test_sse_stage_order(self):
+        self.client.patch('/api/schedule/settings/', data={'user_id': self.user_id, 'ai_warning_message': True},
+                          content_type='application/json')
+        for title in ('会議', '面談'):
+            Event.objects.create(user_id=self.user_id, title=title, start_datetime=_local(2030, 5, 10, 10, 0),
+                                 end_datetime=_local(2030, 5, 10, 11, 0), event_type='activity', category=[])
+        ai_service = views.schedule_service.ai_service
+        commands   = {
+            '追加': {'intent': 'add', 'event_data': {'title': '打ち合わせ', 'start_datetime': '2030-05-10 10:30',
+                                                      'end_datetime': '2030-05-10 11:30', 'event_type': 'activity'}},
+            '検索': {'intent': 'search', 'period': '2030年5月'},
+            '不明': {'intent': 'unknown'},
+        }
+        expected = {
+            '追加': ['intent', 'draft', 'conflicts', 'warning_message', 'warning_message', 'result'],
+            '検索': ['intent', 'period', 'result'],
+            '不明': ['intent', 'result'],
+        }
+        for text, command in commands.items():
+            with self.subTest(input=text), \
+                    mock.patch.object(ai_service, 'parse_unified_command', return_value=command), \
+                    mock.patch.object(ai_service, 'client', _StubClient(self.reply, chunk_size=5)):
+                events = self._events({'input': text})
+                self.assertEqual([name for name, _ in events], expected[text])
+                if text == '追加':
+                    self.assertEqual([(d['index'], d['message']) for name, d in events if name == 'warning_message'],
+                                     list(enumerate(self.expected)))
+                    self.assertEqual([d['warning_message'] for d in events[-1][1]['conflicts']], self.expected)
+
+
+class ModelEscalationTests(SimpleTestCase):
+    """JSON として解析できない応答は上位の階層のモデルで 1 回だけ再試行する（呼び出しごとにレイテンシを記録）"""
+
+    def _service(self, *replies):
+        service        = AIService(cache=AIResponseCache(LRUCacheBackend()))
+        service.client = _StubClient(*replies)
+        return service
+
+    def _models(self, service):
+        return [call['model'] for call in service.client.calls]
+
+    def test_unparseable_reply_escalates_once(self):
+        service = self._service('来週です', '{"start": "2026-03-09 00:00", "end": "2026-03-15 23:59"}')
+        # 下位の階層で 0.2 秒、上位の階層で 1.5 秒かかったことにする
+        with mock.patch('schedule.services.ai_service.time.perf_counter', side_effect=[10.0, 10.2, 11.0, 12.5]):
+            self.assertEqual(service._request_period('来週のどこか')['end'], '2026-03-15 23:59')
+        router = service.router
+        self.assertEqual(self._models(service), [router.route('parse_period').model,
+                                                 router.route('parse_period', escalated=True).model])
+        self.assertEqual(service.escalations.snapshot(), {'parse_period': 1, 'total': 1})
+        self.assertEqual(service.latency.snapshot()['parse_period'], {'count': 2, 'p50_ms': 200.0, 'p95_ms': 1500.0, 'max_ms': 1500.0})
+        self.assertEqual(service.token_usage.snapshot()['parse_period']['calls'], 2)
+
+    def test_escalated_reply_is_not_retried_again(self):
+        service = self._service('来週です', 'やはり来週です')
+        with self.assertRaises(ValueError):
+            service._request_period('来週のどこか')
+        self.assertEqual(len(service.client.calls), 2)
+        self.assertEqual(service.escalations.snapshot()['total'], 1)
+        self.assertEqual(service.latency.snapshot()['parse_period']['count'], 2)
+
+    def test_task_already_on_the_escalation_tier_is_not_retried(self):
+        service = self._service('解析できません')
+        self.assertFalse(service.router.can_escalate('parse_natural_language'))
+        with self.assertRaises(ValueError):
+            service.parse_natural_language('来週どこかで打ち合わせ')
+        self.assertEqual(len(service.client.calls), 1)
+        self.assertEqual(service.escalations.snapshot()['total'], 0)
+        self.assertEqual(service.latency.snapshot()['parse_natural_language']['count'], 1)
+
+
+class StatsViewTests(TestCase):
+    """運用メトリクス API が、実際にリクエストを処理しているサービス（ASYNC_VIEWS では同期版と非同期版）の集計を返す"""
+
+    def setUp(self):
+        from schedule.async_views import async_schedule_service
+        self.services = {'sync': views.schedule_service, 'async': async_schedule_service}
+        for service in self.services.values():
+            mock.patch.object(service.ai_service, 'period_stats', HitCounter('local', 'llm')).start()
+            mock.patch.object(service.ai_service, 'latency', LatencyStats()).start()
+            mock.patch.object(service.ai_service, 'token_usage', TokenUsage()).start()
+        self.addCleanup(mock.patch.stopall)
+
+        usage = SimpleNamespace(input_tokens=100, cache_read_input_tokens=300, cache_creation_input_tokens=0, output_tokens=10)
+        for name, seconds in (('sync', 0.1), ('async', 0.3)):
+            ai_service = self.services[name].ai_service
+            ai_service.period_stats.incr('llm')
+            ai_service.latency.observe('parse_period', seconds)
+            ai_service.token_usage.record('parse_period', usage)
+        self.services['async'].ai_service.period_stats.incr('local', 2)
+
+    def _stats(self):
+        response = self.client.get('/api/schedule/stats/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_only_the_sync_service_without_async_views(self):
+        stats = self._stats()
+        self.assertEqual(stats['period_resolver'], {'local': 0, 'llm': 1, 'total': 1})
+        self.assertEqual(stats['ai_latency']['parse_period']['count'], 1)
+
+    @override_settings(ASYNC_VIEWS=True)
+    def test_sync_and_async_services_are_merged(self):
+        stats = self._stats()
+        self.assertEqual(stats['period_resolver'], {'local': 2, 'llm': 2, 'total': 4})
+        self.assertEqual(stats['ai_latency']['parse_period'], {'count': 2, 'p50_ms': 100.0, 'p95_ms': 300.0, 'max_ms': 300.0})
+        self.assertEqual(stats['ai_usage']['parse_period']['calls'], 2)
+        self.assertEqual(stats['ai_usage']['parse_period']['cache_hit_ratio'], 0.75)
@@ -1,13 +1,33 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'schedule'
 
+# AI を呼び出すビューは ASGI 運用時（ASYNC_VIEWS=True）に非同期版へ差し替える
+if settings.ASYNC_VIEWS:
+    from . import async_views
+    AddEventView  = async_views.AsyncAddEventView
+    GetEventsView = async_views.AsyncGetEventsView
+    CommandView   = async_views.AsyncCommandView
+else:
+    AddEventView  = views.AddEventView
+    GetEventsView = views.GetEventsView
+    CommandView   = views.CommandView
+
 urlpatterns = [
-    path('add-event/', views.AddEventView.as_view(), name='add-event'),
-    path('get-events/', views.GetEventsView.as_view(), name='get-events'),
+    path('add-event/', AddEventView.as_view(), name='add-event'),
+    path('get-events/', GetEventsView.as_view(), name='get-events'),
+    path('events/', views.EventRangeView.as_view(), name='event-range'),
+    path('events/summary/', views.MonthSummaryView.as_view(), name='event-summary'),
     path('events/<int:event_id>/', views.EventDetailView.as_view(), name='event-detail'),
+    path('series/', views.SeriesView.as_view(), name='series'),
+    path('series/<int:series_id>/', views.SeriesDetailView.as_view(), name='series-detail'),
+    path('series/<int:series_id>/occurrences/<str:recurrence_id>/', views.OccurrenceDetailView.as_view(), name='occurrence-detail'),
     path('settings/',      views.UserSettingsView.as_view(),  name='settings'),
     path('modify-event/',  views.ModifyEventView.as_view(),   name='modify-event'),
-    path('command/',       views.CommandView.as_view(),        name='command'),
+    path('command/',       CommandView.as_view(),              name='command'),
+    path('bulk-add/',      views.BulkAddView.as_view(),        name='bulk-add'),
+    path('import-ics/',    views.IcsImportView.as_view(),      name='import-ics'),
+    path('stats/',         views.StatsView.as_view(),          name='stats'),
 ]
\ No newline at end of file
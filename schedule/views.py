@@ -1,14 +1,42 @@
+from django.conf import settings
+from django.http import HttpResponseNotModified
+from django.utils.cache import get_conditional_response
+from rest_framework.parsers import MultiPartParser
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .serializers import EventCreateSerializer, EventListSerializer
+from .serializers import BulkAddSerializer, EventCreateSerializer, EventListSerializer, EventRangeSerializer, IcsImportSerializer, MonthSummarySerializer, SeriesCreateSerializer
 from .services.schedule_service import ScheduleService
+from .services.ics_import import IcsFormatError, IcsImporter
+from .services.db_pool import pool_stats
+from .services.event_list_cache import EventListCache
+from .services.interval_index import interval_indexes
+from .services.metrics import HitCounter, LatencyStats, TokenUsage
+from .services.month_summary import month_summary, month_summary_etag
+from .services.recurrence import series_registry
+from .services.settings_cache import user_settings_cache
+from .streaming import ai_error_payload, sse_response
 from .models import Event, UserSettings
+from .renderers import FastJSONRenderer
 import anthropic
 
 schedule_service = ScheduleService()
 
 
+def _not_modified(request, etag):
+    """If-None-Match が etag と一致すれば本文なしの 304 を返す（一致しなければ None）。"""
+    if get_conditional_response(request, etag=etag) is None:
+        return None
+    return _with_etag(HttpResponseNotModified(), etag)
+
+
+def _with_etag(response, etag):
+    # no-cache: ブラウザは保存した応答を毎回 If-None-Match 付きで再検証する
+    response['ETag']          = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 class AddEventView(APIView):
     """イベント追加 API"""
 
@@ -58,6 +86,8 @@ class AddEventView(APIView):
 class GetEventsView(APIView):
     """イベント取得 API"""
 
+    renderer_classes = [FastJSONRenderer]
+
     def post(self, request):
         serializer = EventListSerializer(data=request.data)
 
@@ -68,12 +98,14 @@ class GetEventsView(APIView):
             )
 
         try:
-            events = schedule_service.get_events(
+            page = schedule_service.get_events(
                 user_id     = serializer.validated_data.get('user_id', 'default_user'),
                 period_text = serializer.validated_data.get('period', '今日'),
+                cursor      = serializer.validated_data.get('cursor'),
+                limit       = serializer.validated_data.get('limit'),
             )
             return Response(
-                {'status': 'success', 'events': events},
+                {'status': 'success', **page},
                 status=status.HTTP_200_OK
             )
 
@@ -102,6 +134,125 @@ class GetEventsView(APIView):
             )
 
 
+class EventRangeView(APIView):
+    """期間指定イベント取得 API（ISO 日時で範囲を指定、AI 解析なし）"""
+
+    renderer_classes = [FastJSONRenderer]
+
+    def get(self, request):
+        serializer = EventRangeSerializer(data=request.query_params)
+
+        if not serializer.is_valid():
+            return Response(
+                {'status': 'error', 'errors': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        data    = serializer.validated_data
+        user_id = data.get('user_id', 'default_user')
+        etag    = schedule_service.events_in_range_etag(user_id, data['start'], data['end'])
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        page = schedule_service.get_events_in_range(
+            user_id    = user_id,
+            start_dt   = data['start'],
+            end_dt     = data['end'],
+            event_type = data.get('type'),
+            priority   = data.get('priority'),
+            category   = data.get('category'),
+            cursor     = data.get('cursor'),
+            limit      = data.get('limit'),
+        )
+        return _with_etag(Response(
+            {'status': 'success', **page},
+            status=status.HTTP_200_OK
+        ), etag)
+
+
+class MonthSummaryView(APIView):
+    """月間ビュー用の日別サマリー API（種別・優先度ごとの件数、最初の開始時刻、ブロック帯）"""
+
+    renderer_classes = [FastJSONRenderer]
+
+    def get(self, request):
+        serializer = MonthSummarySerializer(data=request.query_params)
+
+        if not serializer.is_valid():
+            return Response(
+                {'status': 'error', 'errors': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        data        = serializer.validated_data
+        user_id     = data.get('user_id', 'default_user')
+        year, month = data['month']
+        etag        = month_summary_etag(user_id, year, month)
+        not_modified = _not_modified(request, etag)
+        if not_modified is not None:
+            return not_modified
+
+        summary = month_summary(user_id, year, month)
+        return _with_etag(Response(
+            {'status': 'success', **summary},
+            status=status.HTTP_200_OK
+        ), etag)
+
+
+class BulkAddView(APIView):
+    """複数行一括追加 API（1 行 1 件の予定をまとめて解析・衝突チェック・作成）"""
+
+    def post(self, request):
+        serializer = BulkAddSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(
+                {'status': 'error', 'errors': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        data = serializer.validated_data
+        try:
+            result = schedule_service.bulk_add_events(
+                user_id       = data.get('user_id', 'default_user'),
+                natural_input = data['input'],
+                force         = data.get('force', False),
+            )
+            return Response(result, status=status.HTTP_200_OK)
+        except Exception as e:
+            payload, code = ai_error_payload(e)
+            return Response(payload, status=code)
+
+
+class IcsImportView(APIView):
+    """ICS インポート API（multipart/form-data の file を読み込む。AI 解析なし）"""
+
+    # 2.5MB を超えるファイルは一時ファイルに書き出される（FILE_UPLOAD_MAX_MEMORY_SIZE）
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        serializer = IcsImportSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(
+                {'status': 'error', 'errors': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        upload = serializer.validated_data['file']
+        # UploadedFile は行単位（チャンク読み）で反復できるため、ファイル全体をメモリに載せない
+        lines  = (line.decode('utf-8', errors='replace') for line in upload)
+        try:
+            result = IcsImporter(schedule_service).run(serializer.validated_data.get('user_id', 'default_user'), lines)
+            return Response(result, status=status.HTTP_200_OK)
+        except IcsFormatError as e:
+            return Response(
+                {'status': 'error', 'message': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+
 class EventDetailView(APIView):
     """イベント詳細 API（削除・編集）"""
 
@@ -148,13 +299,98 @@ class EventDetailView(APIView):
             )
 
 
+class SeriesView(APIView):
+    """繰り返し予定 API（一覧・作成。AI 解析なし）"""
+
+    def get(self, request):
+        user_id = request.query_params.get('user_id', 'default_user')
+        return Response({'status': 'success', 'series': schedule_service.list_series(user_id)})
+
+    def post(self, request):
+        serializer = SeriesCreateSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(
+                {'status': 'error', 'errors': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        data    = dict(serializer.validated_data)
+        user_id = data.pop('user_id', 'default_user')
+        force   = data.pop('force', False)
+        try:
+            result = schedule_service.create_series(user_id, data, force)
+            return Response(result, status=status.HTTP_200_OK)
+        except ValueError as e:
+            return Response(
+                {'status': 'error', 'message': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+
+class SeriesDetailView(APIView):
+    """繰り返し予定の削除 API（すべての回を削除）"""
+
+    def delete(self, request, series_id):
+        user_id = request.data.get('user_id', 'default_user')
+        try:
+            schedule_service.delete_series(user_id, series_id)
+            return Response({'status': 'success', 'message': '削除しました'})
+        except ValueError as e:
+            return Response(
+                {'status': 'error', 'message': str(e)},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+
+class OccurrenceDetailView(APIView):
+    """繰り返し予定の 1 回分の API（削除・編集）。recurrence_id は元の開始日時 YYYYMMDDHHMM"""
+
+    def delete(self, request, series_id, recurrence_id):
+        """この回だけ削除（シリーズの除外日時に加える）"""
+        user_id = request.data.get('user_id', 'default_user')
+        try:
+            return Response(schedule_service.cancel_occurrence(user_id, series_id, recurrence_id))
+        except ValueError as e:
+            return Response(
+                {'status': 'error', 'message': str(e)},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+    def patch(self, request, series_id, recurrence_id):
+        """この回だけ編集（通常のイベントとして切り出す。返す event の id は新しいイベントの id）"""
+        user_id = request.data.get('user_id', 'default_user')
+        try:
+            result = schedule_service.detach_occurrence(
+                user_id        = user_id,
+                series_id      = series_id,
+                recurrence_id  = recurrence_id,
+                title          = request.data.get('title'),
+                start_datetime = request.data.get('start_datetime'),
+                end_datetime   = request.data.get('end_datetime'),
+            )
+            return Response(result)
+
+        except ValueError as e:
+            return Response(
+                {'status': 'error', 'message': str(e)},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        except Exception as e:
+            return Response(
+                {'status': 'error', 'message': f'更新に失敗しました: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
 class UserSettingsView(APIView):
     """ユーザー設定 API"""
 
     def get(self, request):
+        # 未保存のユーザーには既定値を返す（読み込みでは行を作らない）
         user_id = request.query_params.get('user_id', 'default_user')
-        obj, _ = UserSettings.objects.get_or_create(user_id=user_id)
-        return Response({'status': 'success', 'settings': obj.to_dict()})
+        return Response({'status': 'success', 'settings': user_settings_cache.get(user_id)})
 
     def patch(self, request):
         user_id = request.data.get('user_id', 'default_user')
@@ -163,6 +399,7 @@ class UserSettingsView(APIView):
         fields = [
             'default_duration_hours',
             'warning_level',
+            'ai_warning_message',
             'remind_minutes_before',
             'remind_day_before',
             'remind_days_before_deadline',
@@ -171,6 +408,7 @@ class UserSettingsView(APIView):
             if field in request.data:
                 setattr(obj, field, request.data[field])
         obj.save()
+        user_settings_cache.invalidate(user_id)
 
         return Response({'status': 'success', 'settings': obj.to_dict()})
 
@@ -200,7 +438,7 @@ class CommandView(APIView):
             changes = request.data.get('changes', {})
             try:
                 result = schedule_service.apply_modify_to_event(
-                    event_id=int(confirm_event_id),
+                    event_id=confirm_event_id,
                     user_id=user_id,
                     intent=intent,
                     changes=changes,
@@ -225,6 +463,10 @@ class CommandView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # ストリーミングモード: 各段階の結果を Server-Sent Events で逐次返す
+        if request.data.get('stream'):
+            return sse_response(schedule_service.stream_command(user_id, natural_input))
+
         try:
             result = schedule_service.execute_command(
                 user_id       = user_id,
@@ -270,7 +512,7 @@ class ModifyEventView(APIView):
             changes = request.data.get('changes', {})
             try:
                 result = schedule_service.apply_modify_to_event(
-                    event_id = int(confirm_event_id),
+                    event_id = confirm_event_id,
                     user_id  = user_id,
                     intent   = intent,
                     changes  = changes,
@@ -325,3 +567,36 @@ class ModifyEventView(APIView):
                 {'status': 'error', 'message': f'予期しないエラーが発生しました: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+def _active_services():
+    """
+    リクエストを処理しているサービス。ASYNC_VIEWS=True では AI を呼び出すビュー（追加・取得・コマンド）が
+    async_views の非同期版を、それ以外のビューがこのモジュールの同期版を使うため両方を返す。
+    """
+    if not settings.ASYNC_VIEWS:
+        return [schedule_service]
+    from .async_views import async_schedule_service
+    return [schedule_service, async_schedule_service]
+
+
+class StatsView(APIView):
+    """運用メトリクス API（AI 呼び出し削減状況の確認用。同期版・非同期版のサービスの集計を合算する）"""
+
+    def get(self, request):
+        services = _active_services()
+        ai       = [service.ai_service for service in services]
+        return Response({
+            'status': 'success',
+            'period_resolver' : HitCounter.merged(*(a.period_stats for a in ai)).snapshot(),
+            'command_parser'  : HitCounter.merged(*(a.command_stats for a in ai)).snapshot(),
+            'ai_cache'        : HitCounter.merged(*(a.cache.stats for a in ai)).snapshot(),
+            'ai_usage'        : TokenUsage.merged(*(a.token_usage for a in ai)).snapshot(),
+            'ai_latency'      : LatencyStats.merged(*(a.latency for a in ai)).snapshot(),
+            'ai_escalations'  : HitCounter.merged(*(a.escalations for a in ai)).snapshot(),
+            'interval_index'  : interval_indexes.stats.snapshot(),
+            'event_list_cache': EventListCache.merged_snapshot(*(service.event_cache for service in services)),
+            'settings_cache'  : user_settings_cache.stats.snapshot(),
+            'db_pool'         : pool_stats(),
+            'recurrence'      : series_registry.snapshot(),
+        })
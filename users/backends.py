@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+UserModel = get_user_model()
+
+
+class EmailBackend(ModelBackend):
+    """
+    メールアドレス + パスワードで認証する（authenticate(request, email=..., password=...)）。
+
+    auth_user.email のインデックス（users/migrations/0002）で 1 回だけ検索する。
+    同じメールアドレスのユーザーが複数いる場合は最も古いユーザーを対象にする。
+    username での認証（管理画面など）は後ろの ModelBackend に任せる。
+    """
+
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if email is None or password is None:
+            return None
+
+        user = UserModel._default_manager.filter(email=email).order_by('pk').first()
+        if user is None:
+            # 存在しないメールアドレスでも同じだけハッシュを計算し、応答時間の差をなくす
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
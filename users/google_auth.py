@@ -0,0 +1,178 @@
+"""
+Google ID トークンの検証。
+
+id_token.verify_oauth2_token に毎回新しい google_requests.Request() を渡すと、ログインのたびに
+新しい HTTP 接続で Google の署名用証明書を取得する。ここでは接続プール付きの requests.Session を
+使い回し、証明書の応答を Cache-Control の max-age の間キャッシュする（GoogleCertsTransport）。
+"""
+import re
+import threading
+import time
+import requests
+from django.conf import settings
+from google.auth import exceptions
+from google.auth.transport import Response
+from google.auth.transport import requests as google_requests
+from google.oauth2 import id_token
+from requests.structures import CaseInsensitiveDict
+from schedule.services.metrics import HitCounter
+
+
+GOOGLE_CERTS_URL = 'https://www.googleapis.com/oauth2/v1/certs'
+GOOGLE_ISSUERS   = ('accounts.google.com', 'https://accounts.google.com')
+
+_MAX_AGE = re.compile(r'(?:^|,)\s*max-age\s*=\s*"?(\d+)"?', re.IGNORECASE)
+
+
+class _CachedResponse(Response):
+    """キャッシュに保存する応答（google.auth.transport.Response 互換）"""
+
+    def __init__(self, status, headers, data):
+        self._status  = status
+        self._headers = headers
+        self._data    = data
+
+    @property
+    def status(self):
+        return self._status
+
+    @property
+    def headers(self):
+        return self._headers
+
+    @property
+    def data(self):
+        return self._data
+
+
+class _Entry:
+    __slots__ = ('response', 'fetched_at', 'expires_at')
+
+    def __init__(self, response, fetched_at, expires_at):
+        self.response   = response
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+
+
+def cache_lifetime(headers):
+    """Cache-Control の max-age から Age を引いた有効期間（秒）。キャッシュしてはいけない応答は 0。"""
+    cache_control = headers.get('Cache-Control', '')
+    if 'no-store' in cache_control.lower() or 'no-cache' in cache_control.lower():
+        return 0
+    match = _MAX_AGE.search(cache_control)
+    if not match:
+        return 0
+    try:
+        age = int(headers.get('Age', 0))
+    except ValueError:
+        age = 0
+    return max(0, int(match.group(1)) - age)
+
+
+class GoogleCertsTransport:
+    """
+    google.auth.transport.Request 互換の呼び出し可能オブジェクト（プロセスで 1 つを使い回す）。
+
+    GET の応答を URL ごとに Cache-Control の max-age の間キャッシュする。
+    有効期限の refresh_ahead 秒前を過ぎて参照されたら、キャッシュを返しつつ別スレッドで取り直す。
+    期限切れ後の取得に失敗した場合は、期限から stale_grace 秒までは古い応答を使い続ける
+    （Google は証明書を max-age よりずっと長く有効にしているため）。
+    """
+
+    def __init__(self, session=None, timeout=10, refresh_ahead=300, stale_grace=3600, min_refetch_interval=60):
+        self.session              = session or requests.Session()
+        self.timeout              = timeout
+        self.refresh_ahead        = refresh_ahead
+        self.stale_grace          = stale_grace
+        self.min_refetch_interval = min_refetch_interval
+        self.stats                = HitCounter('hit', 'fetch', 'background_refresh', 'stale')
+        self._request             = google_requests.Request(session=self.session)
+        self._lock                = threading.Lock()
+        self._entries             = {}    # url -> _Entry
+        self._refreshing          = set() # 別スレッドで取得中の URL
+
+    def __call__(self, url, method='GET', body=None, headers=None, timeout=None, **kwargs):
+        if method != 'GET' or body is not None or headers or kwargs:
+            return self._request(url, method=method, body=body, headers=headers, timeout=timeout or self.timeout, **kwargs)
+
+        now   = time.monotonic()
+        entry = self._entries.get(url)
+        if entry is not None and now < entry.expires_at:
+            self.stats.incr('hit')
+            if now >= entry.expires_at - self.refresh_ahead:
+                self._refresh_in_background(url)
+            return entry.response
+
+        try:
+            return self._fetch(url).response
+        except exceptions.TransportError:
+            if entry is not None and now < entry.expires_at + self.stale_grace:
+                self.stats.incr('stale')
+                return entry.response
+            raise
+
+    def invalidate(self, url):
+        """
+        url のキャッシュを捨てる（鍵の切り替え直後に未知の key id のトークンが来た場合用）。
+        前回の取得から min_refetch_interval 秒以内なら捨てずに False を返す。
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None and time.monotonic() - entry.fetched_at < self.min_refetch_interval:
+                return False
+            self._entries.pop(url, None)
+        return True
+
+    def _fetch(self, url):
+        raw      = self._request(url, method='GET', timeout=self.timeout)
+        response = _CachedResponse(raw.status, CaseInsensitiveDict(raw.headers), raw.data)
+        self.stats.incr('fetch')
+        now      = time.monotonic()
+        entry    = _Entry(response, now, now + cache_lifetime(response.headers))
+        if response.status == 200:
+            with self._lock:
+                self._entries[url] = entry
+        return entry
+
+    def _refresh_in_background(self, url):
+        with self._lock:
+            if url in self._refreshing:
+                return
+            self._refreshing.add(url)
+
+        def run():
+            try:
+                self._fetch(url)
+                self.stats.incr('background_refresh')
+            except exceptions.TransportError:
+                pass  # 期限切れまでは今のキャッシュを使い、次の参照で取り直す
+            finally:
+                with self._lock:
+                    self._refreshing.discard(url)
+
+        threading.Thread(target=run, daemon=True).start()
+
+
+google_certs_transport = GoogleCertsTransport()
+
+
+def verify_google_id_token(credential, audience=None, transport=None, certs_url=GOOGLE_CERTS_URL):
+    """
+    Google ID トークンを検証してクレームを返す（verify_oauth2_token と同じ検証）。
+    署名の検証に失敗し、キャッシュした証明書が古ければ、取り直して 1 回だけ再検証する。
+    Raises:
+        ValueError                : トークンが不正（署名・期限・audience）
+        exceptions.GoogleAuthError: 発行者が Google でない / 証明書を取得できない（TransportError）
+    """
+    transport = transport or google_certs_transport
+    audience  = audience or settings.GOOGLE_CLIENT_ID
+    try:
+        idinfo = id_token.verify_token(credential, transport, audience=audience, certs_url=certs_url)
+    except ValueError:
+        if not transport.invalidate(certs_url):
+            raise
+        idinfo = id_token.verify_token(credential, transport, audience=audience, certs_url=certs_url)
+
+    if idinfo['iss'] not in GOOGLE_ISSUERS:
+        raise exceptions.GoogleAuthError(f"発行者が不正です: {idinfo['iss']}")
+    return idinfo
@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    反復回数を settings.PASSWORD_PBKDF2_ITERATIONS で指定する PBKDF2-SHA256（None なら Django の既定の回数）。
+    保存済みのハッシュと回数が違えば、次回のログイン時に現在の回数で保存し直される。
+    """
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS or hashers.PBKDF2PasswordHasher.iterations
@@ -0,0 +1,100 @@
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from users.views import LoginView
+
+
+EMAIL    = 'benchmark-login@example.com'
+PASSWORD = 'benchmark-password-123'
+
+
+def _cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class Command(BaseCommand):
+    help = (
+        'ログイン API（LoginView）のスループットをパスワードハッシュの方式ごとに計測する'
+        '（計測用ユーザーを作成し、終了時に削除する）'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins',   type=int, default=200, help='方式ごとのログイン回数')
+        parser.add_argument('--threads',  type=int, default=_cores(), help='同時にログインするスレッド数（既定: 使える CPU コア数）')
+        parser.add_argument('--profiles', nargs='+', default=[settings.PASSWORD_HASHER_PROFILE],
+                            choices=sorted(settings.PASSWORD_HASHER_PROFILES), help='計測するハッシュの方式')
+
+    def handle(self, *args, **options):
+        cores   = min(options['threads'], _cores())
+        factory = RequestFactory()
+        view    = LoginView.as_view()
+        self.stdout.write(f'スレッド {options["threads"]} / CPU コア {_cores()}')
+        self.stdout.write(f'{"方式":<8} {"ハッシュ":>10} {"クエリ":>6} {"ログイン/秒":>10} {"/コア":>8} {"p50":>9} {"p95":>9}')
+
+        User.objects.filter(email=EMAIL).delete()
+        try:
+            for profile in options['profiles']:
+                hasher_path = settings.PASSWORD_HASHER_PROFILES[profile]
+                hashers     = [hasher_path] + [h for h in settings.PASSWORD_HASHERS if h != hasher_path]
+                with override_settings(PASSWORD_HASHERS=hashers):
+                    try:
+                        get_hasher().encode(PASSWORD, get_hasher().salt())
+                    except ValueError as e:
+                        self.stdout.write(f'{profile:<8} スキップ（{e}）')
+                        continue
+                    User.objects.filter(email=EMAIL).delete()
+                    User.objects.create_user(username='benchmark_login', email=EMAIL, password=PASSWORD)
+                    self._report(profile, self._measure(factory, view, options['logins'], options['threads']), cores)
+        finally:
+            User.objects.filter(email=EMAIL).delete()
+
+    def _measure(self, factory, view, logins, threads):
+        def login():
+            close_old_connections()
+            request  = factory.post('/api/auth/login/', {'email': EMAIL, 'password': PASSWORD}, content_type='application/json')
+            started  = time.perf_counter()
+            response = view(request)
+            elapsed  = time.perf_counter() - started
+            close_old_connections()
+            if response.status_code != 200:
+                raise CommandError(f'ログインに失敗しました（ステータス {response.status_code}）')
+            return elapsed
+
+        hash_started = time.perf_counter()
+        get_hasher().encode(PASSWORD, get_hasher().salt())
+        hash_seconds = time.perf_counter() - hash_started
+
+        # 1 回目は計測に含めない（保存済みハッシュの更新・接続の確立）
+        login()
+        with CaptureQueriesContext(connection) as queries:
+            login()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            latencies = sorted(pool.map(lambda _: login(), range(logins)))
+        elapsed = time.perf_counter() - started
+        return {
+            'hash'      : hash_seconds,
+            'queries'   : len(queries),
+            'throughput': logins / elapsed,
+            'p50'       : statistics.median(latencies),
+            'p95'       : latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        }
+
+    def _report(self, profile, result, cores):
+        self.stdout.write(
+            f'{profile:<8} {result["hash"] * 1000:>8.1f}ms {result["queries"]:>6} '
+            f'{result["throughput"]:>11.1f} {result["throughput"] / cores:>9.1f} '
+            f'{result["p50"] * 1000:>7.1f}ms {result["p95"] * 1000:>7.1f}ms'
+        )
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY はトランザクション内で実行できない
+    atomic = False
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0001_initial'),
+    ]
+
+    # auth_user は django.contrib.auth のモデルのため、Meta.indexes ではなく SQL で追加する
+    operations = [
+        migrations.RunSQL(
+            sql='CREATE INDEX CONCURRENTLY IF NOT EXISTS auth_user_email_idx ON auth_user (email)',
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS auth_user_email_idx',
+        ),
+    ]
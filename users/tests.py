@@ -0,0 +1,136 @@
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+import requests
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from django.contrib.auth import hashers
+from django.test import SimpleTestCase, override_settings
+from google.auth import crypt, jwt
+from requests.structures import CaseInsensitiveDict
+from users.google_auth import GoogleCertsTransport, verify_google_id_token
+from users.hashers import PBKDF2PasswordHasher
+
+
+AUDIENCE  = 'users-tests.apps.googleusercontent.com'
+CERTS_URL = 'https://certs.example.com/oauth2/v1/certs'
+
+
+class _CertsEndpoint:
+    """Google の証明書エンドポイントの代わりになる requests.Session（{key id: PEM 証明書} を max-age 付きで返す）"""
+
+    def __init__(self, max_age):
+        self.max_age = max_age
+        self.certs   = {}
+        self.down    = False
+        self.session = mock.Mock(spec=requests.Session)
+        self.session.request.side_effect = self._respond
+
+    @property
+    def hits(self):
+        return self.session.request.call_count
+
+    def _respond(self, method, url, **kwargs):
+        if self.down:
+            raise requests.ConnectionError('証明書エンドポイントに接続できません')
+        response             = requests.Response()
+        response.status_code = 200
+        response.headers     = CaseInsensitiveDict({
+            'Content-Type' : 'application/json',
+            'Cache-Control': f'public, max-age={self.max_age}, must-revalidate, no-transform',
+        })
+        response._content    = json.dumps(self.certs).encode('utf-8')
+        return response
+
+    def add_key(self, kid):
+        """署名鍵を作って証明書を公開し、その鍵で ID トークンを作る関数を返す。"""
+        key  = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, kid)])
+        now  = datetime.now(timezone.utc)
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - timedelta(days=1)).not_valid_after(now + timedelta(days=1))
+            .sign(key, hashes.SHA256())
+        )
+        self.certs[kid] = cert.public_bytes(serialization.Encoding.PEM).decode('ascii')
+        signer = crypt.RSASigner.from_string(
+            key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                              serialization.NoEncryption()),
+            key_id=kid,
+        )
+
+        def make_token(audience=AUDIENCE):
+            issued = int(time.time())
+            return jwt.encode(signer, {
+                'iss': 'https://accounts.google.com', 'aud': audience, 'sub': '1234567890',
+                'email': 'check@example.com', 'iat': issued, 'exp': issued + 600,
+            })
+        return make_token
+
+
+class GoogleCertsTransportTests(SimpleTestCase):
+    """Google ID トークンの検証（証明書のキャッシュ・鍵の切り替え・裏での取り直し）"""
+
+    def setUp(self):
+        self.endpoint  = _CertsEndpoint(max_age=3600)
+        self.transport = GoogleCertsTransport(session=self.endpoint.session, min_refetch_interval=0)
+        self.token     = self.endpoint.add_key('key-1')()
+
+    def _verify(self, token):
+        return verify_google_id_token(token, AUDIENCE, self.transport, CERTS_URL)
+
+    def test_warm_cache_does_not_fetch(self):
+        for _ in range(50):
+            self.assertEqual(self._verify(self.token)['email'], 'check@example.com')
+        self.assertEqual(self.endpoint.hits, 1)
+
+    def test_wrong_audience_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self._verify(self.endpoint.add_key('other')(audience='other-client'))
+
+    def test_unknown_key_id_refetches_once(self):
+        self._verify(self.token)
+        self._verify(self.endpoint.add_key('key-2')())
+        self.assertEqual(self.endpoint.hits, 2)
+
+    def test_cached_certs_are_used_while_the_endpoint_is_down(self):
+        self._verify(self.token)
+        self.endpoint.down = True
+        self._verify(self.token)
+        self.assertEqual(self.transport.stats.snapshot()['hit'], 1)
+
+    def test_refreshes_in_background_before_expiry(self):
+        transport = GoogleCertsTransport(session=self.endpoint.session, refresh_ahead=3600)
+        verify_google_id_token(self.token, AUDIENCE, transport, CERTS_URL)
+        verify_google_id_token(self.token, AUDIENCE, transport, CERTS_URL)   # 期限の refresh_ahead 秒前を過ぎている
+
+        deadline = time.monotonic() + 5
+        while transport.stats.snapshot()['background_refresh'] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.endpoint.hits, 2)
+        self.assertEqual(transport.stats.snapshot()['background_refresh'], 1)
+
+
+class PBKDF2PasswordHasherTests(SimpleTestCase):
+    """PBKDF2 の反復回数（未設定なら Django の既定。既存のハッシュを弱い回数へ保存し直さない）"""
+
+    def _encoded(self, iterations):
+        return f'pbkdf2_sha256${iterations}${"s" * 22}$hash'
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=None)
+    def test_defaults_to_django_iterations(self):
+        hasher = PBKDF2PasswordHasher()
+        self.assertEqual(hasher.iterations, hashers.PBKDF2PasswordHasher.iterations)
+        self.assertFalse(hasher.must_update(self._encoded(hashers.PBKDF2PasswordHasher.iterations)))
+        self.assertTrue(hasher.must_update(self._encoded(600_000)))
+
+    @override_settings(PASSWORD_PBKDF2_ITERATIONS=600_000)
+    def test_lower_iterations_are_an_explicit_opt_in(self):
+        hasher = PBKDF2PasswordHasher()
+        self.assertEqual(hasher.iterations, 600_000)
+        self.assertTrue(hasher.must_update(self._encoded(hashers.PBKDF2PasswordHasher.iterations)))
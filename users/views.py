@@ -9,9 +9,9 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
+from google.auth import exceptions as google_exceptions
 
+from .google_auth import verify_google_id_token
 from .models import UserProfile
 
 
@@ -87,12 +87,7 @@ class LoginView(APIView):
         if not email or not password:
             return Response({'error': 'メールアドレスとパスワードを入力してください'}, status=400)
 
-        try:
-            user_obj = User.objects.get(email=email)
-        except User.DoesNotExist:
-            return Response({'error': 'メールアドレスまたはパスワードが正しくありません'}, status=401)
-
-        user = authenticate(username=user_obj.username, password=password)
+        user = authenticate(request, email=email, password=password)
         if not user:
             return Response({'error': 'メールアドレスまたはパスワードが正しくありません'}, status=401)
 
@@ -121,12 +116,10 @@ class GoogleLoginView(APIView):
             return Response({'error': 'Google OAuth が設定されていません'}, status=503)
 
         try:
-            idinfo = id_token.verify_oauth2_token(
-                credential,
-                google_requests.Request(),
-                settings.GOOGLE_CLIENT_ID,
-            )
-        except ValueError as e:
+            idinfo = verify_google_id_token(credential)
+        except google_exceptions.TransportError:
+            return Response({'error': 'Google の証明書を取得できませんでした'}, status=503)
+        except (ValueError, google_exceptions.GoogleAuthError) as e:
             return Response({'error': f'Google 認証に失敗しました: {str(e)}'}, status=401)
 
         google_id = idinfo['sub']
@@ -184,12 +177,13 @@ class ChangePasswordView(APIView):
         if len(new_password) < 8:
             return Response({'error': '新しいパスワードは8文字以上にしてください'}, status=400)
 
-        user = authenticate(username=request.user.username, password=old_password)
-        if not user:
+        # request.user は JWT 認証で取得済み（有効なユーザーのみ）のため、再検索せずに照合する
+        user = request.user
+        if not user.check_password(old_password):
             return Response({'error': '現在のパスワードが正しくありません'}, status=401)
 
         user.set_password(new_password)
-        user.save()
+        user.save(update_fields=['password'])
         return Response({'message': 'パスワードを変更しました'})
 
 
@@ -203,8 +197,8 @@ class DeleteAccountView(APIView):
         if not password:
             return Response({'error': 'パスワードを入力してください'}, status=400)
 
-        user = authenticate(username=request.user.username, password=password)
-        if not user:
+        user = request.user
+        if not user.check_password(password):
             return Response({'error': 'パスワードが正しくありません'}, status=401)
 
         user.delete()